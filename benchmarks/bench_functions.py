@@ -0,0 +1,42 @@
+import timeit
+
+import numpy as np
+
+from glslsyntax import vec3, vec3array
+import glslsyntax.functions as glsl
+
+
+def best_time(stmt, number=50_000):
+    return min(timeit.repeat(stmt, number=number, repeat=5, globals=globals())) / number * 1e6
+
+
+def eager_mix(x, y, a):
+    return x * (1 - a) + y * a
+
+
+def eager_clamp(x, lo, hi):
+    return vec3(*[min(max(c, lo), hi) for c in x])
+
+
+def eager_reflect(i, n):
+    return i - 2 * n.dot(i) * n
+
+
+np.random.seed(0)
+a, b = vec3(0.3, -1.2, 2.5), vec3(1.5, 0.25, -0.75)
+n = vec3(0, 1, 1).normal
+points = vec3array(np.random.rand(1000, 3))
+
+print("> Time (us per call)")
+print(f"mix(a, b, 0.25)     glsl {best_time(lambda: glsl.mix(a, b, 0.25)):.2f}, "
+      f"operators {best_time(lambda: eager_mix(a, b, 0.25)):.2f}")
+print(f"clamp(a, 0.0, 1.0)  glsl {best_time(lambda: glsl.clamp(a, 0.0, 1.0)):.2f}, "
+      f"min/max {best_time(lambda: eager_clamp(a, 0.0, 1.0)):.2f}")
+print(f"reflect(a, n)       glsl {best_time(lambda: glsl.reflect(a, n)):.2f}, "
+      f"operators {best_time(lambda: eager_reflect(a, n)):.2f}")
+print(f"length(a)           glsl {best_time(lambda: glsl.length(a)):.2f}, "
+      f"magnitude {best_time(lambda: a.magnitude):.2f}")
+
+print("\n> Time (ms for 1000 vectors)")
+print(f"reflect(points, n)  batched {best_time(lambda: glsl.reflect(points, n), 1000) / 1000:.3f}, "
+      f"per vector {best_time(lambda: [glsl.reflect(p, n) for p in points], 20) / 1000:.3f}")
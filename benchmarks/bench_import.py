@@ -0,0 +1,82 @@
+import json
+import subprocess
+import sys
+
+# import time budget of the package, and checks that the optional backends are only imported on first use:
+#   python benchmarks/bench_import.py [budget in ms]
+# exits with an error if a check fails or if `import glslsyntax` takes longer than the budget
+
+BUDGET_MS = float(sys.argv[1]) if len(sys.argv) > 1 else 80.0
+LAZY = ["glslsyntax." + module for module in ("arrays", "layout", "keys", "spatial", "stream", "instrumentation",
+                                              "kernels", "functions", "parallel")]
+
+
+def fresh(code):
+    # run code in a new interpreter, which prints a JSON result
+    process = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert process.returncode == 0, process.stderr
+    return json.loads(process.stdout)
+
+
+IMPORT = """
+import json, sys, time
+start = time.perf_counter()
+import glslsyntax
+elapsed = time.perf_counter() - start
+{after}
+print(json.dumps({{"ms": elapsed * 1e3, "modules": sorted(sys.modules)}}))
+"""
+
+# the core types, which must not import numpy
+CORE = """
+v = glslsyntax.vec3(1, 2, 3)
+m = glslsyntax.mat4(1) * glslsyntax.translate(v)
+q = glslsyntax.quat.fromAxisAngle(v, 0.5) * glslsyntax.quat()
+a, b = glslsyntax.lazy(m, v.xyzz)
+e = (a * b).eval()
+"""
+
+FIRST_USE = """
+import json, sys, time
+import glslsyntax
+start = time.perf_counter()
+glslsyntax.{name}
+print(json.dumps({{"ms": (time.perf_counter() - start) * 1e3, "modules": sorted(sys.modules)}}))
+"""
+
+CONSISTENCY = """
+import importlib, json
+import glslsyntax
+names = {}
+exec("from glslsyntax import *", names)
+errors = [f"{module}: {sorted(set(importlib.import_module('glslsyntax.' + module).__all__) ^ set(exported))}"
+          for module, exported in glslsyntax._LAZY_MODULES.items()
+          if set(importlib.import_module("glslsyntax." + module).__all__) != set(exported)]
+errors += [f"not exported: {name}" for name in glslsyntax.__all__ if name not in names]
+print(json.dumps(errors))
+"""
+
+runs = [fresh(IMPORT.format(after="")) for _ in range(5)]
+best = min(run["ms"] for run in runs)
+loaded = [module for module in LAZY + ["numpy"] if module in runs[0]["modules"]]
+print(f"import glslsyntax            {best:6.1f} ms (budget {BUDGET_MS:.0f} ms)")
+assert not loaded, f"imported with the package: {', '.join(loaded)}"
+
+star = fresh(IMPORT.format(after="from glslsyntax import *"))
+loaded = [module for module in LAZY + ["numpy"] if module in star["modules"]]
+assert not loaded, f"imported by from glslsyntax import *: {', '.join(loaded)}"
+
+core = fresh(IMPORT.format(after=CORE))
+loaded = [module for module in LAZY + ["numpy"] if module in core["modules"]]
+assert not loaded, f"imported by the vectors, matrices and quaternions: {', '.join(loaded)}"
+
+for name, module in (("vec3array", "glslsyntax.arrays"), ("Struct", "glslsyntax.layout"),
+                     ("VertexStream", "glslsyntax.stream"), ("vectorize", "glslsyntax.kernels")):
+    first = fresh(FIRST_USE.format(name=name))
+    assert module in first["modules"], f"{module} not imported by glslsyntax.{name}"
+    print(f"first use of {name:<15} {first['ms']:6.1f} ms" + (", imports numpy" if "numpy" in first["modules"] else ""))
+
+errors = fresh(CONSISTENCY)
+assert not errors, "lazy names out of date in glslsyntax/__init__.py: " + "; ".join(errors)
+assert best <= BUDGET_MS, f"import glslsyntax took {best:.1f} ms, over the budget of {BUDGET_MS:.0f} ms"
+print("ok")
@@ -0,0 +1,42 @@
+import time
+import timeit
+
+from glslsyntax import vec3, mat4, instrument
+
+SETUP = "from glslsyntax import vec3, mat4; a = vec3(1.5, 2.5, 3.5); b = vec3(4.5, 5.5, 6.5); m = mat4(2)"
+CASES = ["a + b", "a.zyx", "vec3(1.5, 2.5, 3.5)", "m.Inv"]
+
+
+def ns_per_op(stmt, number=100_000):
+    return min(timeit.repeat(stmt, SETUP, number=number, repeat=5)) / number * 1e9
+
+
+def frame():
+    # a small per-frame workload
+    model = mat4(1).translate_(vec3(1, 2, 3))
+    normal = model.Inv.T
+    total = vec3(0)
+    for i in range(1000):
+        p = vec3(i, i + 1, i + 2)
+        total += (model * p.xyzz).xyz - p.zyx
+    return total, normal
+
+
+before = {stmt: ns_per_op(stmt) for stmt in CASES}
+with instrument():
+    during = {stmt: ns_per_op(stmt, 10_000) for stmt in CASES}
+after = {stmt: ns_per_op(stmt) for stmt in CASES}
+
+print("> Time (ns per operation)")
+print(f"{'':<22}{'before':>8}{'instrumented':>14}{'after':>8}")
+for stmt in CASES:
+    print(f"{stmt:<22}{before[stmt]:>8.0f}{during[stmt]:>14.0f}{after[stmt]:>8.0f}")
+
+start = time.perf_counter()
+with instrument() as report:
+    enabled = time.perf_counter() - start
+    frame()
+print(f"\npatching and restoring the classes: {(time.perf_counter() - start) * 1e3:.0f} ms "
+      f"(enable {enabled * 1e3:.0f} ms)")
+print(f"\n> One frame: {report}")
+print(report.summary(8))
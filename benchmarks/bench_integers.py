@@ -0,0 +1,49 @@
+import timeit
+
+import numpy as np
+
+from glslsyntax import ivec3, uvec3, bvec3, ivec3array, vec3array
+import glslsyntax.functions as glsl
+
+
+def best_time(stmt, number=50_000):
+    return min(timeit.repeat(stmt, number=number, repeat=5, globals=globals())) / number * 1e6
+
+
+def c_div(a, b):
+    # reference integer division of C and GLSL, truncated towards zero
+    q = abs(a) // abs(b)
+    return q if (a < 0) == (b < 0) else -q
+
+
+rng = np.random.default_rng(0)
+a, b = ivec3(7, -7, 2 ** 31 - 1), ivec3(2, 2, -1)
+cells = ivec3array(rng.integers(-100, 100, (10_000, 3), dtype=np.int32))
+steps = ivec3array(rng.integers(1, 10, (10_000, 3), dtype=np.int32))
+
+# reference values with Python integers, wrapped around to 32 bits
+assert a / b == ivec3(*[c_div(x, y) for x, y in zip(a, b)])
+assert a % b == ivec3(*[x - c_div(x, y) * y for x, y in zip(a, b)])
+assert a + ivec3(1) == ivec3(8, -6, -2 ** 31)
+assert uvec3(0, 1, 2) - 1 == uvec3(2 ** 32 - 1, 0, 1)
+assert list(cells / steps) == [p / s for p, s in zip(cells, steps)]
+assert list(cells % steps) == [p % s for p, s in zip(cells, steps)]
+assert glsl.lessThan(a, b) == bvec3(False, True, False)
+assert list(glsl.lessThan(cells, steps)) == [glsl.lessThan(p, s) for p, s in zip(cells, steps)]
+assert np.array_equal(glsl.all(glsl.greaterThanEqual(cells, ivec3(0))), (cells.data >= 0).all(axis=1))
+
+# memory per element is fixed by the storage type
+print("> Bytes per vector")
+print(f"ivec3array {cells.data.nbytes // len(cells)}, vec3array {vec3array(1).data.nbytes}")
+
+print("\n> Time (us per call)")
+print(f"a / b               ivec3 {best_time(lambda: a / b):.2f}")
+print(f"a + b               ivec3 {best_time(lambda: a + b):.2f}")
+print(f"lessThan(a, b)      glsl {best_time(lambda: glsl.lessThan(a, b)):.2f}")
+print(f"any(lessThan(a, b)) glsl {best_time(lambda: glsl.any(glsl.lessThan(a, b))):.2f}")
+
+print("\n> Time (ms for 10000 vectors)")
+print(f"cells / steps       batched {best_time(lambda: cells / steps, 200) / 1000:.3f}, "
+      f"per vector {best_time(lambda: [p / s for p, s in zip(cells, steps)], 2) / 1000:.3f}")
+print(f"lessThan            batched {best_time(lambda: glsl.lessThan(cells, steps), 200) / 1000:.3f}, "
+      f"per vector {best_time(lambda: [glsl.lessThan(p, s) for p, s in zip(cells, steps)], 2) / 1000:.3f}")
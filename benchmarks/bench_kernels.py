@@ -0,0 +1,37 @@
+import time
+
+import numpy as np
+
+from glslsyntax import vec3, vec4, mat3, vec3array, vectorize
+
+COUNT = 1920 * 1080
+
+
+@vectorize(vec3, vec3, mat3)
+def fragment(normal, light, normal_matrix):
+    n = (normal_matrix * normal).normal
+    diffuse = n.dot(light) * 0.5 + 0.5
+    h = (light + vec3(0, 0, 1)).normal
+    specular = n.dot(h) ** 16
+    return vec4(vec3(0.8, 0.6, 0.4) * diffuse + specular, 1.0)
+
+
+rng = np.random.default_rng(0)
+normals = vec3array(rng.normal(size=(COUNT, 3)))
+light = vec3(0.3, 0.4, 0.5).normal
+normal_matrix = mat3(1, 0, 0, 0, 0.8, 0.6, 0, -0.6, 0.8)
+
+# the plain function on a sample of pixels, extrapolated to the whole frame
+sample = normals[:20_000].tolist()
+start = time.perf_counter()
+for n in sample:
+    fragment.__wrapped__(n, light, normal_matrix)
+per_pixel = (time.perf_counter() - start) / len(sample)
+
+start = time.perf_counter()
+colors = fragment(normals, light, normal_matrix)
+batched = time.perf_counter() - start
+
+print(f"> {COUNT} pixels")
+print(f"per pixel (extrapolated): {per_pixel * COUNT:.2f} s")
+print(f"vectorized kernel:        {batched:.2f} s")
@@ -0,0 +1,82 @@
+import math
+import random
+import sys
+import timeit
+
+import numpy as np
+
+from glslsyntax import vec3, frozenvec3, vec3array, VectorPool, quantize
+
+
+def best_time(stmt, number=20):
+    return min(timeit.repeat(stmt, number=number, repeat=5, globals=globals())) / number * 1e3
+
+
+def dedup_tuples(vertices):
+    # the previous workaround, a tuple per vector
+    index = {}
+    return [index.setdefault(tuple(v), len(index)) for v in vertices]
+
+
+def dedup_frozen(vertices):
+    index = {}
+    return [index.setdefault(v.frozen, len(index)) for v in vertices]
+
+
+def bucket_tuples(points, size):
+    grid = {}
+    for p in points:
+        grid.setdefault(tuple(math.floor(c / size) for c in p), []).append(p)
+    return grid
+
+
+def bucket_inline(points, size):
+    # hand-written floors, the fastest pure Python key
+    grid = {}
+    for p in points:
+        grid.setdefault((math.floor(p.x / size), math.floor(p.y / size), math.floor(p.z / size)), []).append(p)
+    return grid
+
+
+def bucket_quantize(points, size):
+    grid = {}
+    for p in points:
+        grid.setdefault(quantize(p, size), []).append(p)
+    return grid
+
+
+random.seed(0)
+# a mesh-like vertex stream, each vertex shared by about 6 triangles
+corners = [vec3(random.randint(0, 20), random.randint(0, 20), random.randint(0, 20)) for _ in range(2000)]
+vertices = [random.choice(corners) for _ in range(12_000)]
+points = [vec3(random.uniform(-10, 10), random.uniform(-10, 10), random.uniform(-10, 10)) for _ in range(10_000)]
+
+# reference results with tuples
+assert dedup_frozen(vertices) == dedup_tuples(vertices)
+assert {tuple(k): len(v) for k, v in bucket_quantize(points, 0.5).items()} == \
+       {k: len(v) for k, v in bucket_tuples(points, 0.5).items()}
+assert list(quantize(vec3array(points), 0.5)) == [quantize(p, 0.5) for p in points]
+pool = VectorPool()
+interned = [pool.intern(v) for v in vertices]
+assert len(pool) == len({tuple(v) for v in vertices})
+assert all(a is pool.intern(b) for a, b in zip(interned, vertices))
+
+print("> Memory (bytes for 12000 references to 2000 distinct vectors)")
+copies = [v.frozen for v in vertices]
+print(f"frozen copies {sum(map(sys.getsizeof, copies))}, "
+      f"interned {sum(sys.getsizeof(v) for v in {id(v): v for v in interned}.values())}")
+
+print("\n> Time (ms)")
+print(f"dedup 12000 vertices      tuples {best_time(lambda: dedup_tuples(vertices)):.2f}, "
+      f"frozen {best_time(lambda: dedup_frozen(vertices)):.2f}")
+print(f"bucket 10000 points       tuples {best_time(lambda: bucket_tuples(points, 0.5)):.2f}, "
+      f"inline tuples {best_time(lambda: bucket_inline(points, 0.5)):.2f}, "
+      f"quantize {best_time(lambda: bucket_quantize(points, 0.5)):.2f}")
+batch = vec3array(points)
+print(f"quantize 10000 points     per point {best_time(lambda: [quantize(p, 0.5) for p in points]):.2f}, "
+      f"batched {best_time(lambda: quantize(batch, 0.5)):.3f}")
+key = frozenvec3(1, 2, 3)
+table = {key: 0}
+print(f"\n> Time (ns per lookup)\n"
+      f"frozen key {best_time(lambda: table[key], 500_000) * 1e6:.0f}, "
+      f"hash {best_time(lambda: hash(key), 500_000) * 1e6:.0f}")
@@ -0,0 +1,37 @@
+import struct
+import timeit
+
+from glslsyntax import vec3, vec4, mat4, Struct
+
+N = 10_000
+
+Instance = Struct([("model", mat4), ("color", vec4), ("position", vec3), ("scale", float)], name="Instance")
+records = [{"model": mat4(i), "color": vec4(i), "position": vec3(i), "scale": float(i)} for i in range(N)]
+buffer = bytearray(Instance.size * N)
+
+
+# reference: the hand-written std140 packing, through getArray() and one struct.pack per value
+def hand_pack():
+    offset = 0
+    for r in records:
+        for column in r["model"].getArray():
+            struct.pack_into("<4f", buffer, offset, *column)
+            offset += 16
+        struct.pack_into("<4f", buffer, offset, *r["color"].getArray())
+        struct.pack_into("<3f", buffer, offset + 16, *r["position"].getArray())
+        struct.pack_into("<f", buffer, offset + 28, r["scale"])
+        offset += 32
+
+
+def best_time(stmt, number=5):
+    return min(timeit.repeat(stmt, number=number, repeat=5, globals=globals())) / number * 1e3
+
+
+print(Instance)
+print(f"\n> Packing {N} records (ms)")
+print(f"hand-written struct.pack: {best_time(hand_pack):.2f}")
+print(f"Struct.packInto:          {best_time(lambda: Instance.packInto(buffer, records)):.2f}")
+
+print(f"\n> Reading {N} records (ms)")
+print(f"Struct.unpack:            {best_time(lambda: Instance.unpack(buffer, 0, N)):.2f}")
+print(f"Struct.views, one field:  {best_time(lambda: [r.scale for r in Instance.views(buffer)]):.2f}")
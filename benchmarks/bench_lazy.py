@@ -0,0 +1,28 @@
+import random
+import timeit
+
+from glslsyntax import vec3, vec4, mat4, lazy
+
+
+def best_time(stmt, number=50_000):
+    return min(timeit.repeat(stmt, number=number, repeat=5, globals=globals())) / number * 1e6
+
+
+random.seed(0)
+a, b, c = vec3(1.5, 2.5, 3.5), vec3(4.5, 5.5, 6.5), vec3(7.5, 8.5, 9.5)
+P, V, M = (mat4(*[random.uniform(-1, 1) for _ in range(16)]) for _ in range(3))
+v = vec4(1.0, 2.0, 3.0, 1.0)
+
+shading = (lazy(a) + b) * 2 - c
+transform = lazy(P) * V * M * v
+combine = lazy(P) * V * M
+
+print("> Time (us per evaluation)")
+print(f"(a + b) * 2 - c   eager {best_time(lambda: (a + b) * 2 - c):.2f}, "
+      f"lazy built each time {best_time(lambda: ((lazy(a) + b) * 2 - c).eval()):.2f}, "
+      f"lazy reused {best_time(shading.eval):.2f}")
+print(f"P * V * M * v     eager {best_time(lambda: P * V * M * v):.2f}, "
+      f"lazy built each time {best_time(lambda: (lazy(P) * V * M * v).eval()):.2f}, "
+      f"lazy reused {best_time(transform.eval):.2f}")
+print(f"P * V * M         eager {best_time(lambda: P * V * M):.2f}, "
+      f"lazy reused {best_time(combine.eval):.2f}")
@@ -0,0 +1,122 @@
+import random
+import timeit
+import tracemalloc
+
+from glslsyntax import vec2, vec3, vec4, mat2, mat3, mat4, mat2x3, mat3x2, mat2x4, mat4x2, mat3x4, mat4x3
+
+
+# reference: the recursive cofactor expansion used before the closed forms
+def laplace_det(mat):
+    if len(mat) == 1:
+        return mat[0][0]
+    res = 0
+    for i in range(len(mat)):
+        submat = [mat[j][:i] + mat[j][i + 1:] for j in range(1, len(mat))]
+        res += ((-1) ** i) * mat[0][i] * laplace_det(submat)
+    return res
+
+
+def cofactor_inverse(mat):
+    det = laplace_det(mat)
+    n = len(mat)
+    res = [[0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(n):
+            submat = [row[:j] + row[j + 1:] for k, row in enumerate(mat) if k != i]
+            # transposed cofactor
+            res[j][i] = ((-1) ** (i + j)) * laplace_det(submat) / det
+    return res
+
+
+# reference: the triple loop used before the unrolled products (square matrices only, it sized the
+# result with the class of the left operand)
+def loop_product(a, b):
+    res = [[0 for _ in range(b.size[1])] for _ in range(a._N)]
+    for i in range(a._N):
+        for j in range(b.size[1]):
+            for k in range(a._M):
+                res[i][j] += a[i][k] * b[k][j]
+    return a.__class__(*res)
+
+
+def residual(mat, inv):
+    # max |mat * inv - Id| over all components
+    n = len(mat)
+    return max(abs(sum(mat[i][k] * inv[k][j] for k in range(n)) - (i == j)) for i in range(n) for j in range(n))
+
+
+def hilbert(n):
+    # classic ill-conditioned matrix
+    return [[1 / (i + j + 1) for j in range(n)] for i in range(n)]
+
+
+def best_time(stmt, number=20_000):
+    return min(timeit.repeat(stmt, number=number, repeat=5, globals=globals())) / number * 1e6
+
+
+random.seed(0)
+TYPES = {2: mat2, 3: mat3, 4: mat4}
+VECTORS = {2: vec2, 3: vec3, 4: vec4}
+
+print("> Accuracy against the cofactor expansion")
+for n, cls in TYPES.items():
+    ints = [[random.randint(-9, 9) for _ in range(n)] for _ in range(n)]
+    m = cls(ints)
+    assert m.det == laplace_det(ints), "integer determinants must be exact"
+
+    worst_det = worst_inv = 0
+    for _ in range(1000):
+        floats = [[random.uniform(-1, 1) for _ in range(n)] for _ in range(n)]
+        m = cls(floats)
+        ref = laplace_det(floats)
+        worst_det = max(worst_det, abs(m.det - ref) / abs(ref), abs(m.determinant("lu") - ref) / abs(ref))
+        ref_inv = cofactor_inverse(floats)
+        for method in ("closed", "lu"):
+            inv = m.inverse(method).getArray()
+            worst_inv = max(worst_inv, max(abs(inv[i][j] - ref_inv[i][j]) / max(1, abs(ref_inv[i][j]))
+                                           for i in range(n) for j in range(n)))
+    print(f"mat{n}: exact integer det, max relative det error {worst_det:.1e}, max inverse error {worst_inv:.1e}")
+
+print("\n> Residual |H * inv(H) - Id| on Hilbert matrices")
+for n, cls in TYPES.items():
+    h = hilbert(n)
+    m = cls(h)
+    print(f"mat{n}: cofactor {residual(h, cofactor_inverse(h)):.1e}, "
+          f"closed {residual(h, m.inverse('closed').getArray()):.1e}, "
+          f"lu {residual(h, m.inverse('lu').getArray()):.1e}")
+
+print("\n> Time (us per call)")
+for n, cls in TYPES.items():
+    m = cls([[random.uniform(-1, 1) for _ in range(n)] for _ in range(n)])
+    arr = m.getArray()
+    print(f"mat{n}: det cofactor {best_time(lambda: laplace_det(arr)):.2f}, "
+          f"closed {best_time(lambda: m.det):.2f}, lu {best_time(lambda: m.determinant('lu')):.2f} | "
+          f"Inv cofactor {best_time(lambda: cofactor_inverse(arr)):.2f}, "
+          f"closed {best_time(lambda: m.Inv):.2f}, lu {best_time(lambda: m.inverse('lu')):.2f}")
+
+print("\n> Matrix products (us per call)")
+for n, cls in TYPES.items():
+    a = cls([[random.uniform(-1, 1) for _ in range(n)] for _ in range(n)])
+    b = cls([[random.uniform(-1, 1) for _ in range(n)] for _ in range(n)])
+    # multiplying by the identity keeps the in-place benchmark from overflowing
+    c = cls(1)
+    print(f"mat{n}: loop {best_time(lambda: loop_product(a, b)):.2f}, unrolled {best_time(lambda: a * b):.2f}, "
+          f"in place {best_time(lambda: c.__imul__(c)):.2f}")
+for left, right in ((mat2x3, mat3x2), (mat3x2, mat2x3), (mat4x2, mat2x4), (mat3x4, mat4x3)):
+    a = left(1.5)
+    b = right(2.5)
+    print(f"{left.__name__} * {right.__name__} -> {type(a * b).__name__}: {best_time(lambda: a * b):.2f}")
+
+print("\n> Storage")
+for n, cls in TYPES.items():
+    m = cls(*[random.uniform(-1, 1) for _ in range(n * n)])
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    keep = [cls(m) for _ in range(10_000)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    columns = [VECTORS[n](m[i]) for i in range(n)]
+    print(f"mat{n}: {(after - before - keep.__sizeof__()) / 10_000:.0f} bytes, "
+          f"construction {best_time(lambda: cls(m)):.2f} us, from columns {best_time(lambda: cls(*columns)):.2f} us, "
+          f"fromColumns {best_time(lambda: cls.fromColumns(*columns)):.2f} us, "
+          f"m[1] {best_time(lambda: m[1]):.2f} us, m[1][2] {best_time(lambda: m[1][n - 1]):.2f} us")
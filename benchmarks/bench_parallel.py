@@ -0,0 +1,62 @@
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+
+from glslsyntax import vec3, vec4, mat4, vec3array, vectorize
+import glslsyntax.functions as glsl
+import glslsyntax.parallel as parallel
+
+
+@vectorize(vec3, vec3, mat4)
+def shade(position, normal, model):
+    # a per-vertex pass: transform, then a few lighting terms
+    p = (model * vec4(position, 1.0)).xyz
+    n = glsl.normalize((model * vec4(normal, 0.0)).xyz)
+    light = glsl.normalize(vec3(1.0, 2.0, 3.0) - p)
+    diffuse = glsl.max(glsl.dot(n, light), 0.0)
+    specular = glsl.pow(glsl.max(glsl.dot(glsl.reflect(-light, n), glsl.normalize(-p)), 0.0), 16.0)
+    return vec3(0.8, 0.6, 0.4) * diffuse + vec3(specular)
+
+
+def best_time(f, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1e3
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = np.random.default_rng(0)
+    positions = vec3array(rng.random((count, 3)))
+    normals = vec3array(rng.normal(size=(count, 3)))
+    model = mat4(1).translate_(vec3(0.5, -1, 2))
+    args = (positions, normals, model)
+
+    reference = shade(*args)
+    for backend in ("thread", "process"):
+        assert np.allclose(parallel.map(shade, args, workers=2, backend=backend).data, reference.data)
+
+    cores = os.cpu_count() or 1
+    print(f"> {count} vertices, {cores} cores")
+    # what pickling the vectors one by one would cost, which the shared memory avoids
+    vectors = positions[:10_000].tolist()
+    start = time.perf_counter()
+    pickle.loads(pickle.dumps(vectors))
+    print(f"pickling 10000 vec3 one by one: {(time.perf_counter() - start) * 1e3:.1f} ms")
+    serial = best_time(lambda: shade(*args))
+    print(f"serial      {serial:.0f} ms")
+    workers = 1
+    while True:
+        for backend in ("process", "thread"):
+            elapsed = best_time(lambda: parallel.map(shade, args, workers=workers, backend=backend))
+            print(f"{backend:<8}{workers:>3} workers {elapsed:.0f} ms (x{serial / elapsed:.2f})")
+        if workers >= max(cores, 2):
+            break
+        workers = min(workers * 2, max(cores, 2))
+    parallel.shutdown()
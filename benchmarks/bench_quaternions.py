@@ -0,0 +1,42 @@
+import random
+import timeit
+
+import numpy as np
+
+from glslsyntax import vec3, quat, vec3array, quatarray
+from glslsyntax.transforms import rotate
+
+
+def best_time(stmt, number=50_000):
+    return min(timeit.repeat(stmt, number=number, repeat=5, globals=globals())) / number * 1e6
+
+
+random.seed(0)
+axis, angle = vec3(1, 2, 2), 0.8
+q, r = quat.fromAxisAngle(axis, angle), quat.fromAxisAngle(vec3(0, 1, 0), 1.1)
+m, n = q.toMat3(), r.toMat3()
+v = vec3(0.3, -2, 1.5)
+
+print("> Time (us per operation)")
+print(f"compose    q * r {best_time(lambda: q * r):.2f}, mat3 * mat3 {best_time(lambda: m * n):.2f}")
+print(f"rotate     q * v {best_time(lambda: q * v):.2f}, mat3 * v {best_time(lambda: m * v):.2f}")
+print(f"inverse    q.Inv {best_time(lambda: q.Inv):.2f}, mat3.Inv {best_time(lambda: m.Inv):.2f}")
+print(f"slerp      {best_time(lambda: q.slerp(r, 0.3)):.2f}, nlerp {best_time(lambda: q.nlerp(r, 0.3)):.2f}")
+
+print("\n> Drift after 10000 compositions of a small rotation")
+step_q, step_m = quat.fromAxisAngle(axis, 0.01), rotate(axis, 0.01)
+acc_q, acc_m = quat(), rotate(axis, 0)
+for _ in range(10_000):
+    acc_q = acc_q * step_q
+    acc_m = acc_m * step_m
+print(f"|q| - 1 = {acc_q.magnitude - 1:.2e}, det(m) - 1 = {acc_m.det - 1:.2e}")
+
+joints = 10_000
+rest = quatarray.fromAxisAngle(vec3array(np.random.rand(joints, 3) + 0.1), np.random.rand(joints) * 3)
+target = quatarray.fromAxisAngle(vec3array(np.random.rand(joints, 3) + 0.1), np.random.rand(joints) * 3)
+points = vec3array(np.random.rand(joints, 3))
+print(f"\n> Time (ms for {joints} joints)")
+print(f"slerp      batched {best_time(lambda: rest.slerp(target, 0.25), 50) / 1000:.2f}, "
+      f"per joint {best_time(lambda: [a.slerp(b, 0.25) for a, b in zip(rest, target)], 2) / 1000:.2f}")
+print(f"rotate     batched {best_time(lambda: rest * points, 50) / 1000:.2f}")
+print(f"toMat4     batched {best_time(rest.toMat4, 50) / 1000:.2f}")
@@ -0,0 +1,95 @@
+import math
+import sys
+import time
+
+import numpy as np
+
+from glslsyntax import vec3, vec3array, Grid, KDTree
+
+
+def best_time(f, repeat=3):
+    # best wall time of f() in ms
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1e3
+
+
+def brute_nearest(data, q, k):
+    d2 = ((data - q) ** 2).sum(axis=1)
+    nearest = np.argpartition(d2, k)[:k]
+    return nearest[np.argsort(d2[nearest])]
+
+
+def python_nearest(points, q):
+    # the previous O(N) loop with _vecBase.distance
+    return min(range(len(points)), key=lambda i: points[i].distance(q))
+
+
+sizes = [int(n) for n in sys.argv[1:]] or [100_000, 1_000_000]
+rng = np.random.default_rng(0)
+queries = [vec3(*q) for q in rng.random((200, 3)).tolist()]
+directions = [vec3(*u) for u in rng.normal(size=(200, 3)).tolist()]
+
+for n in sizes:
+    data = rng.random((n, 3))
+    batch = vec3array(data)
+    # about 8 points per cell
+    cell = (8 / n) ** (1 / 3)
+    radius = 2 * cell
+    print(f"> {n} points")
+    start = time.perf_counter()
+    tree = KDTree(batch)
+    print(f"build       KDTree {(time.perf_counter() - start) * 1e3:.0f} ms", end="")
+    start = time.perf_counter()
+    grid = Grid(cell, batch)
+    print(f", Grid {(time.perf_counter() - start) * 1e3:.0f} ms")
+
+    # reference results
+    for q, u in zip(queries[:20], directions[:20]):
+        c = np.array(q._components(q))
+        d2 = ((data - c) ** 2).sum(axis=1)
+        assert np.allclose(d2[tree.nearest(q, 8)], d2[brute_nearest(data, c, 8)])
+        assert np.allclose(d2[grid.nearest(q, 8)], d2[brute_nearest(data, c, 8)])
+        inside = sorted(np.flatnonzero(d2 <= radius * radius).tolist())
+        assert sorted(tree.inRadius(q, radius)) == inside and sorted(grid.inRadius(q, radius)) == inside
+        assert sorted(tree.alongRay(q, u, cell)) == sorted(grid.alongRay(q, u, cell))
+
+    print("query (us per query, 200 queries)")
+    timings = {
+        "nearest k=8": (lambda s: [s.nearest(q, 8) for q in queries],
+                        lambda: [brute_nearest(data, np.array(q._components(q)), 8) for q in queries]),
+        "inRadius": (lambda s: [s.inRadius(q, radius) for q in queries],
+                     lambda: [np.flatnonzero(((data - q._components(q)) ** 2).sum(axis=1) <= radius * radius)
+                              for q in queries]),
+        "inBox": (lambda s: [s.inBox(q - radius, q + radius) for q in queries],
+                  lambda: [np.flatnonzero(((data >= np.array((q - radius)._components(q)))
+                                           & (data <= np.array((q + radius)._components(q)))).all(axis=1))
+                           for q in queries]),
+        "alongRay": (lambda s: [s.alongRay(q, u, cell) for q, u in zip(queries, directions)], None),
+    }
+    for name, (query, brute) in timings.items():
+        line = (f"{name:<12}KDTree {best_time(lambda: query(tree)) * 1e3 / len(queries):.0f}, "
+                f"Grid {best_time(lambda: query(grid)) * 1e3 / len(queries):.0f}")
+        if brute is not None:
+            line += f", numpy brute force {best_time(brute, 1) * 1e3 / len(queries):.0f}"
+        print(line)
+    if n <= 100_000:
+        points = batch.tolist()
+        print(f"nearest     Python loop {best_time(lambda: python_nearest(points, queries[0]), 1) * 1e3:.0f}")
+
+    # moving particles: small random steps, most of them staying in their cell
+    steps = rng.normal(scale=cell / 4, size=(10_000, 3))
+    moved = [vec3(*p) for p in (data[:10_000] + steps).tolist()]
+    start = time.perf_counter()
+    for i, p in enumerate(moved):
+        grid.move(i, p)
+    print(f"move        Grid {(time.perf_counter() - start) * 1e6 / len(moved):.1f} us per point")
+    start = time.perf_counter()
+    for i in range(10_000):
+        grid.remove(i)
+    for p in moved:
+        grid.insert(p)
+    print(f"remove and insert Grid {(time.perf_counter() - start) * 1e6 / len(moved):.1f} us per point\n")
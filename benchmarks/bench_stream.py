@@ -0,0 +1,66 @@
+import os
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from glslsyntax import vec3, vec4, VertexStream
+import glslsyntax.functions as glsl
+from glslsyntax.transforms import translate, rotate, scale
+
+sizes = [int(n) for n in sys.argv[1:]] or [1_000_000, 4_000_000]
+model = translate(vec3(1, 2, 3)) * rotate(vec3(0, 0, 1), 0.5)
+view = scale(2.0)
+center = vec3(1, 2, 3)
+
+
+def pipeline(path):
+    return (VertexStream.open(path).transform(model).transform(view)
+            .filterDistance(center, maxDistance=3.0).normalize())
+
+
+def list_pipeline(path, out):
+    # the previous workaround: everything loaded into a list of vec3
+    with open(path, "rb") as f:
+        raw = f.read()
+    points = [vec3(*p) for p in struct.iter_unpack("<3f", raw)]
+    m = view * model
+    points = [(m * vec4(p, 1.0)).xyz for p in points]
+    points = [glsl.normalize(p) for p in points if glsl.distance(p, center) <= 3.0]
+    with open(out, "wb") as f:
+        f.write(b"".join(struct.pack("<3f", *p._components(p)) for p in points))
+    return len(points)
+
+
+def measure(f):
+    # (result, seconds, peak of the memory allocated by Python and numpy in MB)
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = f()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+with tempfile.TemporaryDirectory() as directory:
+    rng = np.random.default_rng(0)
+    source, out = os.path.join(directory, "in.bin"), os.path.join(directory, "out.bin")
+    for n in sizes:
+        rng.normal(scale=2.0, size=(n, 3)).astype("<f4").tofile(source)
+        print(f"> {n} vertices ({os.path.getsize(source) / 2 ** 20:.0f} MB)")
+        stream = pipeline(source)
+        written, elapsed, peak = measure(lambda: stream.write(out))
+        print(f"VertexStream  {written} written, {stream.throughput / 1e6:.1f} M vertices/s, peak {peak:.1f} MB")
+        if n <= 1_000_000:
+            # reference results and the list of vec3, on a part of the file
+            part = 200_000
+            np.fromfile(source, dtype="<f4", count=part * 3).tofile(source)
+            _, elapsed, peak = measure(lambda: list_pipeline(source, out))
+            assert np.allclose(np.fromfile(out, dtype="<f4").reshape(-1, 3), pipeline(source).collect().data,
+                               atol=1e-6)
+            print(f"list of vec3  {part} vertices, {part / elapsed / 1e6:.2f} M vertices/s, peak {peak:.1f} MB")
+        print()
@@ -0,0 +1,39 @@
+import math
+import timeit
+
+from glslsyntax import vec3, vec4, mat4, perspective, lookAt, translate, rotate, scale
+from glslsyntax.transforms import _perspective
+
+
+def best_time(stmt, number=50_000):
+    return min(timeit.repeat(stmt, number=number, repeat=5, globals=globals())) / number * 1e6
+
+
+def generic_translate(v):
+    m = mat4(1)
+    m[3] = vec4(v, 1)
+    return m
+
+
+def generic_perspective(fovy, aspect, near, far):
+    f = 1 / math.tan(fovy / 2)
+    return mat4(f / aspect, 0, 0, 0, 0, f, 0, 0, 0, 0, (far + near) / (near - far), -1,
+                0, 0, 2 * far * near / (near - far), 0)
+
+
+p, axis = vec3(1, 2, 3), vec3(1, 2, 2)
+M = mat4(*range(1, 17))
+
+print("> Time (us per call)")
+print(f"translate(p)                  {best_time(lambda: translate(p)):.2f}, "
+      f"generic {best_time(lambda: generic_translate(p)):.2f}")
+print(f"perspective(...) cached       {best_time(lambda: perspective(1.0, 1.5, 0.1, 100.0)):.2f}, "
+      f"uncached {best_time(lambda: mat4._new(_perspective.__wrapped__(1.0, 1.5, 0.1, 100.0))):.2f}, "
+      f"generic {best_time(lambda: generic_perspective(1.0, 1.5, 0.1, 100.0)):.2f}")
+print(f"lookAt(eye, center, up)       {best_time(lambda: lookAt(vec3(1, 2, 3), vec3(0), vec3(0, 1, 0))):.2f}")
+print(f"m.translate_(p)               {best_time(lambda: M.translate_(p)):.2f}, "
+      f"m * translate(p) {best_time(lambda: M * translate(p)):.2f}")
+print(f"m.rotate_(axis, 0)            {best_time(lambda: M.rotate_(axis, 0.0)):.2f}, "
+      f"m * rotate(axis, 0) {best_time(lambda: M * rotate(axis, 0.0)):.2f}")
+print(f"m.scale_(p)                   {best_time(lambda: M.scale_(p)):.2f}, "
+      f"m * scale(p) {best_time(lambda: M * scale(p)):.2f}")
@@ -0,0 +1,50 @@
+import timeit
+import tracemalloc
+
+N = 100_000
+
+
+from glslsyntax import vec2, vec3, vec4
+
+
+def memory_per_vector(cls, *args) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    keep = [cls(*args) for _ in range(N)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # discount the list holding the vectors
+    return (after - before - keep.__sizeof__()) / N
+
+
+def throughput(stmt: str, setup: str, number: int = N) -> float:
+    # operations per second, best of 5
+    best = min(timeit.repeat(stmt, setup, number=number, repeat=5))
+    return number / best
+
+
+SETUP = "from glslsyntax import vec2, vec3, vec4; a = vec3(1.5, 2.5, 3.5); b = vec3(4.5, 5.5, 6.5)"
+
+print("> Memory (bytes per vector, float components)")
+print(f"vec2: {memory_per_vector(vec2, 1.5, 2.5):.1f}")
+print(f"vec3: {memory_per_vector(vec3, 1.5, 2.5, 3.5):.1f}")
+print(f"vec4: {memory_per_vector(vec4, 1.5, 2.5, 3.5, 4.5):.1f}")
+
+print("\n> Throughput (ops/s)")
+print(f"vec3(x, y, z): {throughput('vec3(1.5, 2.5, 3.5)', SETUP):,.0f}")
+print(f"vec3(v.xy, z): {throughput('vec3(v, 3.5)', SETUP + '; v = vec2(1.5, 2.5)'):,.0f}")
+print(f"vec3.fromXYZ:  {throughput('vec3.fromXYZ(1.5, 2.5, 3.5)', SETUP):,.0f}")
+print(f"a.x:           {throughput('a.x', SETUP):,.0f}")
+print(f"a.r:           {throughput('a.r', SETUP):,.0f}")
+print(f"a[1]:          {throughput('a[1]', SETUP):,.0f}")
+print(f"a.y = 2.0:     {throughput('a.y = 2.0', SETUP):,.0f}")
+print(f"a + b:         {throughput('a + b', SETUP):,.0f}")
+print(f"a * 2.0:       {throughput('a * 2.0', SETUP):,.0f}")
+print(f"a.dot(b):      {throughput('a.dot(b)', SETUP):,.0f}")
+print(f"a.magnitude:   {throughput('a.magnitude', SETUP):,.0f}")
+
+print("\n> Swizzles (ops/s)")
+print(f"a.zxy:         {throughput('a.zxy', SETUP):,.0f}")
+print(f"a.xy:          {throughput('a.xy', SETUP):,.0f}")
+print(f"a.bgr:         {throughput('a.bgr', SETUP):,.0f}")
+print(f"a.zyx.xz:      {throughput('a.zyx.xz', SETUP):,.0f}")
@@ -0,0 +1,221 @@
+import argparse
+import datetime
+import json
+import platform
+import re
+import subprocess
+import sys
+import timeit
+
+import numpy as np
+
+import glslsyntax
+from glslsyntax import vec2, vec3, vec4, mat2, mat3, mat4, mat2x3, mat3x2, mat2x4, mat4x2, mat3x4, mat4x3, \
+    vec2array, vec3array, vec4array, mat2array, mat3array, mat4array, mat2x3array, mat3x2array, mat2x4array, \
+    mat4x2array, mat3x4array, mat4x3array
+
+# benchmark suite of the operations of every vector and matrix type, on single objects and on batches:
+#   python benchmarks/suite.py run -o results.json [-k regex] [--sizes 1 100 10000] [--quick]
+#   python benchmarks/suite.py compare before.json after.json [--threshold 0.1]
+# a case "vec3/dot/python/100" is a.dot(b) in a loop over 100 pairs of vec3, and "vec3/dot/array/100" the
+# same operation on vec3array batches of 100 vectors; the times are in ns per element, the best of the
+# repeats, and compare exits with 1 when a case is slower than before by more than the threshold
+
+FORMAT_VERSION = 1
+SIZES = [1, 100, 10_000]
+
+VECTORS = [(vec2, vec2array), (vec3, vec3array), (vec4, vec4array)]
+MATRICES = [(mat2, mat2array), (mat3, mat3array), (mat4, mat4array), (mat2x3, mat2x3array),
+            (mat3x2, mat3x2array), (mat2x4, mat2x4array), (mat4x2, mat4x2array), (mat3x4, mat3x4array),
+            (mat4x3, mat4x3array)]
+VECTOR_CLASSES = [cls for cls, _ in VECTORS]
+VECTOR_TYPES = {2: vec2, 3: vec3, 4: vec4}
+VECTOR_ARRAY_TYPES = {2: vec2array, 3: vec3array, 4: vec4array}
+
+# swizzles reading every component in reverse order
+SWIZZLES = {2: "yx", 3: "zyx", 4: "wzyx"}
+
+
+def vector_cases(cls, array_cls):
+    # name: (expression on the vectors a and b, expression on the batches a and b)
+    n = cls._N
+    swizzle = SWIZZLES[n]
+    construct = ", ".join(f"{i + 1.5}" for i in range(n))
+    cases = {
+        "construct": (f"{cls.__name__}({construct})", f"{array_cls.__name__}(data)"),
+        "swizzle": (f"a.{swizzle}", f"a.{swizzle}"),
+        "add": ("a + b", "a + b"),
+        "mul": ("a * 2.0", "a * 2.0"),
+        "dot": ("a.dot(b)", "a.dot(b)"),
+        "magnitude": ("a.magnitude", "a.magnitude"),
+        "getArray": ("a.getArray()", "a.getArray()"),
+    }
+    if n == 3:
+        cases["cross"] = ("a.cross(b)", "a.cross(b)")
+    return cases
+
+
+def matrix_cases(cls, array_cls):
+    # name: (expression on the matrices a and b and the vector v, expression on batches of them)
+    n, m = cls(1).size
+    cases = {
+        "construct": (f"{cls.__name__}(1.5)", f"{array_cls.__name__}(data)"),
+        # a product defined for every size, square for the square types
+        "mul": ("a * b", "a * b"),
+        "mulVector": ("a * v", "a * v"),
+        "T": ("a.T", "a.T"),
+        "getArray": ("a.getArray()", "a.getArray()"),
+    }
+    if n == m:
+        cases["det"] = ("a.det", "a.det")
+        cases["Inv"] = ("a.Inv", "a.Inv")
+    return cases
+
+
+def random_matrix(cls, rng):
+    # invertible for the square types
+    n, m = cls(1).size
+    columns = (rng.random((m, n)) + np.eye(m, n) * n).tolist()
+    return cls(*[VECTOR_TYPES[n](*column) for column in columns])
+
+
+def operands(cls, rng):
+    # a, b and v of the statements: b has the type of a for the vectors and the square matrices, and is
+    # the transpose of a for the other matrices, v is a vector for a * v
+    if cls in VECTOR_CLASSES:
+        return cls(*rng.random(cls._N).tolist()), cls(*rng.random(cls._N).tolist()), None
+    n, m = cls(1).size
+    a = random_matrix(cls, rng)
+    return a, a.T if n != m else random_matrix(cls, rng), VECTOR_TYPES[m](*rng.random(m).tolist())
+
+
+def namespace(cls, array_cls, kind, size):
+    # the variables of the statements of a case
+    rng = np.random.default_rng(0)
+    if kind == "python":
+        triples = [operands(cls, rng) for _ in range(size)]
+        a, b, v = triples[0]
+        return {"a": a, "b": b, "v": v, "operands": triples, cls.__name__: cls}
+    if cls in VECTOR_CLASSES:
+        a, b, v = array_cls(rng.random((size, cls._N))), array_cls(rng.random((size, cls._N))), None
+    else:
+        matrices, others, vectors = zip(*[operands(cls, rng) for _ in range(size)])
+        a = array_cls(list(matrices))
+        b = array_cls(list(others)) if type(others[0]) is cls else a.T
+        v = VECTOR_ARRAY_TYPES[vectors[0]._N](list(vectors))
+    return {"a": a, "b": b, "v": v, "data": a.data.copy(), array_cls.__name__: array_cls}
+
+
+def cases(sizes, pattern):
+    # (name, statement, types, kind and size) of the cases whose name matches pattern
+    for cls, array_cls in VECTORS + MATRICES:
+        table = vector_cases(cls, array_cls) if cls in VECTOR_CLASSES else matrix_cases(cls, array_cls)
+        for op, (python, array) in table.items():
+            for kind, expression in (("python", python), ("array", array)):
+                for size in sizes:
+                    name = f"{cls.__name__}/{op}/{kind}/{size}"
+                    if pattern is not None and not re.search(pattern, name):
+                        continue
+                    statement = f"for a, b, v in operands: {expression}" if kind == "python" and size > 1 \
+                        else expression
+                    yield name, statement, cls, array_cls, kind, size
+
+
+def measure(statement, variables, repeat, target):
+    # (best time of one execution of statement in seconds, executions per repeat), the number of executions
+    # being chosen for repeats of about target seconds
+    timer = timeit.Timer(statement, globals=variables)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= target / 5:
+            break
+        number *= 10
+    number = max(1, round(number * target / elapsed))
+    return min(timer.repeat(repeat=repeat, number=number)) / number, number
+
+
+def metadata(sizes):
+    try:
+        commit = subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+                                cwd=glslsyntax.__path__[0]).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {"format": FORMAT_VERSION, "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": commit, "python": sys.version.split()[0], "implementation": platform.python_implementation(),
+            "numpy": np.__version__, "machine": platform.machine(), "platform": platform.platform(), "sizes": sizes}
+
+
+def run(args):
+    repeat, target = (3, 0.02) if args.quick else (args.repeat, 0.1)
+    results = {}
+    selected = list(cases(args.sizes, args.k))
+    for i, (name, statement, cls, array_cls, kind, size) in enumerate(selected):
+        best, number = measure(statement, namespace(cls, array_cls, kind, size), repeat, target)
+        results[name] = {"ns": best / size * 1e9, "number": number, "repeat": repeat}
+        print(f"[{i + 1}/{len(selected)}] {name:<32} {best / size * 1e9:>12.1f} ns", file=sys.stderr)
+    report = {"meta": metadata(args.sizes), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1)
+    else:
+        json.dump(report, sys.stdout, indent=1)
+        print()
+
+
+def compare(args):
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    for report, path in ((before, args.before), (after, args.after)):
+        if report.get("meta", {}).get("format") != FORMAT_VERSION:
+            sys.exit(f"Invalid results file: {path} (expected the format {FORMAT_VERSION} of suite.py run)")
+    common = [name for name in before["results"] if name in after["results"]]
+    regressions = improvements = 0
+    print(f"{'case':<32} {'before (ns)':>12} {'after (ns)':>12} {'ratio':>7}")
+    for name in common:
+        old, new = before["results"][name]["ns"], after["results"][name]["ns"]
+        ratio = new / old
+        if ratio > 1 + args.threshold:
+            flag = "REGRESSION"
+            regressions += 1
+        elif ratio < 1 / (1 + args.threshold):
+            flag = "faster"
+            improvements += 1
+        else:
+            flag = ""
+        if flag or args.all:
+            print(f"{name:<32} {old:>12.1f} {new:>12.1f} {ratio:>7.2f} {flag}")
+    missing = [name for name in before["results"] if name not in after["results"]]
+    print(f"\n{len(common)} cases compared, {regressions} regressions and {improvements} improvements beyond "
+          f"{args.threshold:.0%}" + (f", {len(missing)} cases missing from {args.after}" if missing else ""))
+    for key in ("commit", "python", "numpy", "machine"):
+        if before["meta"].get(key) != after["meta"].get(key):
+            print(f"{key}: {before['meta'].get(key)} -> {after['meta'].get(key)}")
+    sys.exit(1 if regressions else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks of the vector and matrix operations of glslsyntax")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="time the operations and save the results as JSON")
+    run_parser.add_argument("-o", "--output", help="JSON file of the results, printed if omitted")
+    run_parser.add_argument("-k", help="only run the cases whose name matches this regular expression")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="batch sizes")
+    run_parser.add_argument("--repeat", type=int, default=5, help="repeats of each case, the best is kept")
+    run_parser.add_argument("--quick", action="store_true", help="shorter and noisier measures")
+    run_parser.set_defaults(handler=run)
+    compare_parser = commands.add_parser("compare", help="compare two runs and flag the regressions")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+    compare_parser.add_argument("--threshold", type=float, default=0.1,
+                                help="relative slowdown flagged as a regression (default 0.1)")
+    compare_parser.add_argument("--all", action="store_true", help="also list the unchanged cases")
+    compare_parser.set_defaults(handler=compare)
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
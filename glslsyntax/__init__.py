@@ -1,3 +1,51 @@
 from .vectors import *
 from .matrices import *
+from .quaternions import *
+from .lazy import *
+from .transforms import *
 
+# the modules below, which import numpy or are only needed by some programs, are imported on the first
+# use of one of their names (glslsyntax.vec3array, from glslsyntax import Struct, ...); their names
+# must match their __all__, which benchmarks/bench_import.py checks with the import time budget
+_LAZY_MODULES = {
+    "arrays": ("vec2array", "vec3array", "vec4array", "ivec2array", "ivec3array", "ivec4array", "uvec2array",
+               "uvec3array", "uvec4array", "bvec2array", "bvec3array", "bvec4array", "dvec2array", "dvec3array",
+               "dvec4array", "mat2array", "mat3array", "mat4array", "mat2x3array", "mat3x2array", "mat2x4array",
+               "mat4x2array", "mat3x4array", "mat4x3array", "dmat2array", "dmat3array", "dmat4array",
+               "dmat2x3array", "dmat3x2array", "dmat2x4array", "dmat4x2array", "dmat3x4array", "dmat4x3array",
+               "quatarray"),
+    "layout": ("Struct",),
+    "keys": ("VectorPool", "quantize"),
+    "spatial": ("Grid", "KDTree"),
+    "stream": ("VertexStream",),
+    "instrumentation": ("instrument", "addHook", "removeHook", "InstrumentReport"),
+    "kernels": ("vectorize",),
+}
+_LAZY_NAMES = {name: module for module, names in _LAZY_MODULES.items() for name in names}
+
+# import * only binds the names of the modules imported above, so that it does not import numpy; the
+# names of the lazy modules are imported by name (from glslsyntax import vec3array) or as attributes
+__all__ = [
+    "vec2", "vec3", "vec4", "ivec2", "ivec3", "ivec4", "uvec2", "uvec3", "uvec4", "bvec2", "bvec3", "bvec4",
+    "dvec2", "dvec3", "dvec4", "frozenvec2", "frozenvec3", "frozenvec4", "frozenivec2", "frozenivec3",
+    "frozenivec4", "frozenuvec2", "frozenuvec3", "frozenuvec4", "frozenbvec2", "frozenbvec3", "frozenbvec4",
+    "array_to_vec", "empty_vec",
+    "mat2", "mat3", "mat4", "mat2x3", "mat3x2", "mat2x4", "mat4x2", "mat3x4", "mat4x3", "dmat2", "dmat3", "dmat4",
+    "dmat2x3", "dmat3x2", "dmat2x4", "dmat4x2", "dmat3x4", "dmat4x3",
+    "quat", "lazy", "perspective", "ortho", "lookAt", "translate", "rotate", "scale",
+]
+
+
+def __getattr__(name: str):
+    module = _LAZY_NAMES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    namespace = vars(import_module(f"{__name__}.{module}"))
+    # bind all the names of the module at once, so that the next uses skip __getattr__
+    globals().update({n: namespace[n] for n in _LAZY_MODULES[module]})
+    return namespace[name]
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_NAMES))
@@ -0,0 +1,984 @@
+from itertools import product
+from typing import Self, Union, Any, List, Iterator, Tuple
+
+from .vectors import _vecBase, _ivecBase, _uvecBase, _bvecBase, _int32, _uint32, _ATTRIBUTES, _ATTRIBUTES_ALIASES, \
+    _BUFFER_FORMATS, _BYTE_ORDER, vec2, vec3, vec4, ivec2, ivec3, ivec4, uvec2, uvec3, uvec4, bvec2, bvec3, bvec4
+from .matrices import _matBase, mat2, mat3, mat4, mat2x3, mat3x2, mat2x4, mat4x2, mat3x4, mat4x3
+from .quaternions import quat, _SLERP_THRESHOLD
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+__all__ = ["vec2array", "vec3array", "vec4array", "ivec2array", "ivec3array", "ivec4array", "uvec2array", "uvec3array",
+           "uvec4array", "bvec2array", "bvec3array", "bvec4array", "dvec2array", "dvec3array", "dvec4array",
+           "mat2array", "mat3array", "mat4array", "mat2x3array", "mat3x2array", "mat2x4array", "mat4x2array",
+           "mat3x4array", "mat4x3array", "dmat2array", "dmat3array", "dmat4array", "dmat2x3array", "dmat3x2array",
+           "dmat2x4array", "dmat4x2array", "dmat3x4array", "dmat4x3array", "quatarray"]
+
+_Number = Union[int, float]
+_Vector = Union[vec2, vec3, vec4]
+_VectorArray = Union["vec2array", "vec3array", "vec4array"]
+_Matrix = Union[mat2, mat3, mat4, mat2x3, mat3x2, mat2x4, mat4x2, mat3x4, mat4x3]
+_MatrixArray = Union["mat2array", "mat3array", "mat4array", "mat2x3array", "mat3x2array", "mat2x4array",
+                     "mat4x2array", "mat3x4array", "mat4x3array"]
+
+
+def _require_numpy(name: str) -> None:
+    if np is None:
+        raise ImportError(f"{name} requires numpy, install it with `pip install glslsyntax[numpy]`")
+
+
+def _from_buffer(name: str, buffer: Any, offset: int, count: int, shape: tuple, format: str) -> Any:
+    # numpy array of shape (count, *shape) sharing the memory of buffer from offset bytes, count=-1 to
+    # use everything up to the end of buffer
+    _require_numpy(name)
+    if format not in _BUFFER_FORMATS:
+        raise ValueError(f"Invalid buffer format: {format!r} (expected one of {', '.join(_BUFFER_FORMATS)})")
+    items = -1 if count < 0 else count * int(np.prod(shape))
+    return np.frombuffer(buffer, dtype=_BYTE_ORDER + _BUFFER_FORMATS[format], count=items,
+                         offset=offset).reshape(-1, *shape)
+
+
+class _vecArrayBase(object):
+    # a batch of vectors stored as one contiguous (count, N) numpy array
+    __slots__ = ("data",)
+    __array_ufunc__ = None  # let numpy defer to the operators below
+    _N = 0
+    _VECTOR = _vecBase
+    # numpy type of the components
+    _DTYPE = np.float64 if np is not None else None
+
+    def _get_name(self) -> str:
+        return f"{self._VECTOR._PREFIX}{self._N}array"
+
+    def __init__(self, *args: Union[int, _Number, _Vector, _VectorArray, List[_Vector], Any]):
+        _require_numpy(self._get_name())
+        # vec3array(count): count zero vectors
+        if len(args) == 1 and isinstance(args[0], int):
+            self.data = np.zeros((args[0], self._N), dtype=self._DTYPE)
+            return
+        # vec3array([vec3, ...]) or vec3array(array of shape (count, 3))
+        if len(args) == 1 and isinstance(args[0], (list, tuple)):
+            self.data = np.array([v._components(v) if isinstance(v, _vecBase) else v for v in args[0]],
+                                 dtype=self._DTYPE).reshape(-1, self._N)
+            return
+        if len(args) == 1 and isinstance(args[0], np.ndarray) and args[0].ndim == 2:
+            if args[0].shape[1] != self._N:
+                raise ValueError(f"Invalid shape for {self._get_name()}: {args[0].shape} "
+                                 f"(expected (count, {self._N}))")
+            self.data = np.asarray(args[0], dtype=self._DTYPE)
+            return
+
+        # GLSL-like construction from other batches, per-vector component arrays, vectors and scalars
+        columns = []
+        count = None
+        for arg in args:
+            if isinstance(arg, _vecArrayBase):
+                columns.extend(arg.data.T)
+                count = len(arg)
+            elif isinstance(arg, np.ndarray) and arg.ndim == 1:
+                columns.append(arg)
+                count = len(arg)
+            elif isinstance(arg, _vecBase):
+                columns.extend(arg._components(arg))
+            elif isinstance(arg, (int, float, np.number)):
+                columns.append(arg)
+            else:
+                raise ValueError(f"Invalid type for {self._get_name()}: {type(arg)}")
+
+        if len(columns) != self._N:
+            raise ValueError(
+                f"Invalid number of components for {self._get_name()}: {len(columns)} (expected {self._N})")
+        if count is None:
+            raise ValueError(f"Cannot infer the number of vectors of {self._get_name()} from scalar arguments")
+        self.data = np.empty((count, self._N), dtype=self._DTYPE)
+        for i, column in enumerate(columns):
+            self.data[:, i] = column
+
+    @classmethod
+    def _wrap(cls, data: Any) -> Self:
+        # trusted constructor around an existing (count, N) array
+        res = object.__new__(cls)
+        res.data = data
+        return res
+
+    @classmethod
+    def fromBuffer(cls, buffer: Any, offset: int = 0, count: int = -1, format: Union[str, None] = None) -> Self:
+        # count packed vectors read from buffer (bytearray, mmap, ...) at offset bytes, without copy, with
+        # the same formats as the vectors
+        return cls._wrap(_from_buffer(f"{cls._VECTOR._PREFIX}{cls._N}array", buffer, offset, count, (cls._N,),
+                                      format or cls._VECTOR._FORMAT))
+
+    def __repr__(self) -> str:
+        return repr(self.data).replace("array(", f"{self._get_name()}(", 1)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __iter__(self) -> Iterator[_Vector]:
+        new = self._VECTOR._new
+        for row in self.data.tolist():
+            yield new(*row)
+
+    def __getitem__(self, key: Any) -> Union[_Vector, Self]:
+        if isinstance(key, (int, np.integer)):
+            return self._VECTOR._new(*self.data[key].tolist())
+        # slices and masks keep the batch type
+        return self._wrap(self.data[key])
+
+    def __setitem__(self, key: Any, value: Union[_Vector, _VectorArray]) -> None:
+        if isinstance(value, _vecBase):
+            if value.size != self._N:
+                raise ValueError(f"Invalid size for a vector: {value.size} (expected {self._N})")
+            self.data[key] = value._components(value)
+        elif isinstance(value, _vecArrayBase):
+            if value.size != self._N:
+                raise ValueError(f"Invalid size for a vector array: {value.size} (expected {self._N})")
+            self.data[key] = value.data
+        else:
+            self.data[key] = value
+
+    def __array__(self, dtype: Any = None, copy: Any = None) -> Any:
+        return self.data if dtype is None else self.data.astype(dtype)
+
+    def __eq__(self, other: Any) -> Any:
+        # one boolean per vector
+        if isinstance(other, _vecArrayBase):
+            if self._N != other._N:
+                return np.zeros(len(self), dtype=bool)
+            return np.all(self.data == other.data, axis=1)
+        if isinstance(other, _vecBase):
+            if self._N != other._N:
+                return np.zeros(len(self), dtype=bool)
+            return np.all(self.data == other._components(other), axis=1)
+        return NotImplemented
+
+    def __ne__(self, other: Any) -> Any:
+        res = self.__eq__(other)
+        if res is NotImplemented:
+            return res
+        return ~res
+
+    def _operands(self, other: Any) -> Any:
+        # align self and other for a component-wise operation, with the width of the smallest one
+        if isinstance(other, _vecArrayBase):
+            n = min(self._N, other._N)
+            return self.data[:, :n], other.data[:, :n], n
+        elif isinstance(other, _vecBase):
+            n = min(self._N, other._N)
+            return self.data[:, :n], np.array(other._components(other)[:n]), n
+        elif isinstance(other, (int, float, np.number)):
+            return self.data, other, self._N
+        elif isinstance(other, np.ndarray) and other.ndim == 1:
+            # one scalar per vector
+            return self.data, other[:, None], self._N
+        return None
+
+    def _binary(self, other: Any, op: Any, reflected: bool = False) -> Union[_VectorArray, Any]:
+        operands = self._operands(other)
+        if operands is None:
+            return NotImplemented
+        a, b, n = operands
+        if reflected:
+            a, b = b, a
+        return self._FAMILY[n]._wrap(op(a, b))
+
+    def _inplace(self, other: Any, op: Any) -> Union[Self, Any]:
+        operands = self._operands(other)
+        if operands is None or operands[2] != self._N:
+            return NotImplemented
+        op(self.data, operands[1], out=self.data)
+        return self
+
+    def __add__(self, other: Any) -> _VectorArray:
+        return self._binary(other, np.add)
+
+    def __radd__(self, other: Any) -> _VectorArray:
+        return self._binary(other, np.add, True)
+
+    def __iadd__(self, other: Any) -> Self:
+        return self._inplace(other, np.add)
+
+    def __sub__(self, other: Any) -> _VectorArray:
+        return self._binary(other, np.subtract)
+
+    def __rsub__(self, other: Any) -> _VectorArray:
+        return self._binary(other, np.subtract, True)
+
+    def __isub__(self, other: Any) -> Self:
+        return self._inplace(other, np.subtract)
+
+    def _transform(self, m: _matBase, row: bool) -> Union[_VectorArray, Any]:
+        # m * v for column vectors, v * m for row vectors; the rows of the numpy array of m are its columns
+        if self._FAMILY is not _ARRAY_TYPES:
+            return NotImplemented
+        n, columns = m.size
+        expected = n if row else columns
+        if self._N != expected:
+            raise ValueError(f"Invalid size for a vector array: {self._N} (expected {expected})")
+        a = np.array(m.getArray())
+        return _ARRAY_TYPES[columns if row else n]._wrap(self.data @ (a.T if row else a))
+
+    def __mul__(self, other: Any) -> _VectorArray:
+        if isinstance(other, _matBase):
+            return self._transform(other, True)
+        return self._binary(other, np.multiply)
+
+    def __rmul__(self, other: Any) -> _VectorArray:
+        if isinstance(other, _matBase):
+            return self._transform(other, False)
+        return self._binary(other, np.multiply, True)
+
+    def __imul__(self, other: Any) -> Self:
+        return self._inplace(other, np.multiply)
+
+    def __truediv__(self, other: Any) -> _VectorArray:
+        return self._binary(other, np.true_divide)
+
+    def __rtruediv__(self, other: Any) -> _VectorArray:
+        return self._binary(other, np.true_divide, True)
+
+    def __itruediv__(self, other: Any) -> Self:
+        return self._inplace(other, np.true_divide)
+
+    def __neg__(self) -> Self:
+        return self._wrap(-self.data)
+
+    @property
+    def size(self) -> int:
+        return self._N
+
+    @property
+    def magnitude(self) -> Any:
+        return np.sqrt(np.einsum("ij,ij->i", self.data, self.data))
+
+    @property
+    def normal(self) -> Self:
+        # return new vectors without modifying the original ones
+        return self._wrap(self.data / self.magnitude[:, None])
+
+    def dot(self, other: Union[_Vector, _VectorArray]) -> Any:
+        a, b, _ = self._operands(other)
+        return np.einsum("ij,ij->i", a, np.broadcast_to(b, a.shape))
+
+    def normalize(self) -> Self:
+        # modify the vectors in place
+        self.data /= self.magnitude[:, None]
+        return self
+
+    def distance(self, other: Union[_Vector, _VectorArray]) -> Any:
+        return (self - other).magnitude
+
+    def tolist(self) -> List[_Vector]:
+        return list(self)
+
+    def getArray(self) -> List[List[_Number]]:
+        return self.data.tolist()
+
+
+def _make_component(i: int) -> property:
+    # a single component reads as a writable view over the batch
+    def fget(self):
+        return self.data[:, i]
+
+    def fset(self, value):
+        self.data[:, i] = value
+
+    return property(fget, fset)
+
+
+def _make_swizzle(indices: tuple, target: type) -> property:
+    indices = list(indices)
+
+    def fget(self):
+        return target._wrap(self.data[:, indices])
+
+    # GLSL only allows writing to swizzles without repeated components
+    if len(set(indices)) != len(indices):
+        return property(fget)
+
+    def fset(self, value):
+        if not isinstance(value, (target, target._VECTOR)):
+            raise ValueError(f"Invalid value for swizzle: {value!r} (expected vec{len(indices)} or "
+                             f"vec{len(indices)}array)")
+        self.data[:, indices] = value.data if isinstance(value, _vecArrayBase) else value._components(value)
+
+    return property(fget, fset)
+
+
+def _install_swizzles(cls: type) -> None:
+    for i in range(cls._N):
+        component = _make_component(i)
+        setattr(cls, _ATTRIBUTES[i], component)
+        setattr(cls, _ATTRIBUTES_ALIASES[i], component)
+    for n, target in cls._FAMILY.items():
+        for indices in product(range(cls._N), repeat=n):
+            swizzle = _make_swizzle(indices, target)
+            setattr(cls, "".join(_ATTRIBUTES[i] for i in indices), swizzle)
+            setattr(cls, "".join(_ATTRIBUTES_ALIASES[i] for i in indices), swizzle)
+
+
+class vec2array(_vecArrayBase):
+    __slots__ = ()
+    _N = 2
+    _VECTOR = vec2
+
+
+class vec3array(_vecArrayBase):
+    __slots__ = ()
+    _N = 3
+    _VECTOR = vec3
+
+    def cross(self, other: Union[vec3, Self]) -> Self:
+        # cross product of each pair of vectors
+        b = other.data if isinstance(other, vec3array) else np.array(other._components(other))
+        return vec3array._wrap(np.cross(self.data, b))
+
+
+class vec4array(_vecArrayBase):
+    __slots__ = ()
+    _N = 4
+    _VECTOR = vec4
+
+
+_ARRAY_TYPES = {2: vec2array, 3: vec3array, 4: vec4array}
+
+
+class _ivecArrayBase(_vecArrayBase):
+    # a batch of integer vectors as an int32 (or uint32) array, the arithmetic wraps around like the
+    # vectors; only integers and vectors of the same family are accepted as operands
+    __slots__ = ()
+    _VECTOR = _ivecBase
+    _DTYPE = np.int32 if np is not None else None
+    # conversion of the Python integers, wrapped around to 32 bits like the components of the vectors
+    _WRAP = staticmethod(_int32)
+
+    def _operands(self, other: Any) -> Any:
+        if isinstance(other, (_vecBase, _vecArrayBase)):
+            family = other._VECTOR if isinstance(other, _vecArrayBase) else type(other)
+            if family._PREFIX != self._VECTOR._PREFIX:
+                return None
+        elif isinstance(other, (float, np.floating)) or (isinstance(other, np.ndarray) and other.dtype.kind == "f"):
+            return None
+        operands = super()._operands(other)
+        if operands is None:
+            return None
+        # the other operand takes the type of the batch, so that numpy does not promote the result to int64
+        a, b, n = operands
+        if isinstance(other, int):
+            b = self._DTYPE(self._WRAP(other))
+        elif not isinstance(other, _vecArrayBase):
+            b = np.asarray(b).astype(self._DTYPE, copy=False)
+        return a, b, n
+
+    def _check_divisor(self, b: Any) -> None:
+        if np.any(b == 0):
+            raise ZeroDivisionError("division by zero")
+
+    def _divide(self, a: Any, b: Any, out: Any = None) -> Any:
+        # GLSL integer division, truncated towards zero for ivec
+        self._check_divisor(b)
+        # out can be a, so the quotient is corrected in a temporary before it is written
+        with np.errstate(over="ignore"):
+            q = np.floor_divide(a, b)
+        q += (q < 0) & (q * b != a)
+        if out is None:
+            return q
+        out[...] = q
+        return out
+
+    def _remainder(self, a: Any, b: Any, out: Any = None) -> Any:
+        self._check_divisor(b)
+        return np.fmod(a, b, out=out)
+
+    def __truediv__(self, other: Any) -> Self:
+        return self._binary(other, self._divide)
+
+    def __rtruediv__(self, other: Any) -> Self:
+        return self._binary(other, self._divide, True)
+
+    def __itruediv__(self, other: Any) -> Self:
+        return self._inplace(other, self._divide)
+
+    def __mod__(self, other: Any) -> Self:
+        return self._binary(other, self._remainder)
+
+    def __rmod__(self, other: Any) -> Self:
+        return self._binary(other, self._remainder, True)
+
+    def __imod__(self, other: Any) -> Self:
+        return self._inplace(other, self._remainder)
+
+    def __and__(self, other: Any) -> Self:
+        return self._binary(other, np.bitwise_and)
+
+    def __rand__(self, other: Any) -> Self:
+        return self._binary(other, np.bitwise_and, True)
+
+    def __or__(self, other: Any) -> Self:
+        return self._binary(other, np.bitwise_or)
+
+    def __ror__(self, other: Any) -> Self:
+        return self._binary(other, np.bitwise_or, True)
+
+    def __xor__(self, other: Any) -> Self:
+        return self._binary(other, np.bitwise_xor)
+
+    def __rxor__(self, other: Any) -> Self:
+        return self._binary(other, np.bitwise_xor, True)
+
+    def __lshift__(self, other: Any) -> Self:
+        return self._binary(other, np.left_shift)
+
+    def __rshift__(self, other: Any) -> Self:
+        return self._binary(other, np.right_shift)
+
+    def __invert__(self) -> Self:
+        return self._wrap(~self.data)
+
+
+class _uvecArrayBase(_ivecArrayBase):
+    __slots__ = ()
+    _VECTOR = _uvecBase
+    _DTYPE = np.uint32 if np is not None else None
+    _WRAP = staticmethod(_uint32)
+
+    def _divide(self, a: Any, b: Any, out: Any = None) -> Any:
+        self._check_divisor(b)
+        return np.floor_divide(a, b, out=out)
+
+    def _remainder(self, a: Any, b: Any, out: Any = None) -> Any:
+        self._check_divisor(b)
+        return np.remainder(a, b, out=out)
+
+
+class _bvecArrayBase(_vecArrayBase):
+    # a batch of boolean vectors, the results of the batched comparisons of glslsyntax.functions
+    __slots__ = ()
+    _VECTOR = _bvecBase
+    _DTYPE = np.bool_ if np is not None else None
+
+    def _operands(self, other: Any) -> Any:
+        # no arithmetic
+        return None
+
+    def __bool__(self) -> bool:
+        raise TypeError(f"The truth value of a {self._get_name()} is ambiguous, use any() or all()")
+
+
+class ivec2array(_ivecArrayBase):
+    __slots__ = ()
+    _N = 2
+    _VECTOR = ivec2
+
+
+class ivec3array(_ivecArrayBase):
+    __slots__ = ()
+    _N = 3
+    _VECTOR = ivec3
+
+
+class ivec4array(_ivecArrayBase):
+    __slots__ = ()
+    _N = 4
+    _VECTOR = ivec4
+
+
+class uvec2array(_uvecArrayBase):
+    __slots__ = ()
+    _N = 2
+    _VECTOR = uvec2
+
+
+class uvec3array(_uvecArrayBase):
+    __slots__ = ()
+    _N = 3
+    _VECTOR = uvec3
+
+
+class uvec4array(_uvecArrayBase):
+    __slots__ = ()
+    _N = 4
+    _VECTOR = uvec4
+
+
+class bvec2array(_bvecArrayBase):
+    __slots__ = ()
+    _N = 2
+    _VECTOR = bvec2
+
+
+class bvec3array(_bvecArrayBase):
+    __slots__ = ()
+    _N = 3
+    _VECTOR = bvec3
+
+
+class bvec4array(_bvecArrayBase):
+    __slots__ = ()
+    _N = 4
+    _VECTOR = bvec4
+
+
+dvec2array, dvec3array, dvec4array = vec2array, vec3array, vec4array
+
+# batch types by size, for each family
+_vecArrayBase._FAMILY = _ARRAY_TYPES
+_ivecArrayBase._FAMILY = {2: ivec2array, 3: ivec3array, 4: ivec4array}
+_uvecArrayBase._FAMILY = {2: uvec2array, 3: uvec3array, 4: uvec4array}
+_bvecArrayBase._FAMILY = {2: bvec2array, 3: bvec3array, 4: bvec4array}
+
+for _family in (_ARRAY_TYPES, _ivecArrayBase._FAMILY, _uvecArrayBase._FAMILY, _bvecArrayBase._FAMILY):
+    for _cls in _family.values():
+        _install_swizzles(_cls)
+
+
+class _matArrayBase(object):
+    # a stack of matrices stored as one contiguous (count, M, N) numpy array: like the matrices, each
+    # matrix is M columns of N components, so data[k] is laid out as GLSL does in memory
+    __slots__ = ("data",)
+    __array_ufunc__ = None  # let numpy defer to the operators below
+    _N = 0
+    _M = 0
+    _MATRIX = _matBase
+
+    def _get_name(self) -> str:
+        return f"{self._MATRIX.__name__}array"
+
+    def __init__(self, *args: Union[int, List[_Matrix], Any]):
+        _require_numpy(self._get_name())
+        if len(args) != 1:
+            raise ValueError(f"Invalid number of arguments for {self._get_name()}: {len(args)} (expected 1)")
+        arg = args[0]
+        if isinstance(arg, int):
+            # mat4array(count): count identity matrices, like mat4(1)
+            self.data = np.zeros((arg, self._M, self._N))
+            for i in range(min(self._N, self._M)):
+                self.data[:, i, i] = 1
+        elif isinstance(arg, (list, tuple)):
+            self.data = np.array([m.getArray() if isinstance(m, _matBase) else m for m in arg],
+                                 dtype=float).reshape(-1, self._M, self._N)
+        elif isinstance(arg, np.ndarray) and arg.ndim == 3:
+            if arg.shape[1:] != (self._M, self._N):
+                raise ValueError(f"Invalid shape for {self._get_name()}: {arg.shape} "
+                                 f"(expected (count, {self._M}, {self._N}))")
+            self.data = np.asarray(arg, dtype=float)
+        else:
+            raise ValueError(f"Invalid type for {self._get_name()}: {type(arg)}")
+
+    @classmethod
+    def _wrap(cls, data: Any) -> Self:
+        # trusted constructor around an existing (count, M, N) array
+        res = object.__new__(cls)
+        res.data = data
+        return res
+
+    @classmethod
+    def fromBuffer(cls, buffer: Any, offset: int = 0, count: int = -1, format: str = "d") -> Self:
+        # count packed column-major matrices read from buffer at offset bytes, without copy
+        return cls._wrap(_from_buffer(f"{cls._MATRIX.__name__}array", buffer, offset, count, (cls._M, cls._N),
+                                      format))
+
+    def __repr__(self) -> str:
+        return repr(self.data).replace("array(", f"{self._get_name()}(", 1)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __iter__(self) -> Iterator[_Matrix]:
+        for k in range(len(self.data)):
+            yield self[k]
+
+    def __getitem__(self, key: Any) -> Union[_Matrix, Self]:
+        if isinstance(key, (int, np.integer)):
+            return self._MATRIX(self.data[key].ravel().tolist())
+        # slices and masks keep the stack type
+        return self._wrap(self.data[key])
+
+    def __setitem__(self, key: Any, value: Union[_Matrix, _MatrixArray]) -> None:
+        if isinstance(value, (_matBase, _matArrayBase)):
+            if value.size != self.size:
+                raise ValueError(f"Invalid size for a matrix: {value.size} (expected {self.size})")
+            value = value.getArray() if isinstance(value, _matBase) else value.data
+        self.data[key] = value
+
+    def __array__(self, dtype: Any = None, copy: Any = None) -> Any:
+        return self.data if dtype is None else self.data.astype(dtype)
+
+    def __eq__(self, other: Any) -> Any:
+        # one boolean per matrix
+        if isinstance(other, (_matBase, _matArrayBase)):
+            if self.size != other.size:
+                return np.zeros(len(self), dtype=bool)
+            b = np.array(other.getArray()) if isinstance(other, _matBase) else other.data
+            return np.all(self.data == b, axis=(1, 2))
+        return NotImplemented
+
+    def __ne__(self, other: Any) -> Any:
+        res = self.__eq__(other)
+        if res is NotImplemented:
+            return res
+        return ~res
+
+    def _operand(self, other: Any) -> Any:
+        # other as an array broadcastable against self.data for a component-wise operation
+        if isinstance(other, (_matBase, _matArrayBase)):
+            if self.size != other.size:
+                raise ValueError(f"Invalid size for a matrix: {other.size} (expected {self.size})")
+            return np.array(other.getArray()) if isinstance(other, _matBase) else other.data
+        elif isinstance(other, (int, float, np.number)):
+            return other
+        elif isinstance(other, np.ndarray) and other.ndim == 1:
+            # one scalar per matrix
+            return other[:, None, None]
+        return None
+
+    def _binary(self, other: Any, op: Any, reflected: bool = False) -> Union[Self, Any]:
+        b = self._operand(other)
+        if b is None:
+            return NotImplemented
+        return self._wrap(op(b, self.data) if reflected else op(self.data, b))
+
+    def __add__(self, other: Any) -> Self:
+        return self._binary(other, np.add)
+
+    def __radd__(self, other: Any) -> Self:
+        return self._binary(other, np.add, True)
+
+    def __sub__(self, other: Any) -> Self:
+        return self._binary(other, np.subtract)
+
+    def __rsub__(self, other: Any) -> Self:
+        return self._binary(other, np.subtract, True)
+
+    def __truediv__(self, other: Any) -> Self:
+        # component-wise, like the matrices
+        return self._binary(other, np.true_divide)
+
+    def __rtruediv__(self, other: Any) -> Self:
+        return self._binary(other, np.true_divide, True)
+
+    def __neg__(self) -> Self:
+        return self._wrap(-self.data)
+
+    def __mul__(self, other: Any) -> Union[_MatrixArray, _VectorArray]:
+        # matrix * matrix: the result has the rows of self and the columns of other
+        if isinstance(other, (_matBase, _matArrayBase)):
+            n, m = other.size
+            if self._M != n:
+                raise ValueError(f"Invalid size for a matrix: {other.size} (expected ({self._M}, _))")
+            b = np.array(other.getArray()) if isinstance(other, _matBase) else other.data
+            # column j of the product is self * (column j of other)
+            return _MATRIX_ARRAY_TYPES[(self._N, m)]._wrap(np.matmul(b, self.data))
+        # matrix * column vector
+        elif isinstance(other, (_vecBase, _vecArrayBase)):
+            if other.size != self._M:
+                raise ValueError(f"Invalid size for a vector: {other.size} (expected {self._M})")
+            if isinstance(other, _vecBase):
+                return _ARRAY_TYPES[self._N]._wrap(np.einsum("m,kmn->kn", other._components(other), self.data))
+            return _ARRAY_TYPES[self._N]._wrap(np.einsum("km,kmn->kn", other.data, self.data))
+        elif isinstance(other, (int, float, np.number)) or (isinstance(other, np.ndarray) and other.ndim == 1):
+            return self._binary(other, np.multiply)
+        return NotImplemented
+
+    def __rmul__(self, other: Any) -> Union[_MatrixArray, _VectorArray]:
+        # matrix * matrix with a single matrix on the left
+        if isinstance(other, _matBase):
+            n, m = other.size
+            if m != self._N:
+                raise ValueError(f"Invalid size for a matrix: {other.size} (expected (_, {self._N}))")
+            return _MATRIX_ARRAY_TYPES[(n, self._M)]._wrap(np.matmul(self.data, np.array(other.getArray())))
+        # row vector * matrix
+        elif isinstance(other, (_vecBase, _vecArrayBase)):
+            if other.size != self._N:
+                raise ValueError(f"Invalid size for a vector: {other.size} (expected {self._N})")
+            if isinstance(other, _vecBase):
+                return _ARRAY_TYPES[self._M]._wrap(np.einsum("kmn,n->km", self.data, other._components(other)))
+            return _ARRAY_TYPES[self._M]._wrap(np.einsum("kmn,kn->km", self.data, other.data))
+        return self._binary(other, np.multiply, True)
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self._N, self._M
+
+    @property
+    def T(self) -> _MatrixArray:
+        # return a new stack of transposed matrices
+        return _MATRIX_ARRAY_TYPES[(self._M, self._N)]._wrap(np.ascontiguousarray(self.data.transpose(0, 2, 1)))
+
+    def transpose(self) -> Self:
+        # modify the matrices in place by transposing them
+        if self._N != self._M:
+            raise ValueError("In place transpose is only defined for square matrices")
+        self.data = self.T.data
+        return self
+
+    @property
+    def det(self) -> Any:
+        if self._N != self._M:
+            raise ValueError("Determinant is only defined for square matrices")
+        # the determinant of the stored transpose is the same
+        return np.linalg.det(self.data)
+
+    @property
+    def Inv(self) -> Self:
+        if self._N != self._M:
+            raise ValueError("Inverse is only defined for square matrices")
+        # inv(A) stored transposed is inv(A^T)
+        return self._wrap(np.linalg.inv(self.data))
+
+    def invert(self) -> Self:
+        self.data = self.Inv.data
+        return self
+
+    def tolist(self) -> List[_Matrix]:
+        return list(self)
+
+    def getArray(self) -> List[List[List[_Number]]]:
+        return self.data.tolist()
+
+
+class mat2array(_matArrayBase):
+    __slots__ = ()
+    _N = 2
+    _M = 2
+    _MATRIX = mat2
+
+
+class mat3array(_matArrayBase):
+    __slots__ = ()
+    _N = 3
+    _M = 3
+    _MATRIX = mat3
+
+
+class mat4array(_matArrayBase):
+    __slots__ = ()
+    _N = 4
+    _M = 4
+    _MATRIX = mat4
+
+
+class mat2x3array(_matArrayBase):
+    __slots__ = ()
+    _N = 2
+    _M = 3
+    _MATRIX = mat2x3
+
+
+class mat3x2array(_matArrayBase):
+    __slots__ = ()
+    _N = 3
+    _M = 2
+    _MATRIX = mat3x2
+
+
+class mat2x4array(_matArrayBase):
+    __slots__ = ()
+    _N = 2
+    _M = 4
+    _MATRIX = mat2x4
+
+
+class mat4x2array(_matArrayBase):
+    __slots__ = ()
+    _N = 4
+    _M = 2
+    _MATRIX = mat4x2
+
+
+class mat3x4array(_matArrayBase):
+    __slots__ = ()
+    _N = 3
+    _M = 4
+    _MATRIX = mat3x4
+
+
+class mat4x3array(_matArrayBase):
+    __slots__ = ()
+    _N = 4
+    _M = 3
+    _MATRIX = mat4x3
+
+
+_MATRIX_ARRAY_TYPES = {(cls._N, cls._M): cls for cls in (mat2array, mat3array, mat4array, mat2x3array, mat3x2array,
+                                                           mat2x4array, mat4x2array, mat3x4array, mat4x3array)}
+
+dmat2array, dmat3array, dmat4array = mat2array, mat3array, mat4array
+dmat2x3array, dmat3x2array, dmat2x4array, dmat4x2array, dmat3x4array, dmat4x3array = \
+    mat2x3array, mat3x2array, mat2x4array, mat4x2array, mat3x4array, mat4x3array
+
+
+def _quaternions(value: Any) -> Any:
+    # (count, 4) or (4,) data of quaternions, None for anything else
+    if isinstance(value, quatarray):
+        return value.data
+    if isinstance(value, quat):
+        return np.array(value._components(value))
+    return None
+
+
+def _hamilton(a: Any, b: Any) -> Any:
+    ax, ay, az, aw = np.moveaxis(a, -1, 0)
+    bx, by, bz, bw = np.moveaxis(b, -1, 0)
+    return np.stack((aw * bx + ax * bw + ay * bz - az * by,
+                     aw * by - ax * bz + ay * bw + az * bx,
+                     aw * bz + ax * by - ay * bx + az * bw,
+                     aw * bw - ax * bx - ay * by - az * bz), axis=-1)
+
+
+class quatarray(vec4array):
+    # a batch of rotation quaternions, like the joints of a skeleton, with the operations of quat
+    __slots__ = ()
+    _VECTOR = quat
+
+    def __init__(self, *args: Union[int, List[quat], Any]):
+        # quatarray(count): count identity rotations
+        if len(args) == 1 and isinstance(args[0], int):
+            _require_numpy("quatarray")
+            self.data = np.zeros((args[0], 4))
+            self.data[:, 3] = 1
+            return
+        super().__init__(*args)
+
+    @classmethod
+    def fromAxisAngle(cls, axes: Union[vec3, vec3array], angles: Any) -> Self:
+        # one rotation per axis and angle (in radians), the axes do not need to be normalized
+        _require_numpy("quatarray")
+        axes = axes.data if isinstance(axes, vec3array) else np.array(axes._components(axes))
+        half = np.asarray(angles, dtype=float)[..., None] / 2
+        xyz = axes / np.linalg.norm(axes, axis=-1, keepdims=True) * np.sin(half)
+        w = np.broadcast_to(np.cos(half), xyz.shape[:-1] + (1,))
+        return cls._wrap(np.concatenate((xyz, w), axis=-1).reshape(-1, 4))
+
+    @classmethod
+    def fromMatrix(cls, m: Union[mat3array, mat4array]) -> Self:
+        # rotations of the upper-left 3x3 parts of the matrices, which should be orthonormal
+        if not isinstance(m, (mat3array, mat4array)):
+            raise ValueError(f"Invalid matrices for quatarray: {type(m).__name__} (expected mat3array or mat4array)")
+        d = m.data
+        # aCR is column C and row R, as in quat.fromMatrix
+        a00, a01, a02 = d[:, 0, 0], d[:, 0, 1], d[:, 0, 2]
+        a10, a11, a12 = d[:, 1, 0], d[:, 1, 1], d[:, 1, 2]
+        a20, a21, a22 = d[:, 2, 0], d[:, 2, 1], d[:, 2, 2]
+        trace = a00 + a11 + a22
+        res = np.empty((len(d), 4))
+        # the same four cases as quat.fromMatrix, each computed on its own subset
+        cases = [trace > 0]
+        cases.append(~cases[0] & (a00 > a11) & (a00 > a22))
+        cases.append(~cases[0] & ~cases[1] & (a11 > a22))
+        cases.append(~(cases[0] | cases[1] | cases[2]))
+        for i, k in enumerate(cases):
+            if not k.any():
+                continue
+            b00, b01, b02, b10, b11, b12, b20, b21, b22 = (a[k] for a in (a00, a01, a02, a10, a11, a12,
+                                                                          a20, a21, a22))
+            if i == 0:
+                s = 0.5 / np.sqrt(trace[k] + 1.0)
+                res[k] = np.stack(((b12 - b21) * s, (b20 - b02) * s, (b01 - b10) * s, 0.25 / s), axis=-1)
+            elif i == 1:
+                s = 0.5 / np.sqrt(1.0 + b00 - b11 - b22)
+                res[k] = np.stack((0.25 / s, (b10 + b01) * s, (b20 + b02) * s, (b12 - b21) * s), axis=-1)
+            elif i == 2:
+                s = 0.5 / np.sqrt(1.0 + b11 - b00 - b22)
+                res[k] = np.stack(((b10 + b01) * s, 0.25 / s, (b21 + b12) * s, (b20 - b02) * s), axis=-1)
+            else:
+                s = 0.5 / np.sqrt(1.0 + b22 - b00 - b11)
+                res[k] = np.stack(((b20 + b02) * s, (b21 + b12) * s, 0.25 / s, (b01 - b10) * s), axis=-1)
+        return cls._wrap(res)
+
+    def __repr__(self) -> str:
+        return repr(self.data).replace("array(", "quatarray(", 1)
+
+    def _rotate(self, v: Any) -> Any:
+        # v + w * t + cross(q.xyz, t) with t = 2 * cross(q.xyz, v)
+        u, w = self.data[:, :3], self.data[:, 3:]
+        t = 2.0 * np.cross(u, v)
+        return v + w * t + np.cross(u, t)
+
+    def __mul__(self, other: Any) -> Any:
+        # same products as quat: quaternions, rotation of vectors and component-wise with scalars
+        q = _quaternions(other)
+        if q is not None:
+            return quatarray._wrap(_hamilton(self.data, q))
+        if isinstance(other, (vec3, vec3array)):
+            v = other.data if isinstance(other, vec3array) else np.array(other._components(other))
+            return vec3array._wrap(self._rotate(v))
+        if isinstance(other, (vec4, vec4array)):
+            v = other.data if isinstance(other, vec4array) else np.array(other._components(other))
+            w = np.broadcast_to(v[..., 3:], (len(self.data), 1))
+            return vec4array._wrap(np.concatenate((self._rotate(v[..., :3]), w), axis=-1))
+        if isinstance(other, (int, float, np.number)):
+            return self._wrap(self.data * other)
+        if isinstance(other, np.ndarray) and other.ndim == 1:
+            return self._wrap(self.data * other[:, None])
+        return NotImplemented
+
+    def __rmul__(self, other: Any) -> Any:
+        if isinstance(other, quat):
+            return quatarray._wrap(_hamilton(np.array(other._components(other)), self.data))
+        return self.__mul__(other)
+
+    def __imul__(self, other: Any) -> Self:
+        res = self.__mul__(other)
+        if not isinstance(res, quatarray):
+            return NotImplemented
+        self.data[:] = res.data
+        return self
+
+    @property
+    def conjugate(self) -> Self:
+        return self._wrap(self.data * (-1.0, -1.0, -1.0, 1.0))
+
+    @property
+    def Inv(self) -> Self:
+        return self._wrap(self.data * (-1.0, -1.0, -1.0, 1.0) / np.einsum("ij,ij->i", self.data, self.data)[:, None])
+
+    def invert(self) -> Self:
+        self.data[:] = self.Inv.data
+        return self
+
+    def nlerp(self, other: Union[quat, Self], t: Any) -> Self:
+        # normalized linear interpolation along the shortest path, t is a number or one per quaternion
+        b = _quaternions(other)
+        t = np.asarray(t, dtype=float)[..., None]
+        b = np.where((self.data * b).sum(-1)[:, None] < 0, -b, b)
+        res = self.data + (b - self.data) * t
+        return self._wrap(res / np.linalg.norm(res, axis=-1, keepdims=True))
+
+    def slerp(self, other: Union[quat, Self], t: Any) -> Self:
+        # spherical linear interpolation along the shortest path, t is a number or one per quaternion
+        a, b = self.data, _quaternions(other)
+        t = np.asarray(t, dtype=float)[..., None]
+        d = (a * b).sum(-1)[:, None]
+        b = np.where(d < 0, -b, b)
+        d = np.abs(d)
+        close = d > _SLERP_THRESHOLD
+        theta = np.arccos(np.minimum(d, 1.0))
+        s = np.where(close, 1.0, np.sin(theta))
+        wa = np.where(close, 1.0 - t, np.sin((1.0 - t) * theta) / s)
+        wb = np.where(close, t, np.sin(t * theta) / s)
+        res = wa * a + wb * b
+        # the linear interpolations are normalized like nlerp
+        res = np.where(close, res / np.linalg.norm(res, axis=-1, keepdims=True), res)
+        return self._wrap(res)
+
+    def _rotations(self) -> tuple:
+        x, y, z, w = self.data.T
+        xx, yy, zz = x * x, y * y, z * z
+        xy, xz, yz = x * y, x * z, y * z
+        wx, wy, wz = w * x, w * y, w * z
+        return (1.0 - 2.0 * (yy + zz), 2.0 * (xy + wz), 2.0 * (xz - wy),
+                2.0 * (xy - wz), 1.0 - 2.0 * (xx + zz), 2.0 * (yz + wx),
+                2.0 * (xz + wy), 2.0 * (yz - wx), 1.0 - 2.0 * (xx + yy))
+
+    def toMat3(self) -> mat3array:
+        return mat3array._wrap(np.stack(self._rotations(), axis=-1).reshape(-1, 3, 3))
+
+    def toMat4(self) -> mat4array:
+        res = np.zeros((len(self.data), 4, 4))
+        res[:, :3, :3] = np.stack(self._rotations(), axis=-1).reshape(-1, 3, 3)
+        res[:, 3, 3] = 1
+        return mat4array._wrap(res)
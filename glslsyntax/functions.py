@@ -0,0 +1,569 @@
+import builtins
+import math
+from array import array
+from operator import mul
+from typing import Union, Any, Callable
+
+from .vectors import _vecBase, _ivecBase, _uvecBase, _bvecBase, _SCALARS, _unroll, _int32, _uint32, vec2, vec3, vec4
+from .matrices import _matBase, _MATRIX_TYPES
+from .arrays import _vecArrayBase, _ivecArrayBase, _uvecArrayBase, _bvecArrayBase, _matArrayBase, _ARRAY_TYPES, \
+    _MATRIX_ARRAY_TYPES, np
+from .kernels import _Symbol, _FUNCTIONS
+
+# GLSL built-in functions; min, max, abs, pow, any and all shadow the Python built-ins, so this module is not
+# imported by `from glslsyntax import *`, use `from glslsyntax.functions import mix, clamp` or
+# `import glslsyntax.functions as glsl` instead
+__all__ = ["radians", "degrees", "sin", "cos", "tan", "asin", "acos", "atan", "pow", "exp", "log", "exp2", "log2",
+           "sqrt", "inversesqrt", "abs", "sign", "floor", "ceil", "fract", "mod", "min", "max", "clamp", "mix",
+           "step", "smoothstep", "length", "distance", "dot", "cross", "normalize", "faceforward", "reflect",
+           "refract", "matrixCompMult", "outerProduct", "transpose", "determinant", "inverse", "lessThan",
+           "lessThanEqual", "greaterThan", "greaterThanEqual", "equal", "notEqual", "any", "all", "not_"]
+
+_Number = Union[int, float]
+_Vector = Union[vec2, vec3, vec4]
+
+_VECTOR_TYPES = {2: vec2, 3: vec3, 4: vec4}
+_BATCH_TYPES = (_vecArrayBase, _matArrayBase) + ((np.ndarray,) if np is not None else ())
+
+# vector and array classes by size for each family, the family of a vector being its _PREFIX
+_VECTOR_FAMILIES = {base._PREFIX: base._FAMILY for base in (_vecBase, _ivecBase, _uvecBase, _bvecBase)}
+_ARRAY_FAMILIES = {base._FAMILY[2]._VECTOR._PREFIX: base._FAMILY
+                   for base in (_vecArrayBase, _ivecArrayBase, _uvecArrayBase, _bvecArrayBase)}
+
+
+def _scalar_sign(x: _Number) -> float:
+    return float((x > 0) - (x < 0))
+
+
+def _scalar_floor(x: _Number) -> float:
+    return float(math.floor(x))
+
+
+def _scalar_ceil(x: _Number) -> float:
+    return float(math.ceil(x))
+
+
+def _scalar_smoothstep(edge0: _Number, edge1: _Number, x: _Number) -> float:
+    t = builtins.min(builtins.max((x - edge0) / (edge1 - edge0), 0.0), 1.0)
+    return t * t * (3.0 - 2.0 * t)
+
+
+def _batched_smoothstep(edge0: Any, edge1: Any, x: Any) -> Any:
+    t = np.clip((x - edge0) / (edge1 - edge0), 0.0, 1.0)
+    return t * t * (3.0 - 2.0 * t)
+
+
+# names used by the formulas, for a single component and for numpy arrays
+_SCALAR_NAMESPACE = {"_sin": math.sin, "_cos": math.cos, "_tan": math.tan, "_asin": math.asin, "_acos": math.acos,
+                     "_atan": math.atan, "_exp": math.exp, "_log": math.log, "_log2": math.log2,
+                     "_sqrt": math.sqrt, "_abs": builtins.abs, "_sign": _scalar_sign, "_floor": _scalar_floor,
+                     "_ceil": _scalar_ceil, "_smoothstep": _scalar_smoothstep}
+_BATCHED_NAMESPACE = {} if np is None else {
+    "_sin": np.sin, "_cos": np.cos, "_tan": np.tan, "_asin": np.arcsin, "_acos": np.arccos, "_atan": np.arctan,
+    "_exp": np.exp, "_log": np.log, "_log2": np.log2, "_sqrt": np.sqrt, "_abs": np.abs, "_sign": np.sign,
+    "_floor": np.floor, "_ceil": np.ceil, "_min": np.minimum, "_max": np.maximum, "_where": np.where,
+    "_smoothstep": _batched_smoothstep}
+
+# component-wise functions: parameters, formula of one component and, when it differs, the formula
+# over numpy arrays
+_COMPONENTWISE = {
+    "radians": ("x", "{0} * 0.017453292519943295", None),
+    "degrees": ("x", "{0} * 57.29577951308232", None),
+    "sin": ("x", "_sin({0})", None),
+    "cos": ("x", "_cos({0})", None),
+    "tan": ("x", "_tan({0})", None),
+    "asin": ("x", "_asin({0})", None),
+    "acos": ("x", "_acos({0})", None),
+    "atan": ("x", "_atan({0})", None),
+    "pow": ("x, y", "{0} ** {1}", None),
+    "exp": ("x", "_exp({0})", None),
+    "log": ("x", "_log({0})", None),
+    "exp2": ("x", "2.0 ** {0}", None),
+    "log2": ("x", "_log2({0})", None),
+    "sqrt": ("x", "_sqrt({0})", None),
+    "inversesqrt": ("x", "1.0 / _sqrt({0})", None),
+    "abs": ("x", "_abs({0})", None),
+    "sign": ("x", "_sign({0})", None),
+    "floor": ("x", "_floor({0})", None),
+    "ceil": ("x", "_ceil({0})", None),
+    "fract": ("x", "{0} - _floor({0})", None),
+    "mod": ("x, y", "{0} - {1} * _floor({0} / {1})", None),
+    "min": ("x, y", "({1} if {1} < {0} else {0})", "_min({0}, {1})"),
+    "max": ("x, y", "({1} if {1} > {0} else {0})", "_max({0}, {1})"),
+    "clamp": ("x, minVal, maxVal", "({1} if {0} < {1} else {2} if {0} > {2} else {0})", "_min(_max({0}, {1}), {2})"),
+    "mix": ("x, y, a", "{0} * (1.0 - {2}) + {1} * {2}", None),
+    "step": ("edge, x", "(0.0 if {1} < {0} else 1.0)", "_where({1} < {0}, 0.0, 1.0)"),
+    "smoothstep": ("edge0, edge1, x", "_smoothstep({0}, {1}, {2})", None),
+    "lessThan": ("x, y", "{0} < {1}", None),
+    "lessThanEqual": ("x, y", "{0} <= {1}", None),
+    "greaterThan": ("x, y", "{0} > {1}", None),
+    "greaterThanEqual": ("x, y", "{0} >= {1}", None),
+    "equal": ("x, y", "{0} == {1}", None),
+    "notEqual": ("x, y", "{0} != {1}", None),
+}
+
+# the functions also defined for ivec and uvec, whose results are wrapped around to 32 bits
+_INTEGER_FUNCTIONS = {"abs", "sign", "min", "max", "clamp"}
+# the comparisons, whose results are bvec; only equal and notEqual are defined for bvec
+_RELATIONAL = {"lessThan", "lessThanEqual", "greaterThan", "greaterThanEqual", "equal", "notEqual"}
+
+_DISPATCH_TEMPLATE = """
+def {name}({params}):
+    plan = _plans.get(({types},))
+    if plan is None:
+        plan = _plan(_plans, {name!r}, ({params},))
+    return plan({params})
+"""
+
+# unrolled geometric functions of a vector class
+_GEOMETRIC_TEMPLATE = """
+def length(v):
+    return _sqrt({v.x * v.x +})
+
+def distance(a, b):
+    return _sqrt({(a.x - b.x) * (a.x - b.x) +})
+
+def dot(a, b):
+    return {a.x * b.x +}
+
+def normalize(v):
+    m = _sqrt({v.x * v.x +})
+    res = _object_new(cls)
+    {res.x = v.x / m}
+    return res
+
+def faceforward(n, i, nref):
+    res = _object_new(cls)
+    if ({nref.x * i.x +}) < 0.0:
+        {res.x = n.x}
+    else:
+        {res.x = -n.x}
+    return res
+
+def reflect(i, n):
+    d = 2.0 * ({n.x * i.x +})
+    res = _object_new(cls)
+    {res.x = i.x - d * n.x}
+    return res
+
+def refract(i, n, eta):
+    d = {n.x * i.x +}
+    k = 1.0 - eta * eta * (1.0 - d * d)
+    res = _object_new(cls)
+    if k < 0.0:
+        {res.x = 0.0}
+        return res
+    f = eta * d + _sqrt(k)
+    {res.x = eta * i.x - f * n.x}
+    return res
+"""
+
+
+def _scalar_refract(i: _Number, n: _Number, eta: _Number) -> float:
+    d = n * i
+    k = 1.0 - eta * eta * (1.0 - d * d)
+    if k < 0.0:
+        return 0.0
+    return eta * i - (eta * d + math.sqrt(k)) * n
+
+
+# the genType float versions
+_SCALAR_GEOMETRIC = {
+    "length": builtins.abs,
+    "distance": lambda a, b: builtins.abs(a - b),
+    "dot": mul,
+    "normalize": lambda v: math.copysign(1.0, v),
+    "faceforward": lambda n, i, nref: n if nref * i < 0.0 else -n,
+    "reflect": lambda i, n: i - 2.0 * n * i * n,
+    "refract": _scalar_refract,
+}
+
+
+def _make_geometric(cls: type) -> dict:
+    methods = {}
+    exec(_unroll(_GEOMETRIC_TEMPLATE, cls._N), {"_object_new": object.__new__, "cls": cls, "_sqrt": math.sqrt},
+         methods)
+    return methods
+
+
+# fast paths by name and by type of the first argument
+_GEOMETRIC = {name: {float: f, int: f} for name, f in _SCALAR_GEOMETRIC.items()}
+for _cls in _VECTOR_TYPES.values():
+    for _name, _f in _make_geometric(_cls).items():
+        _GEOMETRIC[_name][_cls] = _f
+_GEOMETRIC["cross"] = {vec3: vec3.cross}
+
+
+def _arg_kind(value: Any) -> str:
+    # "s" for a scalar, "v" for a vector, "m" for a matrix, "b" for a batch and "t" for a traced value
+    if isinstance(value, _Symbol):
+        return "t"
+    if isinstance(value, _SCALARS) or (np is not None and isinstance(value, np.number)):
+        return "s"
+    if isinstance(value, _vecBase):
+        return "v"
+    if isinstance(value, _matBase):
+        return "m"
+    if isinstance(value, _BATCH_TYPES):
+        return "b"
+    raise ValueError(f"Invalid type for a GLSL function: {type(value)}")
+
+
+def _width(value: Any) -> Union[int, None]:
+    # size of a vector, a batch of vectors or a traced vector, None for anything else
+    if isinstance(value, (_vecBase, _vecArrayBase)):
+        return value._N
+    if isinstance(value, _Symbol) and value._kind[0] == "v":
+        return value._kind[1]
+    return None
+
+
+def _family(value: Any) -> Union[str, None]:
+    # family of a vector or a batch of vectors ("vec", "ivec", "uvec" or "bvec"), None for anything else
+    if isinstance(value, _vecBase):
+        return value._PREFIX
+    if isinstance(value, _vecArrayBase):
+        return value._VECTOR._PREFIX
+    return None
+
+
+def _is_float(value: Any) -> bool:
+    # float scalar or array of float scalars, which integer vectors do not accept
+    if np is not None and isinstance(value, (np.floating, np.ndarray)):
+        return value.dtype.kind == "f"
+    return isinstance(value, float)
+
+
+def _numpy(value: Any) -> Any:
+    # numpy operand for a batched function: (count, N) or (N,) for vectors, (count, M, N) or (M, N) for
+    # matrices, scalars and arrays of scalars as they are
+    if isinstance(value, (_vecArrayBase, _matArrayBase)):
+        return value.data
+    if isinstance(value, _vecBase):
+        return np.array(value._components(value), dtype=float if value._PREFIX == "vec" else None)
+    if isinstance(value, _matBase):
+        return np.array(value._data, dtype=float).reshape(value._M, value._N)
+    return value
+
+
+def _vector_result(data: Any, arrays: dict = _ARRAY_TYPES) -> Any:
+    if data.ndim == 2:
+        if arrays is _ARRAY_TYPES:
+            return _ARRAY_TYPES[data.shape[1]]._wrap(data)
+        # back to the storage of the family, e.g. an ivec batch mixed with a Python int gives int64
+        cls = arrays[data.shape[1]]
+        return cls._wrap(data.astype(cls._DTYPE, copy=False))
+    return data
+
+
+def _trace(name: str, args: tuple, kind: tuple) -> _Symbol:
+    # record the call in a vectorized kernel, which calls the batched version of name
+    tracer = next(a._tracer for a in args if isinstance(a, _Symbol))
+    return tracer.emit(f"{name}({', '.join(map(tracer.ref, args))})", kind)
+
+
+def _plan(plans: dict, name: str, args: tuple) -> Callable:
+    # build the implementation of a component-wise function for the types of args: an unrolled function
+    # for scalars and vectors, a numpy one for batches; calls while tracing a kernel are not cached
+    # since the kinds of the traced values are not part of the key
+    params, formula, batched_formula = _COMPONENTWISE[name]
+    kinds = [_arg_kind(a) for a in args]
+    widths = {_width(a) for a in args} - {None}
+    if "m" in kinds or builtins.any(isinstance(a, _matArrayBase) or (isinstance(a, _Symbol) and a._kind[0] == "m")
+                           for a in args):
+        raise ValueError(f"Invalid operands for {name}: matrices are not supported")
+    if len(widths) > 1:
+        raise ValueError(f"Invalid operands for {name}: vectors of different sizes {sorted(widths)}")
+    n = widths.pop() if widths else None
+    families = {_family(a) for a in args} - {None}
+    if len(families) > 1:
+        raise ValueError(f"Invalid operands for {name}: vectors of different types "
+                         f"{', '.join(type(a).__name__ for a in args)}")
+    family = families.pop() if families else "vec"
+    if family == "bvec" and name not in ("equal", "notEqual"):
+        raise ValueError(f"Invalid operands for {name}: boolean vectors are not supported")
+    if family in ("ivec", "uvec"):
+        if name not in _INTEGER_FUNCTIONS and name not in _RELATIONAL:
+            raise ValueError(f"Invalid operands for {name}: integer vectors are not supported")
+        if builtins.any(_is_float(a) for a in args):
+            raise ValueError(f"Invalid operands for {name}: {family} with a float")
+    if name in _RELATIONAL:
+        result_family = "bvec"
+    else:
+        result_family = family
+    if "t" in kinds:
+        if name in _RELATIONAL:
+            raise ValueError(f"{name} is not supported in vectorized kernels")
+        kind = ("v", n) if n else ("s",)
+        return lambda *a: _trace(name, a, kind)
+    names = [f"a{i}" for i in range(len(args))]
+    env = dict(_BATCHED_NAMESPACE if "b" in kinds else _SCALAR_NAMESPACE)
+    if "b" in kinds:
+        # one numpy expression over the whole batch, arrays of scalars are broadcast over the components
+        env.update(_numpy=_numpy, _vector_result=_vector_result, _arrays=_ARRAY_FAMILIES[result_family])
+        lines = [f"{a} = _numpy({a})" for a in names]
+        if n:
+            lines += [f"{a} = {a}[:, None]" for a, arg in zip(names, args) if isinstance(arg, np.ndarray)]
+        result = (batched_formula or formula).format(*names)
+        if n:
+            result = f"_vector_result({result}, _arrays)"
+    elif n:
+        # one expression per component, cast back to int or uint for the integer vectors
+        result_type = _VECTOR_FAMILIES[result_family][n]
+        cast = result_type._CAST if result_family in ("ivec", "uvec") else "{}"
+        lines = [f"{', '.join(f'{a}_{j}' for j in range(n))}, = {a}._components({a})"
+                 for a, kind in zip(names, kinds) if kind == "v"]
+        terms = [cast.format(formula.format(*(f"{a}_{j}" if kind == "v" else a for a, kind in zip(names, kinds))))
+                 for j in range(n)]
+        env.update(result=result_type, _int32=_int32, _uint32=_uint32)
+        result = f"result._new({', '.join(terms)})"
+    else:
+        lines = []
+        result = formula.format(*names)
+    body = "".join(f"    {line}\n" for line in lines)
+    methods = {}
+    exec(f"def plan({', '.join(names)}):\n{body}    return {result}\n", env, methods)
+    plan = plans[tuple(map(type, args))] = methods["plan"]
+    return plan
+
+
+def _make_componentwise(name: str) -> Callable:
+    params = _COMPONENTWISE[name][0]
+    types = ", ".join(f"type({p})" for p in params.split(", "))
+    methods = {}
+    exec(_DISPATCH_TEMPLATE.format(name=name, params=params, types=types), {"_plans": {}, "_plan": _plan}, methods)
+    return methods[name]
+
+
+radians = _make_componentwise("radians")
+degrees = _make_componentwise("degrees")
+sin = _make_componentwise("sin")
+cos = _make_componentwise("cos")
+tan = _make_componentwise("tan")
+asin = _make_componentwise("asin")
+acos = _make_componentwise("acos")
+atan = _make_componentwise("atan")
+pow = _make_componentwise("pow")
+exp = _make_componentwise("exp")
+log = _make_componentwise("log")
+exp2 = _make_componentwise("exp2")
+log2 = _make_componentwise("log2")
+sqrt = _make_componentwise("sqrt")
+inversesqrt = _make_componentwise("inversesqrt")
+abs = _make_componentwise("abs")
+sign = _make_componentwise("sign")
+floor = _make_componentwise("floor")
+ceil = _make_componentwise("ceil")
+fract = _make_componentwise("fract")
+mod = _make_componentwise("mod")
+min = _make_componentwise("min")
+max = _make_componentwise("max")
+clamp = _make_componentwise("clamp")
+mix = _make_componentwise("mix")
+step = _make_componentwise("step")
+smoothstep = _make_componentwise("smoothstep")
+lessThan = _make_componentwise("lessThan")
+lessThanEqual = _make_componentwise("lessThanEqual")
+greaterThan = _make_componentwise("greaterThan")
+greaterThanEqual = _make_componentwise("greaterThanEqual")
+equal = _make_componentwise("equal")
+notEqual = _make_componentwise("notEqual")
+
+
+def _np_dot(a: Any, b: Any) -> Any:
+    return (a * b).sum(-1)
+
+
+def _batched_refract(i: Any, n: Any, eta: Any) -> Any:
+    if isinstance(eta, np.ndarray):
+        eta = eta[:, None]
+    d = _np_dot(n, i)[..., None]
+    k = 1.0 - eta * eta * (1.0 - d * d)
+    res = eta * i - (eta * d + np.sqrt(np.maximum(k, 0.0))) * n
+    return np.where(k < 0.0, 0.0, res)
+
+
+# numpy versions of the geometric functions, over (count, N) or (N,) arrays
+_BATCHED_GEOMETRIC = {
+    "length": lambda v: np.sqrt(_np_dot(v, v)),
+    "distance": lambda a, b: np.sqrt(_np_dot(a - b, a - b)),
+    "dot": _np_dot,
+    "cross": lambda a, b: np.cross(a, b),
+    "normalize": lambda v: v / np.sqrt(_np_dot(v, v))[..., None],
+    "faceforward": lambda n, i, nref: np.where(_np_dot(nref, i)[..., None] < 0.0, n, -n),
+    "reflect": lambda i, n: i - 2.0 * _np_dot(n, i)[..., None] * n,
+    "refract": _batched_refract,
+}
+
+
+def _geometric(name: str, args: tuple, vectors: int) -> Any:
+    # general case of a geometric function whose first arguments are vectors of the same size:
+    # traced values, batches or mixes of single vectors and batches
+    kinds = [_arg_kind(a) for a in args]
+    widths = [_width(a) for a in args[:vectors]]
+    if {_family(a) for a in args} - {"vec", None}:
+        raise ValueError(f"Invalid operands for {name}: {', '.join(type(a).__name__ for a in args)} "
+                         f"(only float vectors are supported)")
+    if None in widths or len(set(widths)) != 1:
+        raise ValueError(f"Invalid operands for {name}: "
+                         f"{', '.join(a._type_name() if isinstance(a, _Symbol) else type(a).__name__ for a in args)} "
+                         f"(expected vectors of the same size)")
+    if name == "cross" and widths[0] != 3:
+        raise ValueError("cross is only defined for 3 components vectors")
+    if "t" in kinds:
+        kind = ("s",) if name in ("length", "distance", "dot") else ("v", widths[0])
+        return _trace(name, args, kind)
+    if "b" not in kinds:
+        # single vectors of other classes of the same size, like frozenvec3 or quat
+        return _GEOMETRIC[name][_VECTOR_TYPES[widths[0]]](*args)
+    return _vector_result(_BATCHED_GEOMETRIC[name](*map(_numpy, args)))
+
+
+def length(x: Union[_Number, _Vector]) -> _Number:
+    path = _GEOMETRIC["length"].get(type(x))
+    if path is not None:
+        return path(x)
+    return _geometric("length", (x,), 1)
+
+
+def distance(p0: Union[_Number, _Vector], p1: Union[_Number, _Vector]) -> _Number:
+    path = _GEOMETRIC["distance"].get(type(p0))
+    if path is not None and type(p1) is type(p0):
+        return path(p0, p1)
+    return _geometric("distance", (p0, p1), 2)
+
+
+def dot(x: Union[_Number, _Vector], y: Union[_Number, _Vector]) -> _Number:
+    path = _GEOMETRIC["dot"].get(type(x))
+    if path is not None and type(y) is type(x):
+        return path(x, y)
+    return _geometric("dot", (x, y), 2)
+
+
+def cross(x: vec3, y: vec3) -> vec3:
+    if type(x) is vec3 and type(y) is vec3:
+        return x.cross(y)
+    return _geometric("cross", (x, y), 2)
+
+
+def normalize(x: Union[_Number, _Vector]) -> Union[_Number, _Vector]:
+    path = _GEOMETRIC["normalize"].get(type(x))
+    if path is not None:
+        return path(x)
+    return _geometric("normalize", (x,), 1)
+
+
+def faceforward(N: Union[_Number, _Vector], I: Union[_Number, _Vector],
+                Nref: Union[_Number, _Vector]) -> Union[_Number, _Vector]:
+    # N if dot(Nref, I) < 0, -N otherwise
+    path = _GEOMETRIC["faceforward"].get(type(N))
+    if path is not None and type(I) is type(N) and type(Nref) is type(N):
+        return path(N, I, Nref)
+    return _geometric("faceforward", (N, I, Nref), 3)
+
+
+def reflect(I: Union[_Number, _Vector], N: Union[_Number, _Vector]) -> Union[_Number, _Vector]:
+    # direction of the incident vector I reflected by a surface of normal N, which should be normalized
+    path = _GEOMETRIC["reflect"].get(type(I))
+    if path is not None and type(N) is type(I):
+        return path(I, N)
+    return _geometric("reflect", (I, N), 2)
+
+
+def refract(I: Union[_Number, _Vector], N: Union[_Number, _Vector], eta: _Number) -> Union[_Number, _Vector]:
+    # refraction of I through a surface of normal N with the ratio of indices of refraction eta, a zero
+    # vector for a total internal reflection; I and N should be normalized
+    path = _GEOMETRIC["refract"].get(type(I))
+    if path is not None and type(N) is type(I) and isinstance(eta, _SCALARS):
+        return path(I, N, eta)
+    return _geometric("refract", (I, N, eta), 2)
+
+
+def _matrix_kind(value: Any) -> Union[tuple, None]:
+    if isinstance(value, (_matBase, _matArrayBase)):
+        return ("m", value._N, value._M)
+    if isinstance(value, _Symbol) and value._kind[0] == "m":
+        return value._kind
+    return None
+
+
+def matrixCompMult(x: Any, y: Any) -> Any:
+    # component-wise product of two matrices of the same size
+    if type(x) is type(y) and isinstance(x, _matBase):
+        return x._new(array("d", map(mul, x._data, y._data)))
+    kind = _matrix_kind(x)
+    if kind is None or kind != _matrix_kind(y):
+        raise ValueError(f"Invalid operands for matrixCompMult: {type(x).__name__} and {type(y).__name__} "
+                         f"(expected matrices of the same size)")
+    if isinstance(x, _Symbol) or isinstance(y, _Symbol):
+        return _trace("matrixCompMult", (x, y), kind)
+    return _MATRIX_ARRAY_TYPES[kind[1:]]._wrap(_numpy(x) * _numpy(y))
+
+
+def outerProduct(c: _Vector, r: _Vector) -> Any:
+    # matrix c * transpose(r), with the size of c rows and the size of r columns
+    n, m = _width(c), _width(r)
+    if n is None or m is None:
+        raise ValueError(f"Invalid operands for outerProduct: {type(c).__name__} and {type(r).__name__} "
+                         f"(expected vectors)")
+    if isinstance(c, _vecBase) and isinstance(r, _vecBase):
+        column = c._components(c)
+        return _MATRIX_TYPES[(n, m)]._new(array("d", [a * b for b in r._components(r) for a in column]))
+    if isinstance(c, _Symbol) or isinstance(r, _Symbol):
+        return _trace("outerProduct", (c, r), ("m", n, m))
+    a, b = _numpy(c), _numpy(r)
+    return _MATRIX_ARRAY_TYPES[(n, m)]._wrap(b[..., :, None] * a[..., None, :])
+
+
+def _check_matrix(name: str, m: Any) -> None:
+    if _matrix_kind(m) is None:
+        raise ValueError(f"Invalid operand for {name}: {type(m).__name__} (expected a matrix)")
+
+
+def transpose(m: Any) -> Any:
+    _check_matrix("transpose", m)
+    return m.T
+
+
+def determinant(m: Any) -> Any:
+    _check_matrix("determinant", m)
+    return m.det
+
+
+def inverse(m: Any) -> Any:
+    _check_matrix("inverse", m)
+    return m.Inv
+
+
+def _check_bool(name: str, x: Any) -> None:
+    if not isinstance(x, (_bvecBase, _bvecArrayBase)):
+        raise ValueError(f"Invalid operand for {name}: {type(x).__name__} (expected a bvec or a batch of bvec)")
+
+
+def any(x: Any) -> Any:
+    # True if any component of x is True, one bool per vector for a batch
+    if isinstance(x, _bvecBase):
+        return True in x._components(x)
+    _check_bool("any", x)
+    return x.data.any(axis=1)
+
+
+def all(x: Any) -> Any:
+    if isinstance(x, _bvecBase):
+        return False not in x._components(x)
+    _check_bool("all", x)
+    return x.data.all(axis=1)
+
+
+def not_(x: Any) -> Any:
+    # GLSL not(), renamed as not is a Python keyword
+    if isinstance(x, _bvecBase):
+        return x._new(*[not c for c in x._components(x)])
+    _check_bool("not_", x)
+    return x._wrap(~x.data)
+
+
+# calls recorded in vectorized kernels are replayed with the batched versions, the kernels only trace
+# float values so the boolean functions are left out
+_FUNCTIONS.update({name: globals()[name] for name in __all__
+                   if name not in _RELATIONAL and name not in ("any", "all", "not_")})
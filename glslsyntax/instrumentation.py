@@ -0,0 +1,289 @@
+import sys
+import time
+import types
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List
+
+from .vectors import _vecBase, _ATTRIBUTES, _ATTRIBUTES_ALIASES
+from .matrices import _matBase
+from .arrays import _vecArrayBase, _matArrayBase
+
+# opt-in counters of the vector, matrix and quaternion types and their batches: instrument() replaces
+# their methods, properties and the allocator of the generated code by counting wrappers for the time of a
+# with block, then puts the originals back, so that nothing is slower outside of the blocks; the
+# classes being patched for the whole process, the calls of all the threads are counted
+__all__ = ["instrument", "addHook", "removeHook", "InstrumentReport"]
+
+_ROOTS = (_vecBase, _matBase, _vecArrayBase, _matArrayBase)
+
+# constructors, counted as allocations of their class unless they go through the allocator of the generated
+# code, which counts them
+_CONSTRUCTORS = ("__init__", "_new", "_wrap", "_view")
+_SKIPPED = ("__init_subclass__", "__new__", "__class_getitem__", "__subclasshook__")
+_KINDS = {"det": "determinant", "determinant": "determinant", "Inv": "inverse", "inverse": "inverse",
+          "invert": "inverse"}
+_SWIZZLE_LETTERS = (set(_ATTRIBUTES), set(_ATTRIBUTES_ALIASES))
+
+_clock = time.perf_counter_ns
+_object_new = object.__new__
+
+# counters while instrumented: allocations by class name, [calls, ns] and kind by "class.attribute"
+_ALLOCATIONS = defaultdict(int)
+_CALLS = {}
+_CALL_KINDS = {}
+_HOOKS = []
+# identities of the instances in their __init__, so that the __init__ of the bases called by super() do
+# not count the instance again
+_INITIALIZING = set()
+# depth of the nested with blocks, and what to restore when the outermost one exits
+_state = {"depth": 0, "patches": []}
+
+
+class InstrumentReport(object):
+    # counters of a with instrument() block: allocations by type, calls and cumulative seconds by
+    # operation ("vec3.__add__", "mat4.Inv", ...), the time of an operation including the operations it calls
+    __slots__ = ("allocations", "calls", "seconds", "kinds")
+
+    def __init__(self):
+        self.allocations = {}
+        self.calls = {}
+        self.seconds = {}
+        # "constructor", "operator", "swizzle", "determinant", "inverse" or "method", by operation
+        self.kinds = {}
+
+    def total(self, kind: str) -> int:
+        # calls of the operations of a kind
+        return sum(count for name, count in self.calls.items() if self.kinds[name] == kind)
+
+    def asDict(self) -> Dict[str, Dict[str, Any]]:
+        # plain dicts for the metrics systems and JSON
+        return {"allocations": dict(self.allocations), "calls": dict(self.calls), "seconds": dict(self.seconds)}
+
+    def summary(self, limit: int = 20) -> str:
+        # table of the slowest operations and of the most allocated types
+        lines = [f"{'operation':<24} {'calls':>10} {'ms':>10}"]
+        for name in sorted(self.seconds, key=self.seconds.get, reverse=True)[:limit]:
+            lines.append(f"{name:<24} {self.calls[name]:>10} {self.seconds[name] * 1e3:>10.3f}")
+        lines.append(f"\n{'type':<24} {'allocations':>10}")
+        for name in sorted(self.allocations, key=self.allocations.get, reverse=True)[:limit]:
+            lines.append(f"{name:<24} {self.allocations[name]:>10}")
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        return (f"InstrumentReport({sum(self.allocations.values())} allocations, {sum(self.calls.values())} calls, "
+                f"{sum(self.seconds.values()) * 1e3:.3f} ms)")
+
+
+def addHook(hook: Callable[[InstrumentReport], Any]) -> None:
+    # hook(report) is called at the end of every with instrument() block, e.g. to forward the counters to
+    # a metrics system
+    _HOOKS.append(hook)
+
+
+def removeHook(hook: Callable[[InstrumentReport], Any]) -> None:
+    _HOOKS.remove(hook)
+
+
+def _counting_new(cls: type) -> Any:
+    # allocator of the generated code while instrumented
+    _ALLOCATIONS[cls.__name__] += 1
+    return _object_new(cls)
+
+
+def _classes() -> List[type]:
+    classes = []
+    pending = list(_ROOTS)
+    while pending:
+        cls = pending.pop()
+        if cls not in classes:
+            classes.append(cls)
+            pending.extend(cls.__subclasses__())
+    return [cls for cls in classes if cls not in _ROOTS]
+
+
+def _kind(cls: type, name: str, value: Any) -> str:
+    if name in _CONSTRUCTORS:
+        return "constructor"
+    if name.startswith("__"):
+        return "operator"
+    if isinstance(value, property) and issubclass(cls, _vecBase) and len(name) > 1 \
+            and any(set(name) <= letters for letters in _SWIZZLE_LETTERS):
+        return "swizzle"
+    return _KINDS.get(name, "method")
+
+
+def _counted(fn: Callable, stat: list, allocation: Any = None) -> Callable:
+    if allocation is None:
+        def wrapper(*args, **kwargs):
+            start = _clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                stat[0] += 1
+                stat[1] += _clock() - start
+    else:
+        # allocation(args) is the name of the class allocated by the call
+        def wrapper(*args, **kwargs):
+            _ALLOCATIONS[allocation(args)] += 1
+            start = _clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                stat[0] += 1
+                stat[1] += _clock() - start
+    wrapper.__name__ = getattr(fn, "__name__", "wrapper")
+    wrapper.__wrapped__ = fn
+    return wrapper
+
+
+def _counted_init(fn: Callable, stat: list) -> Callable:
+    # __init__ counting one allocation of the class of the instance in its outermost call
+    def wrapper(self, *args, **kwargs):
+        ident = id(self)
+        outermost = ident not in _INITIALIZING
+        if outermost:
+            _ALLOCATIONS[type(self).__name__] += 1
+            _INITIALIZING.add(ident)
+        start = _clock()
+        try:
+            return fn(self, *args, **kwargs)
+        finally:
+            if outermost:
+                _INITIALIZING.discard(ident)
+            stat[0] += 1
+            stat[1] += _clock() - start
+
+    wrapper.__name__ = fn.__name__
+    wrapper.__wrapped__ = fn
+    return wrapper
+
+
+def _functions(value: Any, depth: int = 2) -> Iterator[Callable]:
+    # functions of a class attribute or of a table of generated functions
+    if isinstance(value, (staticmethod, classmethod)):
+        yield value.__func__
+    elif isinstance(value, property):
+        yield from (f for f in (value.fget, value.fset) if f is not None)
+    elif isinstance(value, types.FunctionType):
+        yield value
+    elif isinstance(value, dict) and depth:
+        for item in value.values():
+            yield from _functions(item, depth - 1)
+
+
+def _generated_globals(classes: List[type]) -> Dict[int, dict]:
+    # the globals of the code generated with exec which allocates with _object_new, found through the
+    # classes and the tables of the modules of the package
+    namespaces = [cls.__dict__ for cls in classes]
+    namespaces += [vars(module) for name, module in list(sys.modules.items())
+                   if name == "glslsyntax" or name.startswith("glslsyntax.")]
+    generated = {}
+    for namespace in namespaces:
+        for value in list(namespace.values()):
+            for f in _functions(value):
+                env = getattr(f, "__globals__", None)
+                if env is not None and "_object_new" in env and "__name__" not in env:
+                    generated[id(env)] = env
+    return generated
+
+
+def _instrumented(cls: type, name: str, value: Any) -> Any:
+    # counting replacement of a class attribute, None for the attributes not counted
+    if isinstance(value, (staticmethod, classmethod)):
+        fn = value.__func__
+    elif isinstance(value, property):
+        fn = value.fget
+    elif isinstance(value, types.FunctionType):
+        fn = value
+    else:
+        return None
+    key = f"{cls.__name__}.{name}"
+    stat = _CALLS.setdefault(key, [0, 0])
+    _CALL_KINDS[key] = _kind(cls, name, value)
+    if name == "__init__":
+        return _counted_init(fn, stat)
+    allocation = None
+    if name in _CONSTRUCTORS and "_object_new" not in fn.__globals__:
+        # the other constructors receive the class, unless they are static
+        if name == "_view":
+            allocation = lambda args: args[0]._View.__name__
+        else:
+            allocation = (lambda args: args[0].__name__) if isinstance(value, classmethod) else \
+                (lambda args, n=cls.__name__: n)
+    if isinstance(value, staticmethod):
+        return staticmethod(_counted(fn, stat, allocation))
+    if isinstance(value, classmethod):
+        return classmethod(_counted(fn, stat, allocation))
+    if isinstance(value, property):
+        fset = value.fset and _counted(value.fset, stat)
+        return property(_counted(value.fget, stat), fset, value.fdel, value.__doc__)
+    return _counted(fn, stat, allocation)
+
+
+def _enable() -> None:
+    # compute all the replacements from the original attributes before patching any class
+    replacements = []
+    classes = _classes()
+    generated = _generated_globals(classes)
+    for cls in classes:
+        attributes = {}
+        for base in reversed(cls.__mro__):
+            if base is not object:
+                attributes.update(base.__dict__)
+        for name, value in attributes.items():
+            if name in _SKIPPED or (name.startswith("_") and not name.startswith("__") and name not in _CONSTRUCTORS):
+                continue
+            new = _instrumented(cls, name, value)
+            if new is not None:
+                replacements.append((cls, name, cls.__dict__.get(name), new))
+    patches = _state["patches"]
+    for cls, name, original, new in replacements:
+        setattr(cls, name, new)
+        patches.append((cls, name, original))
+    for env in generated.values():
+        patches.append((env, "_object_new", env["_object_new"]))
+        env["_object_new"] = _counting_new
+
+
+def _disable() -> None:
+    for target, name, original in reversed(_state["patches"]):
+        if isinstance(target, dict):
+            target[name] = original
+        elif original is None:
+            delattr(target, name)
+        else:
+            setattr(target, name, original)
+    _state["patches"].clear()
+    _ALLOCATIONS.clear()
+    _CALLS.clear()
+    _CALL_KINDS.clear()
+
+
+@contextmanager
+def instrument() -> Iterator[InstrumentReport]:
+    # with instrument() as report: counts the allocations and the calls of the block in report, which is
+    # filled at the end of the block; the blocks can be nested
+    if _state["depth"] == 0:
+        _enable()
+    _state["depth"] += 1
+    allocations = dict(_ALLOCATIONS)
+    calls = {name: tuple(stat) for name, stat in _CALLS.items()}
+    report = InstrumentReport()
+    try:
+        yield report
+    finally:
+        for name, count in _ALLOCATIONS.items():
+            if count > allocations.get(name, 0):
+                report.allocations[name] = count - allocations.get(name, 0)
+        for name, (count, ns) in _CALLS.items():
+            before = calls.get(name, (0, 0))
+            if count > before[0]:
+                report.calls[name] = count - before[0]
+                report.seconds[name] = (ns - before[1]) * 1e-9
+                report.kinds[name] = _CALL_KINDS[name]
+        _state["depth"] -= 1
+        if _state["depth"] == 0:
+            _disable()
+        for hook in list(_HOOKS):
+            hook(report)
@@ -0,0 +1,432 @@
+import types
+from typing import Union, Any, List, Tuple, Callable
+
+from .vectors import _vecBase, _SCALARS, _ATTRIBUTES, _ATTRIBUTES_ALIASES, vec2, vec3, vec4
+from .matrices import _matBase, _MATRIX_TYPES
+from .arrays import _vecArrayBase, _matArrayBase, _ARRAY_TYPES, _MATRIX_ARRAY_TYPES, _require_numpy, np
+from .lazy import _infer, _kind
+
+__all__ = ["vectorize"]
+
+_Number = Union[int, float]
+
+_OPERATORS = {"add": "+", "sub": "-", "mul": "*", "truediv": "/", "pow": "**"}
+_SWIZZLE_CHARS = {c: i for i, c in enumerate(_ATTRIBUTES)} | {c: i for i, c in enumerate(_ATTRIBUTES_ALIASES)}
+_TRACED_TYPES = (vec2, vec3, vec4) + tuple(_MATRIX_TYPES.values())
+
+# functions which can be called by the kernels, filled by glslsyntax.functions
+_FUNCTIONS = {}
+
+
+def _swizzle(name: str, n: int) -> Union[List[int], None]:
+    # indices of the components of a swizzle of a vecN, None if name is not one
+    if not 1 <= len(name) <= 4:
+        return None
+    indices = [_SWIZZLE_CHARS.get(c) for c in name]
+    if None in indices or any(i >= n for i in indices):
+        return None
+    return indices
+
+
+class _Symbol(object):
+    # placeholder for a value computed by the kernel, the operations on it are recorded by the tracer
+    __slots__ = ("_tracer", "_name", "_kind")
+
+    def _emit(self, expression: str, kind: tuple) -> "_Symbol":
+        return self._tracer.emit(expression, kind)
+
+    def _binary(self, op: str, other: Any, reflected: bool = False) -> "_Symbol":
+        tracer = self._tracer
+        other_kind = other._kind if isinstance(other, _Symbol) else _kind(other)
+        a, b = (other, self) if reflected else (self, other)
+        a_kind, b_kind = (other_kind, self._kind) if reflected else (self._kind, other_kind)
+        if op == "pow":
+            if a_kind != ("s",) or b_kind != ("s",):
+                raise ValueError("Invalid operands for **: only scalars can be raised to a power")
+            kind = a_kind
+        else:
+            kind = _infer(op, [a_kind, b_kind])
+        return self._emit(f"{tracer.ref(a)} {_OPERATORS[op]} {tracer.ref(b)}", kind)
+
+    def __add__(self, other: Any) -> "_Symbol":
+        return self._binary("add", other)
+
+    def __radd__(self, other: Any) -> "_Symbol":
+        return self._binary("add", other, True)
+
+    def __sub__(self, other: Any) -> "_Symbol":
+        return self._binary("sub", other)
+
+    def __rsub__(self, other: Any) -> "_Symbol":
+        return self._binary("sub", other, True)
+
+    def __mul__(self, other: Any) -> "_Symbol":
+        return self._binary("mul", other)
+
+    def __rmul__(self, other: Any) -> "_Symbol":
+        return self._binary("mul", other, True)
+
+    def __truediv__(self, other: Any) -> "_Symbol":
+        return self._binary("truediv", other)
+
+    def __rtruediv__(self, other: Any) -> "_Symbol":
+        return self._binary("truediv", other, True)
+
+    def __pow__(self, other: Any) -> "_Symbol":
+        return self._binary("pow", other)
+
+    def __rpow__(self, other: Any) -> "_Symbol":
+        return self._binary("pow", other, True)
+
+    def __neg__(self) -> "_Symbol":
+        return self._emit(f"-{self._name}", self._kind)
+
+    def __abs__(self) -> "_Symbol":
+        if self._kind != ("s",):
+            raise ValueError("abs() of a vector or a matrix is not defined")
+        return self._emit(f"abs({self._name})", self._kind)
+
+    def _rebind(self, other: "_Symbol") -> "_Symbol":
+        # in place operations record a new value and make this symbol refer to it
+        object.__setattr__(self, "_name", other._name)
+        object.__setattr__(self, "_kind", other._kind)
+        return self
+
+    def __iadd__(self, other: Any) -> "_Symbol":
+        return self._rebind(self + other)
+
+    def __isub__(self, other: Any) -> "_Symbol":
+        return self._rebind(self - other)
+
+    def __imul__(self, other: Any) -> "_Symbol":
+        return self._rebind(self * other)
+
+    def __itruediv__(self, other: Any) -> "_Symbol":
+        return self._rebind(self / other)
+
+    def __bool__(self) -> bool:
+        raise TypeError("The value of a traced argument is not known when the kernel is compiled, branches "
+                        "on it are not supported")
+
+    def __getattr__(self, name: str) -> Any:
+        if self._kind[0] == "v":
+            indices = _swizzle(name, self._kind[1])
+            if indices is not None:
+                if len(indices) == 1:
+                    return self._emit(f"{self._name}.{name}", ("s",))
+                return self._emit(f"{self._name}.{name}", ("v", len(indices)))
+        raise AttributeError(f"'{self._type_name()}' has no attribute '{name}' in a vectorized kernel")
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in _Symbol.__slots__:
+            object.__setattr__(self, name, value)
+            return
+        indices = _swizzle(name, self._kind[1]) if self._kind[0] == "v" else None
+        if indices is None or len(set(indices)) != len(indices):
+            raise AttributeError(f"Cannot assign '{name}' of '{self._type_name()}' in a vectorized kernel")
+        self._rebind(self._emit(f"_with({self._name}, {name!r}, {self._tracer.ref(value)})", self._kind))
+
+    def __getitem__(self, key: int) -> "_Symbol":
+        if self._kind[0] == "v":
+            return getattr(self, _ATTRIBUTES[key])
+        if self._kind[0] == "m":
+            return self._emit(f"_column({self._name}, {key})", ("v", self._kind[1]))
+        raise TypeError("A scalar cannot be indexed")
+
+    def __setitem__(self, key: int, value: Any) -> None:
+        if self._kind[0] == "v":
+            setattr(self, _ATTRIBUTES[key], value)
+        elif self._kind[0] == "m":
+            self._rebind(self._emit(f"_with_column({self._name}, {key}, {self._tracer.ref(value)})", self._kind))
+        else:
+            raise TypeError("A scalar cannot be indexed")
+
+    def _type_name(self) -> str:
+        if self._kind[0] == "s":
+            return "float"
+        if self._kind[0] == "v":
+            return f"vec{self._kind[1]}"
+        return _MATRIX_TYPES[self._kind[1:]].__name__
+
+    def _check(self, kind: str, name: str) -> None:
+        if self._kind[0] != kind:
+            raise AttributeError(f"'{self._type_name()}' has no attribute '{name}'")
+
+    # vector methods
+    def dot(self, other: Any) -> "_Symbol":
+        self._check("v", "dot")
+        return self._emit(f"{self._name}.dot({self._tracer.ref(other)})", ("s",))
+
+    def cross(self, other: Any) -> "_Symbol":
+        if self._kind != ("v", 3):
+            raise AttributeError(f"'{self._type_name()}' has no attribute 'cross'")
+        return self._emit(f"{self._name}.cross({self._tracer.ref(other)})", ("v", 3))
+
+    def distance(self, other: Any) -> "_Symbol":
+        self._check("v", "distance")
+        return self._emit(f"{self._name}.distance({self._tracer.ref(other)})", ("s",))
+
+    @property
+    def magnitude(self) -> "_Symbol":
+        self._check("v", "magnitude")
+        return self._emit(f"{self._name}.magnitude", ("s",))
+
+    @property
+    def normal(self) -> "_Symbol":
+        self._check("v", "normal")
+        return self._emit(f"{self._name}.normal", self._kind)
+
+    def normalize(self) -> "_Symbol":
+        return self._rebind(self.normal)
+
+    @property
+    def size(self) -> Union[int, Tuple[int, int]]:
+        if self._kind[0] == "v":
+            return self._kind[1]
+        if self._kind[0] == "m":
+            return self._kind[1:]
+        raise AttributeError("'float' has no attribute 'size'")
+
+    # matrix methods
+    @property
+    def T(self) -> "_Symbol":
+        self._check("m", "T")
+        return self._emit(f"{self._name}.T", ("m", self._kind[2], self._kind[1]))
+
+    @property
+    def Inv(self) -> "_Symbol":
+        self._check("m", "Inv")
+        if self._kind[1] != self._kind[2]:
+            raise ValueError("Inverse is only defined for square matrices")
+        return self._emit(f"{self._name}.Inv", self._kind)
+
+    @property
+    def det(self) -> "_Symbol":
+        self._check("m", "det")
+        if self._kind[1] != self._kind[2]:
+            raise ValueError("Determinant is only defined for square matrices")
+        return self._emit(f"{self._name}.det", ("s",))
+
+    def transpose(self) -> "_Symbol":
+        if self._kind[0] != "m" or self._kind[1] != self._kind[2]:
+            raise ValueError("In place transpose is only defined for square matrices")
+        return self._rebind(self.T)
+
+    def invert(self) -> "_Symbol":
+        return self._rebind(self.Inv)
+
+
+class _Tracer(object):
+    # records the operations on the symbols as the lines of the kernel
+    def __init__(self):
+        self.lines = []
+        self.constants = {}
+        self.count = 0
+
+    def symbol(self, name: str, kind: tuple) -> _Symbol:
+        res = object.__new__(_Symbol)
+        object.__setattr__(res, "_tracer", self)
+        object.__setattr__(res, "_name", name)
+        object.__setattr__(res, "_kind", kind)
+        return res
+
+    def emit(self, expression: str, kind: tuple) -> _Symbol:
+        name = f"t{self.count}"
+        self.count += 1
+        self.lines.append(f"{name} = {expression}")
+        return self.symbol(name, kind)
+
+    def ref(self, value: Any) -> str:
+        # name of a symbol, or of a constant captured while tracing
+        if isinstance(value, _Symbol):
+            return value._name
+        if isinstance(value, _SCALARS):
+            return repr(value)
+        _kind(value)
+        name = f"c{len(self.constants)}"
+        self.constants[name] = value
+        return name
+
+    def construct(self, cls: type, args: tuple) -> Any:
+        # vec4(p, 1.0) or mat3(x, y, z) with symbolic arguments
+        if not any(isinstance(a, _Symbol) for a in args):
+            return cls(*args)
+        kind = ("v", cls._N) if issubclass(cls, _vecBase) else ("m", cls._N, cls._M)
+        sizes = [a._kind for a in args if isinstance(a, _Symbol)]
+        count = sum(1 if k[0] == "s" else k[1] if k[0] == "v" else k[1] * k[2] for k in sizes)
+        count += sum(1 if isinstance(a, _SCALARS) else len(_flatten(a)) for a in args if not isinstance(a, _Symbol))
+        expected = cls._N if kind[0] == "v" else cls._N * cls._M
+        if len(args) == 1 and kind[0] == "m" and sizes[0][0] != "s":
+            # a matrix of the same size, or a vector repeated in every column; the matrices are not resized
+            if sizes[0][0] == "m" and sizes[0] != kind:
+                raise TypeError(f"{cls.__name__} cannot be built from a {_MATRIX_TYPES[sizes[0][1:]].__name__} in a "
+                                f"kernel, the matrices are not resized (expected a {cls.__name__})")
+            if sizes[0][0] == "v" and sizes[0][1] != cls._N:
+                raise ValueError(f"Invalid size for a vector: {sizes[0][1]} (expected {cls._N})")
+        elif count != expected and not (len(args) == 1 and sizes[0][0] == "s"):
+            raise ValueError(f"Invalid number of arguments for {cls.__name__}: {count} (expected {expected})")
+        refs = ", ".join(self.ref(a) for a in args)
+        return self.emit(f"_construct({cls.__name__}, count, {refs})", kind)
+
+
+def _flatten(value: Union[_vecBase, _matBase]) -> list:
+    if isinstance(value, _vecBase):
+        return list(value._components(value))
+    return list(value._data)
+
+
+def _batch_kind(value: Any) -> tuple:
+    if isinstance(value, _vecArrayBase):
+        return ("v", value._N)
+    if isinstance(value, _matArrayBase):
+        return ("m", value._N, value._M)
+    return ("s",)
+
+
+def _broadcast(value: Any, count: int) -> Any:
+    # a single vector or matrix as a read-only batch of count times the same value, without copy
+    if isinstance(value, _vecBase):
+        return _ARRAY_TYPES[value._N]._wrap(np.broadcast_to(np.array(value._components(value)), (count, value._N)))
+    if isinstance(value, _matBase):
+        data = np.array(value._data).reshape(value._M, value._N)
+        return _MATRIX_ARRAY_TYPES[(value._N, value._M)]._wrap(np.broadcast_to(data, (count, value._M, value._N)))
+    return value
+
+
+def _with(value: _vecArrayBase, swizzle: str, new: Any) -> _vecArrayBase:
+    # copy of value with a swizzle assigned
+    res = value._wrap(value.data.copy())
+    setattr(res, swizzle, new)
+    return res
+
+
+def _column(value: _matArrayBase, i: int) -> _vecArrayBase:
+    return _ARRAY_TYPES[value._N]._wrap(value.data[:, i, :])
+
+
+def _with_column(value: _matArrayBase, i: int, new: Any) -> _matArrayBase:
+    res = value._wrap(value.data.copy())
+    res.data[:, i, :] = new.data if isinstance(new, _vecArrayBase) else new._components(new)
+    return res
+
+
+def _construct(cls: type, count: int, *args: Any) -> Any:
+    # batch version of the GLSL constructors, with scalars, vectors and matrices or batches of them
+    components = []
+    for arg in args:
+        if isinstance(arg, _vecArrayBase):
+            components.extend(arg.data.T)
+        elif isinstance(arg, _matArrayBase):
+            components.extend(arg.data.reshape(len(arg.data), -1).T)
+        elif isinstance(arg, (_vecBase, _matBase)):
+            components.extend(_flatten(arg))
+        else:
+            components.append(arg)
+    if issubclass(cls, _vecBase):
+        if len(components) == 1:
+            components = components * cls._N
+        data = np.empty((count, cls._N))
+        for i, c in enumerate(components):
+            data[:, i] = c
+        return _ARRAY_TYPES[cls._N]._wrap(data)
+    n, m = cls._N, cls._M
+    data = np.zeros((count, m, n))
+    if len(components) == 1:
+        # diagonal matrix
+        for i in range(min(n, m)):
+            data[:, i, i] = components[0]
+    elif len(args) == 1 and isinstance(args[0], _vecArrayBase):
+        data[:] = args[0].data[:, None, :]
+    else:
+        for k, c in enumerate(components):
+            data[:, k // n, k % n] = c
+    return _MATRIX_ARRAY_TYPES[(n, m)]._wrap(data)
+
+
+def _traced_function(func: Callable, tracer: _Tracer, patched: dict) -> Callable:
+    # copy of func whose globals build symbols when the vector and matrix constructors get symbols,
+    # the other functions of the same module are patched too so that helpers can be traced
+    if id(func) in patched:
+        return patched[id(func)]
+    namespace = dict(func.__globals__)
+    res = types.FunctionType(func.__code__, namespace, func.__name__, func.__defaults__, func.__closure__)
+    res.__kwdefaults__ = func.__kwdefaults__
+    patched[id(func)] = res
+    for name, value in namespace.items():
+        if isinstance(value, type) and value in _TRACED_TYPES:
+            namespace[name] = (lambda cls: lambda *args: tracer.construct(cls, args))(value)
+        elif isinstance(value, types.FunctionType) and value.__globals__ is func.__globals__:
+            namespace[name] = _traced_function(value, tracer, patched)
+    return res
+
+
+def _trace(func: Callable, kinds: List[tuple]) -> Tuple[str, dict]:
+    # run func once with symbols and return the source of the kernel with its constants
+    tracer = _Tracer()
+    args = [tracer.symbol(f"a{i}", kind) for i, kind in enumerate(kinds)]
+    result = _traced_function(func, tracer, {})(*args)
+    results = result if isinstance(result, tuple) else (result,)
+    names = [tracer.ref(r) for r in results]
+    lines = [f"{name} = _broadcast(_{name}, count)" for name in tracer.constants]
+    lines += tracer.lines
+    returned = ", ".join(names) if isinstance(result, tuple) else names[0]
+    params = "".join(f", a{i}" for i in range(len(kinds)))
+    body = "".join(f"    {line}\n" for line in lines)
+    source = f"def kernel(count{params}):\n{body}    return {returned}\n"
+    return source, tracer.constants
+
+
+def vectorize(*signature: type) -> Callable:
+    # decorator compiling a function written for single values (float, vectors and matrices, one type
+    # per argument) into a kernel computing it over batches: the arguments can then be vecNarray,
+    # matNxMarray or 1D numpy arrays of floats, and single values are broadcast to every element
+    kinds = []
+    for t in signature:
+        if t in _SCALARS:
+            kinds.append(("s",))
+        elif isinstance(t, type) and t in _TRACED_TYPES:
+            kinds.append(("v", t._N) if issubclass(t, _vecBase) else ("m", t._N, t._M))
+        else:
+            raise ValueError(f"Invalid type for a kernel argument: {t!r} (expected float, a vector or a matrix)")
+
+    def decorator(func: Callable) -> Callable:
+        _require_numpy("vectorize")
+        source, constants = _trace(func, kinds)
+        env = {"_with": _with, "_column": _column, "_with_column": _with_column, "_construct": _construct,
+               "_broadcast": _broadcast, **_FUNCTIONS, **{cls.__name__: cls for cls in _TRACED_TYPES},
+               **{f"_{name}": value for name, value in constants.items()}}
+        methods = {}
+        exec(source, env, methods)
+        kernel = methods["kernel"]
+
+        def wrapper(*args: Any) -> Any:
+            if len(args) != len(kinds):
+                raise ValueError(f"Invalid number of arguments for {func.__name__}: {len(args)} "
+                                 f"(expected {len(kinds)})")
+            count = None
+            for i, (arg, kind) in enumerate(zip(args, kinds)):
+                if isinstance(arg, (_vecArrayBase, _matArrayBase, np.ndarray)):
+                    if isinstance(arg, np.ndarray) and arg.ndim != 1:
+                        raise ValueError(f"Invalid shape for argument {i} of {func.__name__}: {arg.shape} "
+                                         f"(expected (count,))")
+                    if _batch_kind(arg) != kind:
+                        raise ValueError(f"Invalid type for argument {i} of {func.__name__}: {type(arg).__name__}")
+                    if count is not None and len(arg) != count:
+                        raise ValueError(f"Invalid length for argument {i} of {func.__name__}: {len(arg)} "
+                                         f"(expected {count})")
+                    count = len(arg)
+            if count is None:
+                # nothing to vectorize
+                return func(*args)
+            return kernel(count, *[_broadcast(arg, count) for arg in args])
+
+        # the kernel is pickled by reference to func, e.g. for glslsyntax.parallel.map
+        wrapper.__module__ = func.__module__
+        wrapper.__name__ = func.__name__
+        wrapper.__qualname__ = func.__qualname__
+        wrapper.__doc__ = func.__doc__
+        wrapper.__wrapped__ = func
+        wrapper.source = source
+        return wrapper
+
+    return decorator
@@ -0,0 +1,85 @@
+import math
+import weakref
+from typing import Union, Any
+
+from .vectors import _vecBase, _SCALARS, _unroll, vec2, vec3, vec4, frozenivec2, frozenivec3, frozenivec4
+from .arrays import _vecArrayBase, _ivecArrayBase, np
+
+# vectors as dict and set keys: interning of frozen vectors and quantized keys of grid cells
+__all__ = ["VectorPool", "quantize"]
+
+_Number = Union[int, float]
+_Vector = Union[vec2, vec3, vec4]
+
+_VECTOR_TYPES = {2: vec2, 3: vec3, 4: vec4}
+_KEY_TYPES = {2: frozenivec2, 3: frozenivec3, 4: frozenivec4}
+
+# unrolled cell of a point, for a cell size given as a number or per component
+_QUANTIZE_TEMPLATE = """
+def quantize(v, cellSize):
+    if isinstance(cellSize, _SCALARS):
+        {x = _floor(v.x / cellSize)}
+    else:
+        {x = _floor(v.x / cellSize.x)}
+    return key._new({args})
+"""
+
+
+class VectorPool(object):
+    # interning of frozen vectors: intern() returns the same object for all the vectors with equal
+    # components, so that repeated constants share their memory and compare by identity; the pool
+    # only keeps weak references and a vector is evicted once nothing else uses it
+    __slots__ = ("_vectors",)
+
+    def __init__(self):
+        self._vectors = weakref.WeakValueDictionary()
+
+    def intern(self, v: _vecBase) -> _vecBase:
+        # vectors of different families are interned separately, even with equal components
+        key = (v._FROZEN, v._components(v))
+        try:
+            return self._vectors[key]
+        except KeyError:
+            frozen = self._vectors[key] = v.frozen
+            return frozen
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    def __contains__(self, v: Any) -> bool:
+        if not isinstance(v, _vecBase):
+            return False
+        return (v._FROZEN, v._components(v)) in self._vectors
+
+    def clear(self) -> None:
+        self._vectors.clear()
+
+    def __repr__(self) -> str:
+        return f"VectorPool({len(self)} vectors)"
+
+
+def _make_quantize(n: int) -> Any:
+    methods = {}
+    source = _unroll(_QUANTIZE_TEMPLATE.replace("{args}", ", ".join("xyzw"[:n])), n)
+    exec(source, {"_floor": math.floor, "_SCALARS": _SCALARS, "key": _KEY_TYPES[n]}, methods)
+    return methods["quantize"]
+
+
+_QUANTIZE = {cls: _make_quantize(cls._N) for cls in (vec2, vec3, vec4)}
+
+
+def quantize(v: Union[_Vector, Any], cellSize: Union[_Number, _Vector] = 1.0) -> Any:
+    # integer coordinates floor(v / cellSize) of the grid cell containing v, as a hashable
+    # frozenivecN for a single vector and as an ivecNarray for a batch
+    path = _QUANTIZE.get(type(v))
+    if path is not None:
+        return path(v, cellSize)
+    if isinstance(v, _vecArrayBase):
+        if v._VECTOR._PREFIX != "vec":
+            raise ValueError(f"Invalid type for quantize: {type(v).__name__} (expected float vectors)")
+        size = np.array(cellSize._components(cellSize), dtype=float) if isinstance(cellSize, _vecBase) else cellSize
+        return _ivecArrayBase._FAMILY[v._N]._wrap(np.floor(v.data / size).astype(np.int32))
+    if isinstance(v, _vecBase) and v._PREFIX == "vec":
+        # subclasses like frozenvec3 or the views on buffers
+        return _QUANTIZE[_VECTOR_TYPES[v._N]](v, cellSize)
+    raise ValueError(f"Invalid type for quantize: {type(v).__name__} (expected a float vector or a batch of them)")
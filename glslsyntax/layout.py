@@ -0,0 +1,368 @@
+import struct
+from array import array
+from typing import Self, Union, Any, List, Tuple, Dict, Iterator
+
+from .vectors import _vecBase, _cast_buffer, _ATTRIBUTES, vec2, vec3, vec4
+from .matrices import _matBase
+
+__all__ = ["Struct"]
+
+_LAYOUTS = ("std140", "std430")
+
+# GLSL scalars are 32 bits in uniform and storage blocks
+_SCALAR_FORMATS = {float: "f", int: "i"}
+# format of the components by vector family, a bvec is stored as uint
+_VECTOR_FORMATS = {"vec": "f", "ivec": "i", "uvec": "I", "bvec": "I"}
+
+_Field = Union[type, Tuple[Any, int], "Struct"]
+_Record = Union[Dict[str, Any], List[Any], Tuple[Any, ...]]
+
+
+def _round_up(n: int, alignment: int) -> int:
+    return (n + alignment - 1) // alignment * alignment
+
+
+def _padding(n: int) -> str:
+    return f"{n}x" if n else ""
+
+
+class _Scalar(object):
+    # float or int, 4 bytes
+    def __init__(self, code: str):
+        self.align = self.size = 4
+        self.count = 1
+        self.format = code
+        self.code = code
+
+    def flatten(self, value: Any, out: list) -> None:
+        out.append(value)
+
+    def unflatten(self, values: Iterator) -> Any:
+        return next(values)
+
+    def view(self, raw: memoryview, offset: int) -> Any:
+        # a scalar has no view, it is read directly
+        return None
+
+
+class _Vector(object):
+    # vec2 is aligned on 8 bytes, vec3 and vec4 on 16 bytes, whatever the family
+    def __init__(self, cls: type):
+        self.cls = cls
+        self.align = 8 if cls._N == 2 else 16
+        self.size = 4 * cls._N
+        self.count = cls._N
+        self.code = _VECTOR_FORMATS[cls._PREFIX]
+        self.format = f"{cls._N}{self.code}"
+
+    def flatten(self, value: _vecBase, out: list) -> None:
+        out.extend(value._components(value))
+
+    def unflatten(self, values: Iterator) -> _vecBase:
+        components = [next(values) for _ in range(self.cls._N)]
+        # the uints of a bvec go through the constructor to become bools
+        return self.cls(*components) if self.cls._PREFIX == "bvec" else self.cls._new(*components)
+
+    def view(self, raw: memoryview, offset: int) -> Union[_vecBase, None]:
+        # a bvec has no view since its components are stored as uints
+        if self.cls._PREFIX == "bvec":
+            return None
+        return self.cls._view(_cast_buffer(raw, offset, self.cls._N, self.code))
+
+
+class _Matrix(object):
+    # an array of columns: in std140 each column takes 16 bytes, in std430 the columns of a matNx2 are
+    # packed on 8 bytes
+    def __init__(self, cls: type, layout: str):
+        self.cls = cls
+        column = _Vector({2: vec2, 3: vec3, 4: vec4}[cls._N])
+        self.align = 16 if layout == "std140" else column.align
+        self.stride = _round_up(column.size, self.align)
+        self.size = self.stride * cls._M
+        self.count = cls._N * cls._M
+        self.format = (column.format + _padding(self.stride - column.size)) * cls._M
+
+    def flatten(self, value: _matBase, out: list) -> None:
+        out.extend(value._data)
+
+    def unflatten(self, values: Iterator) -> _matBase:
+        return self.cls._new(array("d", [next(values) for _ in range(self.cls._N * self.cls._M)]))
+
+    def view(self, raw: memoryview, offset: int) -> Any:
+        # only matrices with packed columns can share the buffer
+        if self.stride != 4 * self.cls._N:
+            return None
+        return self.cls.fromBuffer(raw, offset, "f")
+
+
+class _Array(object):
+    # fixed size array, the stride of the elements is rounded up to a vec4 in std140
+    def __init__(self, element: Any, length: int, layout: str):
+        self.element = element
+        self.length = length
+        self.align = _round_up(element.align, 16) if layout == "std140" else element.align
+        self.stride = _round_up(element.size, self.align)
+        self.size = self.stride * length
+        self.count = element.count * length
+        self.format = (element.format + _padding(self.stride - element.size)) * length
+
+    def flatten(self, value: Any, out: list) -> None:
+        if len(value) != self.length:
+            raise ValueError(f"Invalid length for an array: {len(value)} (expected {self.length})")
+        for e in value:
+            self.element.flatten(e, out)
+
+    def unflatten(self, values: Iterator) -> list:
+        return [self.element.unflatten(values) for _ in range(self.length)]
+
+    def view(self, raw: memoryview, offset: int) -> Any:
+        if isinstance(self.element, _Scalar):
+            # a strided memoryview reads and writes the scalars in place
+            items = raw[offset:offset + self.size].cast(self.element.code)
+            return items[::self.stride // 4]
+        # the elements have the same type, if the first one has no view (a bvec, a matrix with padded
+        # columns or an array of them) the array is unpacked
+        first = self.element.view(raw, offset)
+        if first is None:
+            return None
+        return [first] + [self.element.view(raw, offset + i * self.stride) for i in range(1, self.length)]
+
+
+def _field_type(t: _Field, layout: str) -> Any:
+    if isinstance(t, Struct):
+        if t.layout != layout:
+            raise ValueError(f"Invalid layout for a nested struct: {t.layout} (expected {layout})")
+        return t
+    if isinstance(t, tuple) and len(t) == 2 and isinstance(t[1], int):
+        return _Array(_field_type(t[0], layout), t[1], layout)
+    if t in _SCALAR_FORMATS:
+        return _Scalar(_SCALAR_FORMATS[t])
+    if isinstance(t, type) and issubclass(t, _vecBase) and "_N" in t.__dict__:
+        return _Vector(t)
+    if isinstance(t, type) and issubclass(t, _matBase) and "_N" in t.__dict__:
+        return _Matrix(t, layout)
+    raise ValueError(f"Invalid type for a struct field: {t!r} (expected float, int, a vector, a matrix, "
+                     f"a Struct or a (type, length) array)")
+
+
+def _flatten_field(t: Any, value: Any) -> list:
+    values = []
+    t.flatten(value, values)
+    return values
+
+
+def _make_flattener(types: Dict[str, Any], by_name: bool) -> Any:
+    # unrolled function returning the values of all the fields of a record as one tuple, the record
+    # being a dict if by_name, a sequence in field order otherwise
+    terms = []
+    env = {"_flatten_field": _flatten_field}
+    for i, t in enumerate(types.values()):
+        if isinstance(t, _Scalar):
+            terms.append(f"f{i}")
+        elif isinstance(t, _Vector):
+            terms.extend(f"f{i}.{attr}" for attr in _ATTRIBUTES[:t.cls._N])
+        elif isinstance(t, _Matrix):
+            terms.append(f"*f{i}._data")
+        else:
+            env[f"t{i}"] = t
+            terms.append(f"*_flatten_field(t{i}, f{i})")
+    if by_name:
+        fields = "\n".join(f"    f{i} = r[{name!r}]" for i, name in enumerate(types))
+    else:
+        fields = f"    {', '.join(f'f{i}' for i in range(len(types)))}, = r"
+    source = f"def flatten(r):\n{fields}\n    return ({', '.join(terms)},)\n"
+    methods = {}
+    exec(source, env, methods)
+    return methods["flatten"]
+
+
+def _make_unflattener(types: Dict[str, Any]) -> Any:
+    # unrolled function building the dict of a record from the tuple of its values
+    items = []
+    env = {"_array": array}
+    start = 0
+    for i, (name, t) in enumerate(types.items()):
+        end = start + t.count
+        if isinstance(t, _Scalar):
+            value = f"v[{start}]"
+        elif isinstance(t, _Vector):
+            env[f"t{i}"] = t.cls
+            new = "" if t.cls._PREFIX == "bvec" else "._new"
+            value = f"t{i}{new}({', '.join(f'v[{j}]' for j in range(start, end))})"
+        elif isinstance(t, _Matrix):
+            env[f"t{i}"] = t.cls
+            value = f"t{i}._new(_array('d', v[{start}:{end}]))"
+        else:
+            env[f"t{i}"] = t
+            value = f"t{i}.unflatten(iter(v[{start}:{end}]))"
+        items.append(f"{name!r}: {value}")
+        start = end
+    source = f"def unflatten(v):\n    return {{{', '.join(items)}}}\n"
+    methods = {}
+    exec(source, env, methods)
+    return methods["unflatten"]
+
+
+def _make_field_property(name: str, t: Any, offset: int) -> property:
+    # read the field lazily in the buffer of the record: vectors, packed matrices, arrays and nested
+    # structs are views, the other fields are unpacked on access
+    field = struct.Struct("<" + t.format)
+
+    def fget(self):
+        view = t.view(self._raw, self._off + offset)
+        if view is not None:
+            return view
+        return t.unflatten(iter(field.unpack_from(self._raw, self._off + offset)))
+
+    def fset(self, value):
+        values = []
+        t.flatten(value, values)
+        field.pack_into(self._raw, self._off + offset, *values)
+
+    return property(fget, fset)
+
+
+class _RecordView(object):
+    # a record of a struct read in place in a buffer, see Struct.view()
+    __slots__ = ("_raw", "_off")
+    _STRUCT = None
+
+    def __repr__(self) -> str:
+        values = [getattr(self, name) for name in self._STRUCT.offsets]
+        fields = ", ".join(f"{name}={value.tolist() if isinstance(value, memoryview) else value!r}"
+                           for name, value in zip(self._STRUCT.offsets, values))
+        return f"{self._STRUCT.name}({fields})"
+
+
+class _RecordArrayView(object):
+    # count consecutive records of a struct in a buffer, each one is created on access
+    __slots__ = ("_struct", "_raw", "_off", "_count")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, key: int) -> _RecordView:
+        if key < 0:
+            key += self._count
+        if not 0 <= key < self._count:
+            raise IndexError(f"index {key} is out of range for {self._count} records")
+        return self._struct._view(self._raw, self._off + key * self._struct.size)
+
+    def __iter__(self) -> Iterator[_RecordView]:
+        for i in range(self._count):
+            yield self._struct._view(self._raw, self._off + i * self._struct.size)
+
+
+class Struct(object):
+    # a GLSL struct with the std140 (uniform blocks) or std430 (storage blocks) memory layout, records
+    # are packed as float32 and int32 one after the other, every size rounded up to the alignment
+    def __init__(self, fields: Union[Dict[str, _Field], List[Tuple[str, _Field]]], layout: str = "std140",
+                 name: str = "Struct"):
+        if layout not in _LAYOUTS:
+            raise ValueError(f"Invalid layout: {layout!r} (expected 'std140' or 'std430')")
+        self.layout = layout
+        self.name = name
+        fields = list(fields.items()) if isinstance(fields, dict) else list(fields)
+        if not fields:
+            raise ValueError("A struct needs at least one field")
+
+        self.offsets = {}
+        self._types = {}
+        size = 0
+        alignment = 4
+        fmt = "<"
+        for field_name, t in fields:
+            t = _field_type(t, layout)
+            offset = _round_up(size, t.align)
+            fmt += _padding(offset - size) + t.format
+            self.offsets[field_name] = offset
+            self._types[field_name] = t
+            size = offset + t.size
+            alignment = max(alignment, t.align)
+
+        # a struct is aligned like a vec4 in std140, and its size is a multiple of its alignment so
+        # that the records of an array follow each other
+        self.align = _round_up(alignment, 16) if layout == "std140" else alignment
+        self.size = _round_up(size, self.align)
+        self.format = fmt[1:] + _padding(self.size - size)
+        self._struct = struct.Struct("<" + self.format)
+        self._flatten_dict = _make_flattener(self._types, True)
+        self._flatten_sequence = _make_flattener(self._types, False)
+        self._unflatten = _make_unflattener(self._types)
+        self.count = sum(t.count for t in self._types.values())
+
+        namespace = {"__slots__": (), "_STRUCT": self}
+        for field_name, t in self._types.items():
+            namespace[field_name] = _make_field_property(field_name, t, self.offsets[field_name])
+        self._View = type(f"{name}view", (_RecordView,), namespace)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}@{offset}" for name, offset in self.offsets.items())
+        return f"Struct({self.name}, {self.layout}, size={self.size}: {fields})"
+
+    def _flatten(self, record: _Record) -> tuple:
+        # the values of a record in field order, as given to the struct module
+        if isinstance(record, dict):
+            return self._flatten_dict(record)
+        if isinstance(record, _RecordView):
+            record = [getattr(record, name) for name in self._types]
+        if len(record) != len(self._types):
+            raise ValueError(f"Invalid number of fields for {self.name}: {len(record)} (expected {len(self._types)})")
+        return self._flatten_sequence(record)
+
+    def flatten(self, value: _Record, out: list) -> None:
+        out.extend(self._flatten(value))
+
+    def unflatten(self, values: Iterator) -> Dict[str, Any]:
+        return self._unflatten([next(values) for _ in range(self.count)])
+
+    def _view(self, raw: memoryview, offset: int) -> _RecordView:
+        res = object.__new__(self._View)
+        res._raw = raw
+        res._off = offset
+        return res
+
+    def pack(self, records: List[_Record]) -> bytearray:
+        # a new buffer holding the records
+        buffer = bytearray(self.size * len(records))
+        self.packInto(buffer, records)
+        return buffer
+
+    def packInto(self, buffer: Any, records: List[_Record], offset: int = 0) -> None:
+        # write the records in buffer (bytearray, mmap, ...) from offset bytes
+        end = offset + self.size * len(records)
+        if offset < 0 or end > len(memoryview(buffer).cast("B")):
+            raise ValueError(f"Invalid offset for {len(records)} records of {self.size} bytes: {offset}")
+        pack_into = self._struct.pack_into
+        flatten = self._flatten
+        for record in records:
+            pack_into(buffer, offset, *flatten(record))
+            offset += self.size
+
+    def unpack(self, buffer: Any, offset: int = 0, count: int = 1) -> List[Dict[str, Any]]:
+        # copy count records out of buffer, as dicts of vectors, matrices and lists
+        unflatten = self._unflatten
+        return [unflatten(values) for values in
+                self._struct.iter_unpack(memoryview(buffer).cast("B")[offset:offset + self.size * count])]
+
+    def view(self, buffer: Any, offset: int = 0) -> _RecordView:
+        # one record read and written in place in buffer at offset bytes, its fields are only read on
+        # access
+        raw = memoryview(buffer).cast("B")
+        if offset < 0 or offset + self.size > len(raw):
+            raise ValueError(f"Invalid offset for a record of {self.size} bytes: {offset}")
+        return self._view(raw, offset)
+
+    def views(self, buffer: Any, offset: int = 0, count: int = -1) -> _RecordArrayView:
+        # count consecutive records of buffer, as many as fit after offset if count is -1
+        raw = memoryview(buffer).cast("B")
+        if count < 0:
+            count = (len(raw) - offset) // self.size
+        if offset < 0 or offset + self.size * count > len(raw):
+            raise ValueError(f"Invalid offset for {count} records of {self.size} bytes: {offset}")
+        res = object.__new__(_RecordArrayView)
+        res._struct = self
+        res._raw = raw
+        res._off = offset
+        res._count = count
+        return res
@@ -0,0 +1,339 @@
+from array import array
+from typing import Union, Any, List, Tuple
+
+from .vectors import _vecBase, _SCALARS, vec2, vec3, vec4
+from .matrices import _matBase, _MATRIX_TYPES
+from .quaternions import quat
+
+__all__ = ["lazy"]
+
+_Number = Union[int, float]
+_Value = Union[_Number, _vecBase, _matBase]
+
+_OPERATORS = {"add": "+", "sub": "-", "mul": "*", "truediv": "/"}
+_VECTOR_TYPES = {2: vec2, 3: vec3, 4: vec4}
+
+# compiled kernels, by structure of the expression tree
+_KERNELS = {}
+_MAX_KERNELS = 1024
+
+
+def _kind(value: _Value) -> tuple:
+    # ("s",) for a scalar, ("v", n) for a vecN and ("m", n, m) for a matrix of n rows and m columns
+    if isinstance(value, _SCALARS):
+        return ("s",)
+    if isinstance(value, quat):
+        # its product is not the component-wise one of vec4
+        raise ValueError("Quaternions are not supported by lazy expressions")
+    if isinstance(value, _vecBase):
+        if value._PREFIX != "vec":
+            raise ValueError(f"Invalid type for a lazy expression: {type(value)} (only float vectors are supported)")
+        return ("v", value._N)
+    if isinstance(value, _matBase):
+        return ("m", value._N, value._M)
+    raise ValueError(f"Invalid type for a lazy expression: {type(value)}")
+
+
+def _dims(kind: tuple, first: bool) -> Tuple[int, int]:
+    # rows and columns of a factor of a product chain, a vector is a row on the left and a column elsewhere
+    if kind[0] == "m":
+        return kind[1], kind[2]
+    return (1, kind[1]) if first else (kind[1], 1)
+
+
+class Expression(object):
+    # node of a lazy expression tree, see lazy()
+    __slots__ = ("_op", "_operands", "_kind", "_kernel", "_args")
+
+    def _node(self, op: str, *operands: Any) -> "Expression":
+        res = object.__new__(Expression)
+        res._op = op
+        res._operands = tuple(o if isinstance(o, Expression) else _leaf(o) for o in operands)
+        res._kind = _infer(op, [o._kind for o in res._operands])
+        res._kernel = None
+        return res
+
+    def __add__(self, other: Any) -> "Expression":
+        return self._node("add", self, other)
+
+    def __radd__(self, other: Any) -> "Expression":
+        return self._node("add", other, self)
+
+    def __sub__(self, other: Any) -> "Expression":
+        return self._node("sub", self, other)
+
+    def __rsub__(self, other: Any) -> "Expression":
+        return self._node("sub", other, self)
+
+    def __mul__(self, other: Any) -> "Expression":
+        return self._node("mul", self, other)
+
+    def __rmul__(self, other: Any) -> "Expression":
+        return self._node("mul", other, self)
+
+    def __truediv__(self, other: Any) -> "Expression":
+        return self._node("truediv", self, other)
+
+    def __rtruediv__(self, other: Any) -> "Expression":
+        return self._node("truediv", other, self)
+
+    def __neg__(self) -> "Expression":
+        return self._node("neg", self)
+
+    def _key(self, args: list, seen: dict) -> tuple:
+        # structure of the expression graph, the leaves are only described by their kind and collected
+        # in args; a node or a leaf value met again is ("ref", i), i being the order of its first visit
+        ident = id(self._operands[0]) if self._op == "leaf" else id(self)
+        index = seen.get(ident)
+        if index is not None:
+            return ("ref", index)
+        seen[ident] = len(seen)
+        if self._op == "leaf":
+            args.append(self._operands[0])
+            return self._kind
+        return (self._op,) + tuple(o._key(args, seen) for o in self._operands)
+
+    def eval(self) -> _Value:
+        # compute the expression in one generated function, the values of the leaves are read again
+        # at each call so an expression can be evaluated after modifying its vectors in place
+        if self._kernel is None:
+            args = []
+            key = self._key(args, {})
+            kernel = _KERNELS.get(key)
+            if kernel is None:
+                if len(_KERNELS) >= _MAX_KERNELS:
+                    _KERNELS.clear()
+                kernel = _KERNELS[key] = _compile(self)
+            self._kernel = kernel
+            self._args = args
+        return self._kernel(*self._args)
+
+    def __getattr__(self, name: str) -> Any:
+        # reading a component, a swizzle or a method evaluates the expression
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.eval(), name)
+
+    def __getitem__(self, key: int) -> Any:
+        return self.eval()[key]
+
+    def __eq__(self, other: Any) -> bool:
+        return self.eval() == (other.eval() if isinstance(other, Expression) else other)
+
+    def __ne__(self, other: Any) -> bool:
+        return not self.__eq__(other)
+
+    def __repr__(self) -> str:
+        return repr(self.eval())
+
+
+def _leaf(value: _Value) -> Expression:
+    res = object.__new__(Expression)
+    res._op = "leaf"
+    res._operands = (value,)
+    res._kind = _kind(value)
+    res._kernel = None
+    return res
+
+
+def _identity(node: Expression) -> int:
+    # the leaves of the same value are merged into one argument of the kernel
+    return id(node._operands[0]) if node._op == "leaf" else id(node)
+
+
+def _shared(root: Expression) -> set:
+    # identities of the nodes which are operands of several nodes
+    counts = {}
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node._op == "leaf":
+            continue
+        for operand in node._operands:
+            ident = id(operand)
+            counts[ident] = counts.get(ident, 0) + 1
+            if counts[ident] == 1:
+                stack.append(operand)
+    return {ident for ident, count in counts.items() if count > 1}
+
+
+def lazy(*values: _Value) -> Union[Expression, Tuple[Expression, ...]]:
+    # wrap vectors, matrices or numbers so that the operations on them build an expression tree,
+    # computed in a single pass by eval() or when the value is read
+    if len(values) == 1:
+        return _leaf(values[0])
+    return tuple(_leaf(v) for v in values)
+
+
+def _infer(op: str, kinds: List[tuple]) -> tuple:
+    # kind of the result of an operation, with the same rules as the vectors and matrices
+    if op == "neg":
+        return kinds[0]
+    a, b = kinds
+    if op == "mul" and "m" in (a[0], b[0]) and "s" not in (a[0], b[0]):
+        # product of a matrix with a matrix or a vector
+        rows, inner = _dims(a, True)
+        inner2, columns = _dims(b, False)
+        if inner != inner2:
+            raise ValueError(f"Invalid sizes for a product: {rows}x{inner} * {inner2}x{columns}")
+        if a[0] == "v":
+            return ("v", columns)
+        if b[0] == "v":
+            return ("v", rows)
+        return ("m", rows, columns)
+    if a[0] == "s":
+        return b
+    if b[0] == "s":
+        return a
+    if a[0] == "v" and b[0] == "v":
+        # component-wise, with the size of the smallest vector
+        return ("v", min(a[1], b[1]))
+    if a == b:
+        return a
+    raise ValueError(f"Invalid operands for {op}: {a} and {b}")
+
+
+def _is_product(node: Expression) -> bool:
+    if node._op != "mul":
+        return False
+    kinds = [o._kind[0] for o in node._operands]
+    return "m" in kinds and "s" not in kinds
+
+
+def _chain(node: Expression, factors: list, shared: set) -> None:
+    # the factors of nested matrix products, in order; a product giving a vector is only merged when
+    # the vector stays at the end of the chain, a row on the left or a column on the right, and a shared
+    # product is a factor computed once
+    for i, operand in enumerate(node._operands):
+        if _is_product(operand) and id(operand) not in shared and \
+                (operand._kind[0] == "m" or (i == 0) == (operand._operands[0]._kind[0] == "v")):
+            _chain(operand, factors, shared)
+        else:
+            factors.append(operand)
+
+
+def _chain_order(dims: List[Tuple[int, int]]) -> List[List[int]]:
+    # classic matrix chain ordering: split[i][j] is where the cheapest product of factors i..j is split
+    n = len(dims)
+    cost = [[0] * n for _ in range(n)]
+    split = [[0] * n for _ in range(n)]
+    for length in range(1, n):
+        for i in range(n - length):
+            j = i + length
+            cost[i][j] = None
+            for k in range(i, j):
+                c = cost[i][k] + cost[k + 1][j] + dims[i][0] * dims[k][1] * dims[j][1]
+                if cost[i][j] is None or c < cost[i][j]:
+                    cost[i][j] = c
+                    split[i][j] = k
+    return split
+
+
+class _Compiler(object):
+    # generate straight-line code: component-wise operations are fused into one expression per
+    # component, products and the nodes with several parents are computed once into local variables
+    def __init__(self, root: Expression):
+        self.lines = []
+        self.args = []
+        self.count = 0
+        self.shared = _shared(root)
+        # terms of the nodes already compiled, by identity
+        self.terms = {}
+
+    def temporaries(self, terms: List[str]) -> List[str]:
+        # store the terms which are not already names into local variables
+        res = []
+        for term in terms:
+            if term.isidentifier():
+                res.append(term)
+            else:
+                name = f"t{self.count}"
+                self.count += 1
+                self.lines.append(f"{name} = {term}")
+                res.append(name)
+        return res
+
+    def leaf(self, kind: tuple) -> List[str]:
+        name = f"a{len(self.args)}"
+        self.args.append(name)
+        if kind[0] == "s":
+            return [name]
+        if kind[0] == "v":
+            terms = [f"{name}_{i}" for i in range(kind[1])]
+            self.lines.append(f"{', '.join(terms)}, = {name}._components({name})")
+            return terms
+        terms = [f"{name}_{i}" for i in range(kind[1] * kind[2])]
+        self.lines.append(f"{', '.join(terms)}, = {name}._data")
+        return terms
+
+    def product(self, left: List[str], right: List[str], rows: int, inner: int, columns: int) -> List[str]:
+        # column-major (rows x inner) * (inner x columns)
+        left = self.temporaries(left)
+        right = self.temporaries(right)
+        return self.temporaries([" + ".join(f"{left[k * rows + i]} * {right[j * inner + k]}" for k in range(inner))
+                                 for j in range(columns) for i in range(rows)])
+
+    def chain(self, node: Expression) -> List[str]:
+        factors = []
+        _chain(node, factors, self.shared)
+        dims = [_dims(f._kind, i == 0) for i, f in enumerate(factors)]
+        terms = [self.compile(f) for f in factors]
+        split = _chain_order(dims)
+
+        def multiply(i, j):
+            if i == j:
+                return terms[i]
+            k = split[i][j]
+            return self.product(multiply(i, k), multiply(k + 1, j), dims[i][0], dims[k][1], dims[j][1])
+
+        return multiply(0, len(factors) - 1)
+
+    def compile(self, node: Expression) -> List[str]:
+        # the terms of the components of the value of node, visited in the order of Expression._key
+        ident = _identity(node)
+        terms = self.terms.get(ident)
+        if terms is None:
+            terms = self.node(node)
+            if ident in self.shared:
+                # a node with several parents is computed once
+                terms = self.temporaries(terms)
+            self.terms[ident] = terms
+        return terms
+
+    def node(self, node: Expression) -> List[str]:
+        if node._op == "leaf":
+            return self.leaf(node._kind)
+        if node._op == "neg":
+            return [f"(-{t})" for t in self.compile(node._operands[0])]
+        if _is_product(node):
+            return self.chain(node)
+        a, b = node._operands
+        left = self.compile(a)
+        right = self.compile(b)
+        op = _OPERATORS[node._op]
+        if len(left) == 1:
+            left = left * len(right)
+        if len(right) == 1:
+            right = right * len(left)
+        size = min(len(left), len(right))
+        return [f"({l} {op} {r})" for l, r in zip(left[:size], right[:size])]
+
+
+def _compile(node: Expression) -> Any:
+    compiler = _Compiler(node)
+    terms = compiler.compile(node)
+    kind = node._kind
+    env = {"_array": array}
+    if kind[0] == "s":
+        result = terms[0]
+    elif kind[0] == "v":
+        env["result"] = _VECTOR_TYPES[kind[1]]
+        result = f"result._new({', '.join(terms)})"
+    else:
+        env["result"] = _MATRIX_TYPES[(kind[1], kind[2])]
+        result = f"result._new(_array('d', ({', '.join(terms)},)))"
+    body = "".join(f"    {line}\n" for line in compiler.lines)
+    source = f"def kernel({', '.join(compiler.args)}):\n{body}    return {result}\n"
+    methods = {}
+    exec(source, env, methods)
+    return methods["kernel"]
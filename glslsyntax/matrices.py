@@ -1,5 +1,9 @@
-from .vectors import *
-from typing import Tuple, Union, List
+import math
+import operator
+from array import array
+from typing import Self, Tuple, Union, List, Sequence, Any
+
+from .vectors import _vecBase, _SCALARS, _cast_buffer, _array_interface, vec2, vec3, vec4
 
 _Number = Union[int, float]
 _Vector = Union[vec2, vec3, vec4]
@@ -9,10 +13,315 @@ _ATTRIBUTES = "xyzw"
 _ATTRIBUTES_ALIASES = "rgba"
 
 
+# Determinants and inverses of flat row-major sequences. As det(A) = det(A^T) and
+# inv(A^T) = inv(A)^T, they can be applied directly to the column-major storage of the matrices.
+
+def _det2(m: Sequence[_Number]) -> _Number:
+    a, b, c, d = m
+    return a * d - b * c
+
+
+def _det3(m: Sequence[_Number]) -> _Number:
+    a, b, c, d, e, f, g, h, i = m
+    return a * (e * i - f * h) - b * (d * i - f * g) + c * (d * h - e * g)
+
+
+def _minors4(m: Sequence[_Number]) -> Tuple[_Number, ...]:
+    # the 2x2 minors of the two top rows and of the two bottom rows, shared by _det4 and _inverse4
+    a00, a01, a02, a03, a10, a11, a12, a13, a20, a21, a22, a23, a30, a31, a32, a33 = m
+    s0 = a00 * a11 - a10 * a01
+    s1 = a00 * a12 - a10 * a02
+    s2 = a00 * a13 - a10 * a03
+    s3 = a01 * a12 - a11 * a02
+    s4 = a01 * a13 - a11 * a03
+    s5 = a02 * a13 - a12 * a03
+    c0 = a20 * a31 - a30 * a21
+    c1 = a20 * a32 - a30 * a22
+    c2 = a20 * a33 - a30 * a23
+    c3 = a21 * a32 - a31 * a22
+    c4 = a21 * a33 - a31 * a23
+    c5 = a22 * a33 - a32 * a23
+    return s0, s1, s2, s3, s4, s5, c0, c1, c2, c3, c4, c5
+
+
+def _det4(m: Sequence[_Number]) -> _Number:
+    s0, s1, s2, s3, s4, s5, c0, c1, c2, c3, c4, c5 = _minors4(m)
+    return s0 * c5 - s1 * c4 + s2 * c3 + s3 * c2 - s4 * c1 + s5 * c0
+
+
+def _inverse2(m: Sequence[_Number]) -> List[_Number]:
+    a, b, c, d = m
+    det = a * d - b * c
+    if det == 0:
+        raise ValueError("Matrix is not invertible")
+    return [d / det, -b / det,
+            -c / det, a / det]
+
+
+def _inverse3(m: Sequence[_Number]) -> List[_Number]:
+    a, b, c, d, e, f, g, h, i = m
+    # cofactors of the first row, reused by the determinant
+    c00 = e * i - f * h
+    c01 = f * g - d * i
+    c02 = d * h - e * g
+    det = a * c00 + b * c01 + c * c02
+    if det == 0:
+        raise ValueError("Matrix is not invertible")
+    return [c00 / det, (c * h - b * i) / det, (b * f - c * e) / det,
+            c01 / det, (a * i - c * g) / det, (c * d - a * f) / det,
+            c02 / det, (b * g - a * h) / det, (a * e - b * d) / det]
+
+
+def _inverse4(m: Sequence[_Number]) -> List[_Number]:
+    a00, a01, a02, a03, a10, a11, a12, a13, a20, a21, a22, a23, a30, a31, a32, a33 = m
+    s0, s1, s2, s3, s4, s5, c0, c1, c2, c3, c4, c5 = _minors4(m)
+    det = s0 * c5 - s1 * c4 + s2 * c3 + s3 * c2 - s4 * c1 + s5 * c0
+    if det == 0:
+        raise ValueError("Matrix is not invertible")
+    return [(a11 * c5 - a12 * c4 + a13 * c3) / det,
+            (-a01 * c5 + a02 * c4 - a03 * c3) / det,
+            (a31 * s5 - a32 * s4 + a33 * s3) / det,
+            (-a21 * s5 + a22 * s4 - a23 * s3) / det,
+            (-a10 * c5 + a12 * c2 - a13 * c1) / det,
+            (a00 * c5 - a02 * c2 + a03 * c1) / det,
+            (-a30 * s5 + a32 * s2 - a33 * s1) / det,
+            (a20 * s5 - a22 * s2 + a23 * s1) / det,
+            (a10 * c4 - a11 * c2 + a13 * c0) / det,
+            (-a00 * c4 + a01 * c2 - a03 * c0) / det,
+            (a30 * s4 - a31 * s2 + a33 * s0) / det,
+            (-a20 * s4 + a21 * s2 - a23 * s0) / det,
+            (-a10 * c3 + a11 * c1 - a12 * c0) / det,
+            (a00 * c3 - a01 * c1 + a02 * c0) / det,
+            (-a30 * s3 + a31 * s1 - a32 * s0) / det,
+            (a20 * s3 - a21 * s1 + a22 * s0) / det]
+
+
+_CLOSED_DETERMINANTS = {2: _det2, 3: _det3, 4: _det4}
+_CLOSED_INVERSES = {2: _inverse2, 3: _inverse3, 4: _inverse4}
+
+
+def _lu_decompose(m: List[List[_Number]]) -> Union[Tuple[List[List[float]], List[int], int], None]:
+    # Doolittle decomposition with partial pivoting, L and U packed in one list (L has a unit diagonal).
+    # Returns the packed rows, the row permutation and its sign, or None if the matrix is singular.
+    lu = [[float(e) for e in row] for row in m]
+    n = len(lu)
+    perm = list(range(n))
+    sign = 1
+    for k in range(n):
+        # pick the largest pivot of the column to bound the growth of rounding errors
+        p = max(range(k, n), key=lambda i: abs(lu[i][k]))
+        if lu[p][k] == 0:
+            return None
+        if p != k:
+            lu[k], lu[p] = lu[p], lu[k]
+            perm[k], perm[p] = perm[p], perm[k]
+            sign = -sign
+        pivot_row = lu[k]
+        pivot = pivot_row[k]
+        for i in range(k + 1, n):
+            row = lu[i]
+            f = row[k] / pivot
+            row[k] = f
+            for j in range(k + 1, n):
+                row[j] -= f * pivot_row[j]
+    return lu, perm, sign
+
+
+def _lu_det(m: List[List[_Number]]) -> float:
+    decomposition = _lu_decompose(m)
+    if decomposition is None:
+        return 0.0
+    lu, _, sign = decomposition
+    res = float(sign)
+    for i in range(len(lu)):
+        res *= lu[i][i]
+    return res
+
+
+def _lu_inverse(m: List[List[_Number]]) -> List[List[float]]:
+    decomposition = _lu_decompose(m)
+    if decomposition is None:
+        raise ValueError("Matrix is not invertible")
+    lu, perm, _ = decomposition
+    n = len(lu)
+    res = [[0.0] * n for _ in range(n)]
+    # solve m x = e_j for each column j of the inverse
+    for j in range(n):
+        x = [1.0 if perm[i] == j else 0.0 for i in range(n)]
+        for i in range(n):
+            row = lu[i]
+            x[i] -= sum(row[k] * x[k] for k in range(i))
+        for i in reversed(range(n)):
+            row = lu[i]
+            x[i] = (x[i] - sum(row[k] * x[k] for k in range(i + 1, n))) / row[i]
+        for i in range(n):
+            res[i][j] = x[i]
+    return res
+
+
+def _write(data: Any, start: int, values: Any) -> None:
+    # copy values into the storage of a matrix, which may be a float32 view over an external buffer
+    data[start:start + len(values)] = array(data.typecode if isinstance(data, array) else data.format, values)
+
+
+def _rotation(axis: vec3, angle: _Number) -> Tuple[float, ...]:
+    # column-major 3x3 rotation of angle radians around axis, which does not need to be normalized
+    x, y, z = axis.x, axis.y, axis.z
+    length = math.sqrt(x * x + y * y + z * z)
+    x, y, z = x / length, y / length, z / length
+    c, s = math.cos(angle), math.sin(angle)
+    t = 1.0 - c
+    return (c + t * x * x, t * x * y + s * z, t * x * z - s * y,
+            t * x * y - s * z, c + t * y * y, t * y * z + s * x,
+            t * x * z + s * y, t * y * z - s * x, c + t * z * z)
+
+
+def _vector_type(n: int) -> type:
+    return {2: vec2, 3: vec3, 4: vec4}[n]
+
+
+def _make_init_plan(cls: type, key: tuple) -> Any:
+    # unrolled __init__ for one signature of argument types, or None if a list has to be flattened
+    n, m = cls._N, cls._M
+    name = f"mat{n}" if n == m else f"mat{n}_{m}"
+    if any(issubclass(t, list) for t in key):
+        return None
+    if len(key) == 1 and issubclass(key[0], _SCALARS):
+        # create a diagonal matrix with the same value
+        values = ["a0" if j == i else "0.0" for j in range(m) for i in range(n)]
+    elif len(key) == 1 and issubclass(key[0], _vecBase):
+        # the same vector for every column
+        if key[0]._N != n:
+            raise ValueError(f"Invalid size for a vector: {key[0]._N} (expected {n})")
+        values = [f"a0.{_ATTRIBUTES[i]}" for i in range(n)] * m
+    else:
+        values = []
+        for i, t in enumerate(key):
+            if issubclass(t, _SCALARS):
+                values.append(f"a{i}")
+            elif issubclass(t, _vecBase):
+                values.extend(f"a{i}.{attr}" for attr in _ATTRIBUTES[:t._N])
+            elif issubclass(t, _matBase):
+                values.extend(f"a{i}._data[{k}]" for k in range(t._N * t._M))
+            else:
+                raise ValueError(f"Invalid type for {name}: {t}")
+    if len(values) != n * m:
+        raise ValueError(f"Invalid number of arguments for {name}: {len(values)} (expected {n * m})")
+    args = "".join(f", a{i}" for i in range(len(key)))
+    source = f"def init(self{args}):\n    self._data = _array('d', ({', '.join(values)},))\n"
+    methods = {}
+    exec(source, {"_array": array}, methods)
+    return methods["init"]
+
+
+def _make_from_columns(cls: type) -> Any:
+    # unrolled mat4.fromColumns(c0, c1, c2, c3), without any validation: each column must be a vec4
+    columns = [f"c{j}" for j in range(cls._M)]
+    values = ", ".join(f"{c}.{_ATTRIBUTES[i]}" for c in columns for i in range(cls._N))
+    source = f"""
+def fromColumns({", ".join(columns)}):
+    res = _object_new(cls)
+    res._data = _array("d", ({values},))
+    return res
+"""
+    methods = {}
+    exec(source, {"_object_new": object.__new__, "_array": array, "cls": cls}, methods)
+    return methods["fromColumns"]
+
+
+def _make_vector_products(cls: type) -> dict:
+    # unrolled mat * vec (column vector) and vec * mat (row vector) products of a matrix class, the
+    # element of column j and row i being a{j}{i}
+    n, m = cls._N, cls._M
+    elements = ", ".join(f"a{j}{i}" for j in range(m) for i in range(n))
+    source = f"""
+def _mul_vec(self, v):
+    {elements} = self._data
+    {", ".join(f"v{j}" for j in range(m))} = {", ".join(f"v.{_ATTRIBUTES[j]}" for j in range(m))}
+    r = _object_new(vecN)
+"""
+    for i in range(n):
+        source += f"    r.{_ATTRIBUTES[i]} = {' + '.join(f'a{j}{i} * v{j}' for j in range(m))}\n"
+    source += f"""    return r
+
+def _rmul_vec(self, v):
+    {elements} = self._data
+    {", ".join(f"v{i}" for i in range(n))} = {", ".join(f"v.{_ATTRIBUTES[i]}" for i in range(n))}
+    r = _object_new(vecM)
+"""
+    for j in range(m):
+        source += f"    r.{_ATTRIBUTES[j]} = {' + '.join(f'v{i} * a{j}{i}' for i in range(n))}\n"
+    source += "    return r\n"
+    methods = {}
+    exec(source, {"_object_new": object.__new__, "vecN": _vector_type(n), "vecM": _vector_type(m)}, methods)
+    return methods
+
+
+def _make_matrix_product(left: type, right: type, result: type) -> tuple:
+    # unrolled left * right, column j of the result being left * (column j of right); the in-place
+    # version writes the result back into the storage of left
+    n, m, q = left._N, left._M, right._M
+    elements = []
+    for j in range(q):
+        for i in range(n):
+            elements.append(" + ".join(f"a{k}{i} * b{j}{k}" for k in range(m)))
+    values = ",\n        ".join(elements)
+    source = f"""
+def _product(self, other):
+    {", ".join(f"a{k}{i}" for k in range(m) for i in range(n))} = self._data
+    {", ".join(f"b{j}{k}" for j in range(q) for k in range(m))} = other._data
+    res = _object_new(result)
+    res._data = _array("d", [
+        {values}])
+    return res
+"""
+    if m == q:
+        source += source[source.index("def _product"):source.index("    res = _object_new")].replace(
+            "def _product", "def _inplace_product")
+        source += f"""    _write(self._data, 0, [
+        {values}])
+    return self
+"""
+    methods = {}
+    exec(source, {"_object_new": object.__new__, "_array": array, "_write": _write, "result": result}, methods)
+    return methods["_product"], methods.get("_inplace_product")
+
+
+def _install_matrix_products(classes: List[type]) -> None:
+    # one product per pair of matrix classes with matching inner size, by (rows, columns) of the right
+    # operand so that the subclasses of the matrices find them
+    for left in classes:
+        left._products = {}
+        left._inplace_products = {}
+        for right in classes:
+            if left._M == right._N:
+                product, inplace_product = _make_matrix_product(left, right, _MATRIX_TYPES[(left._N, right._M)])
+                left._products[(right._N, right._M)] = product
+                if inplace_product is not None:
+                    left._inplace_products[(right._N, right._M)] = inplace_product
+
+
 class _matBase(object):
+    # the components are stored in one flat array of doubles, column after column like in GLSL
+    __slots__ = ("_data",)
     _N = 0
     _M = 0
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "_N" in cls.__dict__:
+            cls._plans = {}
+            for name, method in _make_vector_products(cls).items():
+                setattr(cls, name, method)
+            cls.fromColumns = staticmethod(_make_from_columns(cls))
+
+    @classmethod
+    def _new(cls, data: Any) -> Self:
+        # trusted constructor around an existing storage of _N * _M doubles
+        res = object.__new__(cls)
+        res._data = data
+        return res
+
     def _get_name(self) -> str:
         if self.isSquare():
             return f"mat{self._N}"
@@ -20,141 +329,169 @@ class _matBase(object):
             return f"mat{self._N}_{self._M}"
 
     def __init__(self, *args: Union[_Number, _Vector, _Matrix, List[_Number], List[List[_Number]]]):
-        if len(args) == 1:
-            if isinstance(args[0], _Vector):
-                if args[0].size != self._N:
-                    raise ValueError(f"Invalid size for a vector: {args[0].size} (expected {self._N})")
-                self.mat = [args[0] for _ in range(self._M)]
-                return
-            elif isinstance(args[0], _Number):
-                # create a diagonal matrix with the same value
-                self.mat = [empty_vec(self._N) for _ in range(self._M)]
-                for i in range(min(self._N, self._M)):
-                    self.mat[i][i] = args[0]
-                return
-
-        # count the number of arguments
-        n_data = 0
+        # the arguments are copied by a plan generated once per signature of argument types, lists are
+        # flattened on each call since their length is not part of the signature
+        key = tuple(map(type, args))
+        try:
+            init = self._plans[key]
+        except KeyError:
+            init = self._plans[key] = _make_init_plan(self.__class__, key)
+        if init is not None:
+            init(self, *args)
+            return
+
+        data = []
         for arg in args:
-            if isinstance(arg, _Number):
-                n_data += 1
-            elif isinstance(arg, _Vector):
-                n_data += arg.size
+            if isinstance(arg, list):
+                for e in arg:
+                    if isinstance(e, list):
+                        data.extend(e)
+                    else:
+                        data.append(e)
+            elif isinstance(arg, _vecBase):
+                data.extend(arg._components(arg))
             elif isinstance(arg, _matBase):
-                n_data += arg.size[0] * arg.size[1]
-            elif isinstance(arg, list) and all(isinstance(e, _Number) for e in arg):
-                n_data += len(arg)
-            elif isinstance(arg, list) and all(isinstance(e, list) for e in arg):
-                n_data += sum(len(e) for e in arg)
+                data.extend(arg._data)
             else:
-                raise ValueError(f"Invalid type for {self._get_name()}: {type(arg)}")
+                data.append(arg)
 
-        if n_data != self._N * self._M:
+        if len(data) != self._N * self._M:
             raise ValueError(
-                f"Invalid number of arguments for {self._get_name()}: {n_data} (expected {self._N * self._M})")
-        else:
-            # set the attributes
-            self.mat = [empty_vec(self._N, 0) for _ in range(self._M)]
-            i = 0
-            for arg in args:
-                if isinstance(arg, _Number):
-                    self.mat[i // self._N][i % self._N] = arg
-                    i += 1
-                elif isinstance(arg, _Vector):
-                    for j in range(arg.size):
-                        self.mat[i // self._N][i % self._N] = arg[j]
-                        i += 1
-                elif isinstance(arg, _matBase):
-                    for j in range(arg.size[0]):
-                        for k in range(arg.size[1]):
-                            self.mat[i // self._N][i % self._N] = arg[j][k]
-                            i += 1
-                elif isinstance(arg, list) and all(isinstance(e, _Number) for e in arg):
-                    for j in arg:
-                        self.mat[i // self._N][i % self._N] = j
-                        i += 1
-                elif isinstance(arg, list) and all(isinstance(e, list) for e in arg):
-                    for e in arg:
-                        for j in e:
-                            self.mat[i // self._N][i % self._N] = j
-                            i += 1
+                f"Invalid number of arguments for {self._get_name()}: {len(data)} (expected {self._N * self._M})")
+        try:
+            self._data = array("d", data)
+        except TypeError:
+            raise ValueError(f"Invalid type for {self._get_name()}: {data}") from None
 
-    def __add__(self, other: Union[_Matrix, _Number]) -> Self:
+    def _componentwise(self, other: Union[_Matrix, _Number], op: Any) -> Union[Self, Any]:
         if isinstance(other, _matBase):
             if self.size != other.size:
                 raise ValueError(f"Invalid size for a matrix: {other.size} (expected {self.size})")
-            return self.__class__(*[self[i] + other[i] for i in range(self._M)])
+            return self._new(array("d", map(op, self._data, other._data)))
         elif isinstance(other, _Number):
-            return self.__class__(*[self[i] + other for i in range(self._M)])
+            return self._new(array("d", [op(a, other) for a in self._data]))
+        return NotImplemented
+
+    def __add__(self, other: Union[_Matrix, _Number]) -> Self:
+        return self._componentwise(other, operator.add)
 
     def __radd__(self, other: _Number) -> Self:
-        return self.__class__(*[self[i] + other for i in range(self._M)])
+        return self._new(array("d", [other + a for a in self._data]))
 
     def __sub__(self, other: Union[_Matrix, _Number]) -> Self:
-        if isinstance(other, _matBase):
-            if self.size != other.size:
-                raise ValueError(f"Invalid size for a matrix: {other.size} (expected {self.size})")
-            return self.__class__(*[self[i] - other[i] for i in range(self._M)])
-        elif isinstance(other, _Number):
-            return self.__class__(*[self[i] - other for i in range(self._M)])
+        return self._componentwise(other, operator.sub)
 
     def __rsub__(self, other: _Number) -> Self:
-        return self.__class__(*[other - self[i] for i in range(self._M)])
+        return self._new(array("d", [other - a for a in self._data]))
 
-    def __mul__(self, other: Union[_Matrix, _Number]) -> Self:
+    def __mul__(self, other: Union[_Matrix, _Vector, _Number]) -> Union[_Matrix, _Vector]:
         if isinstance(other, _matBase):
-            if self._N != other.size[1]:
-                raise ValueError(f"Invalid size for a matrix: {other.size} (expected {self.size})")
-            else:
-                res = [[0 for _ in range(other.size[1])] for _ in range(self._N)]
-                for i in range(self._N):
-                    for j in range(other.size[1]):
-                        for k in range(self._M):
-                            res[i][j] += self[i][k] * other[k][j]
-                return self.__class__(*res)
+            # the result has the rows of self and the columns of other
+            product = self._products.get((other._N, other._M))
+            if product is None:
+                raise ValueError(f"Invalid size for a matrix: {other.size} (expected ({self._M}, _))")
+            return product(self, other)
+
+        elif isinstance(other, _Vector):
+            # transform a column vector, it must have one component per column
+            if other.size != self._M:
+                raise ValueError(f"Invalid size for a vector: {other.size} (expected {self._M})")
+            return self._mul_vec(other)
 
         elif isinstance(other, _Number):
-            return self.__class__(*[self[i] * other for i in range(self._M)])
+            return self._new(array("d", [a * other for a in self._data]))
+        return NotImplemented
 
-    def __rmul__(self, other: _Number) -> Self:
-        return self.__class__(*[self[i] * other for i in range(self._M)])
+    def __imul__(self, other: Union[_Matrix, _Number]) -> Self:
+        # in place product with a square matrix, or scaling
+        if isinstance(other, _matBase):
+            product = self._inplace_products.get((other._N, other._M))
+            if product is None:
+                raise ValueError(f"Invalid size for a matrix: {other.size} (expected ({self._M}, {self._M}))")
+            return product(self, other)
+        elif isinstance(other, _Number):
+            data = self._data
+            for i in range(len(data)):
+                data[i] *= other
+            return self
+        return NotImplemented
+
+    def __rmul__(self, other: Union[_Vector, _Number]) -> Union[Self, _Vector]:
+        if isinstance(other, _Vector):
+            # transform a row vector, it must have one component per row
+            if other.size != self._N:
+                raise ValueError(f"Invalid size for a vector: {other.size} (expected {self._N})")
+            return self._rmul_vec(other)
+        elif isinstance(other, _Number):
+            return self._new(array("d", [other * a for a in self._data]))
+        return NotImplemented
 
     def __truediv__(self, other: Union[_Number, _Matrix]) -> Self:
-        if isinstance(other, _matBase):
-            # make it component-wise
-            if self.size != other.size:
-                raise ValueError(f"Invalid size for a matrix: {other.size} (expected {self.size})")
-            else:
-                return self.__class__(*[self[i] / other[i] for i in range(self._M)])
-        else:
-            return self.__class__(*[self[i] / other for i in range(self._M)])
+        # component-wise with another matrix
+        return self._componentwise(other, operator.truediv)
 
     def __rtruediv__(self, other: _Number) -> Self:
-        return self.__class__(*[other / self[i] for i in range(self._M)])
+        return self._new(array("d", [other / a for a in self._data]))
 
     def __neg__(self) -> Self:
-        return self.__class__(*[-self[i] for i in range(self._M)])
+        return self._new(array("d", [-a for a in self._data]))
 
     def __eq__(self, other: _Matrix) -> bool:
         if not isinstance(other, _matBase):
             return False
         if self.size != other.size:
             return False
-        for i in range(self._M):
-            if self[i] != other[i]:
-                return False
-        return True
+        return self._data == other._data
 
     def __ne__(self, other: _Matrix) -> bool:
-        return not self.__eq__(other)   
+        return not self.__eq__(other)
 
     def __getitem__(self, key: int) -> _Vector:
-        return self.mat[key]
+        # a view of the column, modifying it modifies the matrix
+        if key < 0:
+            key += self._M
+        if not 0 <= key < self._M:
+            raise IndexError(f"index {key} is out of range for matrix with {self._M} columns")
+        return _vector_type(self._N)._view(self._data, key * self._N)
 
     def __setitem__(self, key: int, value: _Vector) -> None:
         if value.size != self._N:
             raise ValueError(f"Invalid size for a vector: {value.size} (expected {self._N})")
-        self.mat[key] = value
+        if key < 0:
+            key += self._M
+        if not 0 <= key < self._M:
+            raise IndexError(f"index {key} is out of range for matrix with {self._M} columns")
+        _write(self._data, key * self._N, value._components(value))
+
+    @property
+    def mat(self) -> List[_Vector]:
+        # the columns, as views
+        return [self[i] for i in range(self._M)]
+
+    @classmethod
+    def fromBuffer(cls, buffer: Any, offset: int = 0, format: str = "d") -> Self:
+        # a matrix reading and writing its column-major components in buffer at offset bytes, without
+        # copy; format is "d" for float64 components or "f" for float32
+        return cls._new(_cast_buffer(buffer, offset, cls._N * cls._M, format))
+
+    @property
+    def buffer(self) -> memoryview:
+        # the column-major storage, without copy
+        return memoryview(self._data)
+
+    def __buffer__(self, flags: int) -> memoryview:
+        # buffer protocol on Python 3.12+, memoryview(m) is the same as m.buffer
+        return memoryview(self._data)
+
+    @property
+    def __array_interface__(self) -> dict:
+        # one row per column, like getArray()
+        return _array_interface(self.buffer, (self._M, self._N))
+
+    def __array__(self, dtype: Any = None, copy: Any = None) -> Any:
+        # only called by numpy, which is then already imported
+        import numpy as np
+        return np.array(self.buffer, dtype=dtype, copy=copy).reshape(self._M, self._N)
 
     def __repr__(self) -> str:
         return f"{self._get_name()}{self.mat}"
@@ -165,7 +502,7 @@ class _matBase(object):
         for i in range(self._M):
             if i != 0:
                 strout += tab
-            strout += f"{self.mat[i]}"
+            strout += f"{self[i]}"
             if i != self._M - 1:
                 strout += "\n"
         strout += "]"
@@ -177,7 +514,7 @@ class _matBase(object):
     def isDiagonal(self) -> bool:
         for i in range(self._M):
             for j in range(self._N):
-                if i != j and self[i][j] != 0:
+                if i != j and self._data[i * self._N + j] != 0:
                     return False
         return True
 
@@ -186,7 +523,7 @@ class _matBase(object):
             return False
         for i in range(self._M):
             for j in range(i):
-                if self[i][j] != self[j][i]:
+                if self._data[i * self._N + j] != self._data[j * self._N + i]:
                     return False
         return True
 
@@ -195,9 +532,9 @@ class _matBase(object):
             return False
         for i in range(self._M):
             for j in range(self._N):
-                if i == j and self[i][j] != 1:
+                if i == j and self._data[i * self._N + j] != 1:
                     return False
-                elif i != j and self[i][j] != 0:
+                elif i != j and self._data[i * self._N + j] != 0:
                     return False
         return True
 
@@ -208,74 +545,66 @@ class _matBase(object):
 
 
     def getArray(self) -> List[List[_Number]]:
-        return [self[i].getArray() for i in range(self._M)]
+        data = self._data.tolist()
+        return [data[i * self._N:(i + 1) * self._N] for i in range(self._M)]
 
 
-    def __det(self, mat: List[List[_Number]]) -> _Number:
-        if len(mat) == 1:
-            return mat[0][0]
+    def determinant(self, method: str = "closed") -> _Number:
+        # "closed" uses the unrolled formulas; "lu" uses an LU decomposition with partial pivoting,
+        # more robust for ill-conditioned floats
+        if not self.isSquare():
+            raise ValueError("Determinant is only defined for square matrices")
+        if method == "closed":
+            return _CLOSED_DETERMINANTS[self._N](self._data)
+        elif method == "lu":
+            return _lu_det(self.getArray())
         else:
-            res = 0
-            for i in range(len(mat)):
-                submat = [mat[j][:i] + mat[j][i + 1:] for j in range(1, len(mat))]
-                res += ((-1) ** i) * mat[0][i] * self.__det(submat)
-            return res
+            raise ValueError(f"Invalid method for the determinant: {method} (expected 'closed' or 'lu')")
 
     @property
     def det(self) -> _Number:
-        if not self.isSquare():
-            raise ValueError("Determinant is only defined for square matrices")
-        else:
-            return self.__det(self.getArray())
+        return self.determinant()
 
     def transpose(self) -> Self:
         # modify the matrix in place by transposing it
-        self.mat = self.T.mat
+        if not self.isSquare():
+            raise ValueError("In place transpose is only defined for square matrices")
+        _write(self._data, 0, self.T._data)
         return self
 
     @property
-    def T(self) -> Self:
-        # return a new transposed matrix
-        res = [empty_vec(self._M) for _ in range(self._N)]
-        for i in range(self._M):
-            for j in range(self._N):
-                res[j][i] = self[i][j]
-        return self.__class__(*res)
+    def T(self) -> _Matrix:
+        # return a new transposed matrix, with the rows and columns sizes swapped
+        data = self._data
+        return _MATRIX_TYPES[(self._M, self._N)]._new(
+            array("d", [data[i * self._N + j] for j in range(self._N) for i in range(self._M)]))
 
     @property
     def Id(self) -> Self:
         if self.isSquare():
             # return a new identity matrix
-            res = [empty_vec(self._N) for _ in range(self._M)]
-            for i in range(self._M):
-                res[i][i] = 1
-            return self.__class__(*res)
+            return self.__class__(1)
         else:
             raise ValueError("Identity matrix must be square")
 
 
-    def __inverse(self, mat: List[List[_Number]]) -> List[List[_Number]]:
-        det = self.__det(mat)
-        if det == 0:
-            raise ValueError("Matrix is not invertible")
-        else:
-            inverse_matrix = [[0 for _ in range(self._N)] for _ in range(self._M)]
-            for i in range(self._M):
-                for j in range(self._N):
-                    submat = [row[:j] + row[j + 1:] for k, row in enumerate(mat) if k != i]
-                    inverse_matrix[i][j] = ((-1) ** (i + j)) * self.__det(submat) / det
-            return inverse_matrix
-            
-
-    @property
-    def Inv(self):
+    def inverse(self, method: str = "closed") -> Self:
+        # return a new inverted matrix, see determinant() for the methods
         if not self.isSquare():
             raise ValueError("Inverse is only defined for square matrices")
+        if method == "closed":
+            return self._new(array("d", _CLOSED_INVERSES[self._N](self._data)))
+        elif method == "lu":
+            return self._new(array("d", [e for row in _lu_inverse(self.getArray()) for e in row]))
         else:
-            return self.__class__(*self.__inverse(self.getArray())).transpose()
+            raise ValueError(f"Invalid method for the inverse: {method} (expected 'closed' or 'lu')")
+
+    @property
+    def Inv(self) -> Self:
+        return self.inverse()
 
     def invert(self) -> Self:
-        self.mat = self.Inv.mat
+        _write(self._data, 0, self.Inv._data)
         return self
 
     @property
@@ -284,45 +613,125 @@ class _matBase(object):
 
 
 class mat2(_matBase):
+    __slots__ = ()
     _N = 2
     _M = 2
 
 
 class mat3(_matBase):
+    __slots__ = ()
     _N = 3
     _M = 3
 
+    def transformPoint(self, p: vec2) -> vec2:
+        # same as (self * vec3(p, 1)).xy / w, for 2D homogeneous transforms
+        a00, a01, a02, a10, a11, a12, a20, a21, a22 = self._data
+        x, y = p.x, p.y
+        w = a02 * x + a12 * y + a22
+        return vec2._new((a00 * x + a10 * y + a20) / w, (a01 * x + a11 * y + a21) / w)
+
+    def transformDirection(self, d: vec2) -> vec2:
+        # same as (self * vec3(d, 0)).xy, ignores the translation
+        a00, a01, _, a10, a11, _, _, _, _ = self._data
+        x, y = d.x, d.y
+        return vec2._new(a00 * x + a10 * y, a01 * x + a11 * y)
+
 
 class mat4(_matBase):
+    __slots__ = ()
     _N = 4
     _M = 4
 
+    def transformPoint(self, p: vec3) -> vec3:
+        # same as (self * vec4(p, 1)).xyz / w, so it also applies projection matrices
+        a00, a01, a02, a03, a10, a11, a12, a13, a20, a21, a22, a23, a30, a31, a32, a33 = self._data
+        x, y, z = p.x, p.y, p.z
+        w = a03 * x + a13 * y + a23 * z + a33
+        return vec3._new((a00 * x + a10 * y + a20 * z + a30) / w,
+                         (a01 * x + a11 * y + a21 * z + a31) / w,
+                         (a02 * x + a12 * y + a22 * z + a32) / w)
+
+    def transformDirection(self, d: vec3) -> vec3:
+        # same as (self * vec4(d, 0)).xyz, ignores the translation
+        a00, a01, a02, _, a10, a11, a12, _, a20, a21, a22, _, _, _, _, _ = self._data
+        x, y, z = d.x, d.y, d.z
+        return vec3._new(a00 * x + a10 * y + a20 * z,
+                         a01 * x + a11 * y + a21 * z,
+                         a02 * x + a12 * y + a22 * z)
+
+    # in place compositions, self = self * transform without building the transform matrix; they
+    # return self so that they can be chained like m.translate_(p).rotate_(axis, angle).scale_(2)
+    def translate_(self, v: vec3) -> Self:
+        # only the last column changes
+        a00, a01, a02, a03, a10, a11, a12, a13, a20, a21, a22, a23, a30, a31, a32, a33 = self._data
+        x, y, z = v.x, v.y, v.z
+        _write(self._data, 12, (a00 * x + a10 * y + a20 * z + a30,
+                                a01 * x + a11 * y + a21 * z + a31,
+                                a02 * x + a12 * y + a22 * z + a32,
+                                a03 * x + a13 * y + a23 * z + a33))
+        return self
+
+    def rotate_(self, axis: vec3, angle: _Number) -> Self:
+        # angle in radians, the first three columns are combined by the 3x3 rotation
+        a00, a01, a02, a03, a10, a11, a12, a13, a20, a21, a22, a23 = self._data[:12]
+        r00, r01, r02, r10, r11, r12, r20, r21, r22 = _rotation(axis, angle)
+        _write(self._data, 0, (a00 * r00 + a10 * r01 + a20 * r02, a01 * r00 + a11 * r01 + a21 * r02,
+                               a02 * r00 + a12 * r01 + a22 * r02, a03 * r00 + a13 * r01 + a23 * r02,
+                               a00 * r10 + a10 * r11 + a20 * r12, a01 * r10 + a11 * r11 + a21 * r12,
+                               a02 * r10 + a12 * r11 + a22 * r12, a03 * r10 + a13 * r11 + a23 * r12,
+                               a00 * r20 + a10 * r21 + a20 * r22, a01 * r20 + a11 * r21 + a21 * r22,
+                               a02 * r20 + a12 * r21 + a22 * r22, a03 * r20 + a13 * r21 + a23 * r22))
+        return self
+
+    def scale_(self, v: Union[vec3, _Number]) -> Self:
+        # the first three columns are scaled by the components of v, or all by the same number
+        a00, a01, a02, a03, a10, a11, a12, a13, a20, a21, a22, a23 = self._data[:12]
+        x, y, z = (v, v, v) if isinstance(v, _SCALARS) else (v.x, v.y, v.z)
+        _write(self._data, 0, (a00 * x, a01 * x, a02 * x, a03 * x, a10 * y, a11 * y, a12 * y, a13 * y,
+                               a20 * z, a21 * z, a22 * z, a23 * z))
+        return self
+
 
 class mat2x3(_matBase):
+    __slots__ = ()
     _N = 2
     _M = 3
 
 
 class mat3x2(_matBase):
+    __slots__ = ()
     _N = 3
     _M = 2
 
 
 class mat2x4(_matBase):
+    __slots__ = ()
     _N = 2
     _M = 4
 
 
 class mat4x2(_matBase):
+    __slots__ = ()
     _N = 4
     _M = 2
 
 
 class mat3x4(_matBase):
+    __slots__ = ()
     _N = 3
     _M = 4
 
 
 class mat4x3(_matBase):
+    __slots__ = ()
     _N = 4
     _M = 3
+
+
+_MATRIX_TYPES = {(cls._N, cls._M): cls for cls in (mat2, mat3, mat4, mat2x3, mat3x2, mat2x4, mat4x2, mat3x4, mat4x3)}
+
+_install_matrix_products(list(_MATRIX_TYPES.values()))
+
+# the matrices already compute and store in double precision
+dmat2, dmat3, dmat4 = mat2, mat3, mat4
+dmat2x3, dmat3x2, dmat2x4, dmat4x2, dmat3x4, dmat4x3 = mat2x3, mat3x2, mat2x4, mat4x2, mat3x4, mat4x3
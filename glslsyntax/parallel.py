@@ -0,0 +1,180 @@
+import builtins
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Union, Any, Callable, List, Tuple
+
+from .arrays import _vecArrayBase, _matArrayBase, _require_numpy, np
+
+# parallel map of a function over the elements of batches (vecNarray, matNxMarray, numpy arrays): the
+# batches are split into chunks computed on a pool of processes, which read their inputs and write
+# their outputs in shared memory instead of pickling them; map shadows the Python built-in, so this
+# module is not imported by `from glslsyntax import *`, use `import glslsyntax.parallel` instead
+__all__ = ["map", "shutdown"]
+
+_BACKENDS = ("auto", "process", "thread", "serial")
+
+# chunks per worker by default, to balance uneven chunks without too much overhead per chunk
+_CHUNKS_PER_WORKER = 4
+
+# pools by backend and number of workers, kept between calls as starting processes is slow
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _free_threading() -> bool:
+    # True on a free-threaded build of Python running without the GIL
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def _pool(backend: str, workers: int) -> Any:
+    with _POOLS_LOCK:
+        pool = _POOLS.get((backend, workers))
+        if pool is None:
+            executor = ProcessPoolExecutor if backend == "process" else ThreadPoolExecutor
+            pool = _POOLS[(backend, workers)] = executor(max_workers=workers)
+        return pool
+
+
+def shutdown() -> None:
+    # stop the worker processes and threads, the next map starts new ones
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.shutdown()
+
+
+def _batch(value: Any) -> Union[Tuple[Any, Any], None]:
+    # (numpy data, class to wrap it) of a batch, None for the values passed as they are to every chunk
+    if isinstance(value, (_vecArrayBase, _matArrayBase)):
+        return value.data, type(value)
+    if np is not None and isinstance(value, np.ndarray) and value.ndim >= 1:
+        return value, None
+    return None
+
+
+def _wrap(data: Any, cls: Any) -> Any:
+    return data if cls is None else cls._wrap(data)
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # open a block created by the parent process, which stays in charge of unlinking it; before Python
+    # 3.13 the block is registered again to the resource tracker, which the workers share with the
+    # parent, so the unlink of the parent still unregisters it
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def _run_chunk(fn: Callable, args: list, out: tuple, start: int, end: int) -> None:
+    # worker process: call fn on the rows start:end of the shared inputs and write its result in the
+    # shared output
+    blocks = {}
+    views = {}
+    for kind, spec, cls in args + [("shared", out, None)]:
+        if kind == "shared" and spec[0] not in blocks:
+            name, shape, dtype = spec
+            blocks[name] = _attach(name)
+            views[name] = np.ndarray(shape, dtype=dtype, buffer=blocks[name].buf)
+    chunk = [_wrap(views[spec[0]][start:end], cls) if kind == "shared" else spec for kind, spec, cls in args]
+    views[out[0]][start:end] = _check_result(fn(*chunk), end - start, getattr(fn, "__name__", "map"))[0]
+    del chunk, views
+    for block in blocks.values():
+        try:
+            block.close()
+        except BufferError:
+            # fn kept a view on its inputs, the mapping is released with it
+            pass
+
+
+def _check_result(result: Any, count: int, name: str) -> Tuple[Any, Any]:
+    batch = _batch(result)
+    if batch is None or len(batch[0]) != count:
+        raise ValueError(f"Invalid result for {name}: {type(result).__name__} (expected a batch of {count} elements, "
+                         f"one per element of the inputs)")
+    return batch
+
+
+def _bounds(count: int, chunks: int) -> List[Tuple[int, int]]:
+    # chunks of nearly equal sizes covering 0:count
+    chunks = builtins.max(1, builtins.min(chunks, count))
+    return [(count * i // chunks, count * (i + 1) // chunks) for i in range(chunks)]
+
+
+def map(fn: Callable, inputs: Any, chunks: Union[int, None] = None, workers: Union[int, None] = None,
+        backend: str = "auto") -> Any:
+    # fn(*inputs) computed chunk by chunk in parallel: inputs is a batch or a tuple of batches of the same
+    # length (vecNarray, matNxMarray or numpy arrays), the other values of the tuple being passed to every
+    # chunk, and fn must return a batch with one element per element of the chunk, like the functions
+    # compiled by @vectorize; the results are concatenated into a batch of the same type.
+    # backend is "process", "thread", "serial" or "auto", which uses threads on a free-threaded build of
+    # Python and processes otherwise; fn is pickled for the processes, so it must be defined at the top
+    # level of a module, and it is called once on the first element to know the type of the output
+    _require_numpy("map")
+    if backend not in _BACKENDS:
+        raise ValueError(f"Invalid backend for map: {backend!r} (expected one of {', '.join(_BACKENDS)})")
+    args = list(inputs) if isinstance(inputs, tuple) else [inputs]
+    batches = [_batch(a) for a in args]
+    counts = {len(b[0]) for b in batches if b is not None}
+    if not counts:
+        raise ValueError("Invalid inputs for map: no batch to split (expected vecNarray, matNxMarray or numpy "
+                         "arrays)")
+    if len(counts) > 1:
+        raise ValueError(f"Invalid inputs for map: batches of different lengths {sorted(counts)}")
+    count = counts.pop()
+    name = getattr(fn, "__name__", "map")
+    workers = workers or os.cpu_count() or 1
+    if backend == "auto":
+        backend = "thread" if _free_threading() else "process"
+    if workers == 1 or count <= 1:
+        backend = "serial"
+    if backend == "serial":
+        data, cls = _check_result(fn(*args), count, name)
+        return _wrap(data, cls)
+    bounds = _bounds(count, chunks or workers * _CHUNKS_PER_WORKER)
+    # the type and the shape of the output, from its first element
+    first, cls = _check_result(fn(*[_wrap(b[0][:1], b[1]) if b is not None else a for a, b in zip(args, batches)]),
+                               1, name)
+    shape, dtype = (count,) + first.shape[1:], first.dtype
+    if backend == "thread":
+        # the chunks are views on the inputs and the output, the threads only share memory
+        out = np.empty(shape, dtype=dtype)
+
+        def run(start, end):
+            chunk = [_wrap(b[0][start:end], b[1]) if b is not None else a for a, b in zip(args, batches)]
+            out[start:end] = _check_result(fn(*chunk), end - start, name)[0]
+
+        pool = _pool("thread", workers)
+        for future in [pool.submit(run, start, end) for start, end in bounds]:
+            future.result()
+        return _wrap(out, cls)
+    blocks = []
+    try:
+        specs = []
+        for a, b in zip(args, batches):
+            if b is None:
+                specs.append(("value", a, None))
+                continue
+            data = np.ascontiguousarray(b[0])
+            block = shared_memory.SharedMemory(create=True, size=builtins.max(data.nbytes, 1))
+            blocks.append(block)
+            np.ndarray(data.shape, dtype=data.dtype, buffer=block.buf)[...] = data
+            specs.append(("shared", (block.name, data.shape, data.dtype.str), b[1]))
+        block = shared_memory.SharedMemory(create=True, size=builtins.max(int(np.prod(shape)) * dtype.itemsize, 1))
+        blocks.append(block)
+        pool = _pool("process", workers)
+        futures = [pool.submit(_run_chunk, fn, specs, (block.name, shape, dtype.str), start, end)
+                   for start, end in bounds]
+        for future in futures:
+            future.result()
+        out = np.array(np.ndarray(shape, dtype=dtype, buffer=block.buf))
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    return _wrap(out, cls)
@@ -0,0 +1,162 @@
+import math
+from array import array
+from typing import Self, Union
+
+from .vectors import _vecBase, _SCALARS, vec3, vec4
+from .matrices import mat3, mat4
+
+__all__ = ["quat"]
+
+_Number = Union[int, float]
+
+# below this angle between two rotations, slerp falls back to a normalized linear interpolation
+_SLERP_THRESHOLD = 0.9995
+
+
+class quat(vec4):
+    # rotation quaternion stored as a vec4: x, y, z is the vector part and w the scalar part, so it can be
+    # passed to GLSL as a vec4; quat() is the identity and the component-wise operators of vec4 are kept
+    # except for *, which is the quaternion product
+    __slots__ = ()
+    _N = 4
+
+    def __init__(self, *args: Union[_Number, _vecBase]):
+        if args:
+            super().__init__(*args)
+        else:
+            self.x = self.y = self.z = 0.0
+            self.w = 1.0
+
+    @staticmethod
+    def fromAxisAngle(axis: vec3, angle: _Number) -> "quat":
+        # rotation of angle radians around axis, which does not need to be normalized
+        x, y, z = axis.x, axis.y, axis.z
+        s = math.sin(angle / 2) / math.sqrt(x * x + y * y + z * z)
+        return quat._new(x * s, y * s, z * s, math.cos(angle / 2))
+
+    @staticmethod
+    def fromMatrix(m: Union[mat3, mat4]) -> "quat":
+        # rotation of the upper-left 3x3 part of m, which should be orthonormal
+        if not isinstance(m, (mat3, mat4)):
+            raise ValueError(f"Invalid matrix for a quaternion: {type(m).__name__} (expected mat3 or mat4)")
+        d = m._data
+        n = m._N
+        # aCR is column C and row R
+        a00, a01, a02 = d[0], d[1], d[2]
+        a10, a11, a12 = d[n], d[n + 1], d[n + 2]
+        a20, a21, a22 = d[2 * n], d[2 * n + 1], d[2 * n + 2]
+        trace = a00 + a11 + a22
+        # divide by the largest of the four candidates for stability
+        if trace > 0:
+            s = 0.5 / math.sqrt(trace + 1.0)
+            return quat._new((a12 - a21) * s, (a20 - a02) * s, (a01 - a10) * s, 0.25 / s)
+        if a00 > a11 and a00 > a22:
+            s = 0.5 / math.sqrt(1.0 + a00 - a11 - a22)
+            return quat._new(0.25 / s, (a10 + a01) * s, (a20 + a02) * s, (a12 - a21) * s)
+        if a11 > a22:
+            s = 0.5 / math.sqrt(1.0 + a11 - a00 - a22)
+            return quat._new((a10 + a01) * s, 0.25 / s, (a21 + a12) * s, (a20 - a02) * s)
+        s = 0.5 / math.sqrt(1.0 + a22 - a00 - a11)
+        return quat._new((a20 + a02) * s, (a21 + a12) * s, 0.25 / s, (a01 - a10) * s)
+
+    def _rotation(self) -> tuple:
+        # column-major 3x3 rotation matrix of a unit quaternion
+        x, y, z, w = self.x, self.y, self.z, self.w
+        xx, yy, zz = x * x, y * y, z * z
+        xy, xz, yz = x * y, x * z, y * z
+        wx, wy, wz = w * x, w * y, w * z
+        return (1.0 - 2.0 * (yy + zz), 2.0 * (xy + wz), 2.0 * (xz - wy),
+                2.0 * (xy - wz), 1.0 - 2.0 * (xx + zz), 2.0 * (yz + wx),
+                2.0 * (xz + wy), 2.0 * (yz - wx), 1.0 - 2.0 * (xx + yy))
+
+    def toMat3(self) -> mat3:
+        return mat3._new(array("d", self._rotation()))
+
+    def toMat4(self) -> mat4:
+        r00, r01, r02, r10, r11, r12, r20, r21, r22 = self._rotation()
+        return mat4._new(array("d", (r00, r01, r02, 0.0, r10, r11, r12, 0.0, r20, r21, r22, 0.0, 0.0, 0.0, 0.0, 1.0)))
+
+    def _rotate(self, vx: _Number, vy: _Number, vz: _Number) -> tuple:
+        # v + w * t + cross(q.xyz, t) with t = 2 * cross(q.xyz, v), without building a matrix
+        x, y, z, w = self.x, self.y, self.z, self.w
+        tx = 2.0 * (y * vz - z * vy)
+        ty = 2.0 * (z * vx - x * vz)
+        tz = 2.0 * (x * vy - y * vx)
+        return (vx + w * tx + y * tz - z * ty,
+                vy + w * ty + z * tx - x * tz,
+                vz + w * tz + x * ty - y * tx)
+
+    def __mul__(self, other: Union["quat", vec3, vec4, _Number]) -> Union["quat", vec3, vec4]:
+        # quat * quat composes the rotations (other first), quat * vec3 rotates the vector, quat * vec4
+        # rotates its xyz part, quat * scalar is component-wise
+        if isinstance(other, quat):
+            ax, ay, az, aw = self.x, self.y, self.z, self.w
+            bx, by, bz, bw = other.x, other.y, other.z, other.w
+            return quat._new(aw * bx + ax * bw + ay * bz - az * by,
+                             aw * by - ax * bz + ay * bw + az * bx,
+                             aw * bz + ax * by - ay * bx + az * bw,
+                             aw * bw - ax * bx - ay * by - az * bz)
+        if isinstance(other, vec3):
+            return vec3._new(*self._rotate(other.x, other.y, other.z))
+        if isinstance(other, vec4):
+            return vec4._new(*self._rotate(other.x, other.y, other.z), other.w)
+        if isinstance(other, _SCALARS):
+            return quat._new(self.x * other, self.y * other, self.z * other, self.w * other)
+        return NotImplemented
+
+    def __imul__(self, other: Union["quat", _Number]) -> Self:
+        if isinstance(other, quat):
+            q = self * other
+            self.x, self.y, self.z, self.w = q.x, q.y, q.z, q.w
+            return self
+        if isinstance(other, _SCALARS):
+            self.x *= other
+            self.y *= other
+            self.z *= other
+            self.w *= other
+            return self
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"quat({self.x}, {self.y}, {self.z}, {self.w})"
+
+    @property
+    def conjugate(self) -> "quat":
+        return quat._new(-self.x, -self.y, -self.z, self.w)
+
+    @property
+    def Inv(self) -> "quat":
+        # the conjugate divided by the squared norm, the conjugate itself for a unit quaternion
+        n = self.x * self.x + self.y * self.y + self.z * self.z + self.w * self.w
+        return quat._new(-self.x / n, -self.y / n, -self.z / n, self.w / n)
+
+    def invert(self) -> Self:
+        # modify the quaternion in place
+        q = self.Inv
+        self.x, self.y, self.z, self.w = q.x, q.y, q.z, q.w
+        return self
+
+    def nlerp(self, other: "quat", t: _Number) -> "quat":
+        # normalized linear interpolation along the shortest path, cheaper than slerp but not at constant speed
+        s = -1.0 if self.dot(other) < 0 else 1.0
+        x = self.x + (s * other.x - self.x) * t
+        y = self.y + (s * other.y - self.y) * t
+        z = self.z + (s * other.z - self.z) * t
+        w = self.w + (s * other.w - self.w) * t
+        n = math.sqrt(x * x + y * y + z * z + w * w)
+        return quat._new(x / n, y / n, z / n, w / n)
+
+    def slerp(self, other: "quat", t: _Number) -> "quat":
+        # spherical linear interpolation along the shortest path, at constant angular speed
+        d = self.dot(other)
+        sign = 1.0
+        if d < 0:
+            d, sign = -d, -1.0
+        if d > _SLERP_THRESHOLD:
+            return self.nlerp(other, t)
+        theta = math.acos(d)
+        s = math.sin(theta)
+        a = math.sin((1.0 - t) * theta) / s
+        b = sign * math.sin(t * theta) / s
+        return quat._new(a * self.x + b * other.x, a * self.y + b * other.y,
+                         a * self.z + b * other.z, a * self.w + b * other.w)
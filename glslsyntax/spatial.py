@@ -0,0 +1,493 @@
+import heapq
+import math
+from itertools import product
+from typing import Union, Any, List, Iterable, Iterator, Tuple
+
+from .vectors import _vecBase, vec2, vec3
+from .arrays import _vecArrayBase, _require_numpy, np
+
+# spatial indexes over points, returning the indices of the points matched by the queries:
+# Grid is a uniform hash grid supporting insertions and removals, for moving particles, and KDTree
+# a static k-d tree built with numpy, for large point sets queried many times
+__all__ = ["Grid", "KDTree"]
+
+_Number = Union[int, float]
+_Point = Union[vec2, vec3]
+
+_VECTOR_TYPES = {2: vec2, 3: vec3}
+
+
+def _coordinates(p: Any, d: Union[int, None] = None) -> Tuple[float, ...]:
+    if not isinstance(p, _vecBase) or p._N not in _VECTOR_TYPES:
+        raise ValueError(f"Invalid point: {p!r} (expected a vec2 or a vec3)")
+    if d is not None and p._N != d:
+        raise ValueError(f"Invalid point: {p!r} (expected a vec{d})")
+    return p._components(p)
+
+
+def _point_rows(points: Any) -> Tuple[int, Iterable]:
+    # dimension and coordinate tuples of a list of vectors or of a vecNarray
+    if isinstance(points, _vecArrayBase):
+        if points._N not in _VECTOR_TYPES:
+            raise ValueError(f"Invalid points: {type(points).__name__} (expected a vec2array or a vec3array)")
+        return points._N, map(tuple, points.data.tolist())
+    points = list(points)
+    if not points:
+        return 0, ()
+    d = _coordinates(points[0])
+    return len(d), (_coordinates(p, len(d)) for p in points)
+
+
+def _ray(origin: _Point, direction: _Point, d: int) -> Tuple[Tuple[float, ...], Tuple[float, ...]]:
+    o, u = _coordinates(origin, d), _coordinates(direction, d)
+    length = math.sqrt(sum(c * c for c in u))
+    if length == 0:
+        raise ValueError("Invalid ray: the direction is a zero vector")
+    return o, tuple(c / length for c in u)
+
+
+def _slab(o: Tuple[float, ...], u: Tuple[float, ...], lo: Any, hi: Any, t0: float, t1: float) -> bool:
+    # True if the segment o + t * u for t in [t0, t1] crosses the box [lo, hi]
+    for oc, uc, a, b in zip(o, u, lo, hi):
+        if uc == 0.0:
+            if oc < a or oc > b:
+                return False
+            continue
+        ta, tb = (a - oc) / uc, (b - oc) / uc
+        if ta > tb:
+            ta, tb = tb, ta
+        t0, t1 = max(t0, ta), min(t1, tb)
+        if t0 > t1:
+            return False
+    return True
+
+
+def _segment_distance2(p: Any, o: Tuple[float, ...], u: Tuple[float, ...], length: float) -> Tuple[float, float]:
+    # squared distance from p to the segment o + s * u for s in [0, length], and the s of the closest point
+    s = min(max(sum([(a - b) * c for a, b, c in zip(p, o, u)]), 0.0), length)
+    return sum([(a - b - s * c) ** 2 for a, b, c in zip(p, o, u)]), s
+
+
+class Grid(object):
+    # uniform hash grid: the points are bucketed by the integer coordinates of their cell, so a query
+    # only visits the cells it overlaps; a cellSize about the usual query radius works best
+    def __init__(self, cellSize: _Number, points: Union[Iterable[_Point], Any] = ()):
+        if cellSize <= 0:
+            raise ValueError(f"Invalid cell size for a grid: {cellSize} (expected a positive number)")
+        self._size = float(cellSize)
+        self._inv = 1.0 / self._size
+        self._d = 0
+        self._cells = {}
+        self._points = {}
+        self._next = 0
+        self._bounds = None
+        d, rows = _point_rows(points)
+        if d:
+            self._d = d
+            for c in rows:
+                self._add(c)
+
+    def _cell(self, c: Tuple[float, ...]) -> Tuple[int, ...]:
+        inv = self._inv
+        return tuple([math.floor(x * inv) for x in c])
+
+    def _add(self, c: Tuple[float, ...]) -> int:
+        index = self._next
+        self._next += 1
+        self._points[index] = c
+        key = self._cell(c)
+        bucket = self._cells.get(key)
+        if bucket is None:
+            self._cells[key] = {index}
+            self._bounds = None
+        else:
+            bucket.add(index)
+        return index
+
+    def _discard(self, index: int) -> Tuple[int, ...]:
+        try:
+            c = self._points.pop(index)
+        except KeyError:
+            raise ValueError(f"Invalid index for a grid: {index} (not in the grid)") from None
+        key = self._cell(c)
+        bucket = self._cells[key]
+        bucket.discard(index)
+        if not bucket:
+            del self._cells[key]
+            self._bounds = None
+        return key
+
+    def insert(self, p: _Point) -> int:
+        # add a point, its index stays valid until it is removed
+        if not self._d:
+            self._d = len(_coordinates(p))
+        return self._add(_coordinates(p, self._d))
+
+    def remove(self, index: int) -> None:
+        self._discard(index)
+
+    def move(self, index: int, p: _Point) -> None:
+        # update the position of a point, which only touches the buckets if it changes of cell
+        c = _coordinates(p, self._d)
+        old = self._points.get(index)
+        if old is None:
+            raise ValueError(f"Invalid index for a grid: {index} (not in the grid)")
+        key = self._cell(c)
+        if key == self._cell(old):
+            self._points[index] = c
+            return
+        self._discard(index)
+        self._points[index] = c
+        bucket = self._cells.get(key)
+        if bucket is None:
+            self._cells[key] = {index}
+            self._bounds = None
+        else:
+            bucket.add(index)
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __contains__(self, index: int) -> bool:
+        return index in self._points
+
+    def __getitem__(self, index: int) -> _Point:
+        return _VECTOR_TYPES[self._d]._new(*self._points[index])
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._points)
+
+    def __repr__(self) -> str:
+        return f"Grid({len(self)} points, {len(self._cells)} cells of size {self._size})"
+
+    def _block(self, lo: Tuple[int, ...], hi: Tuple[int, ...]) -> Iterable:
+        # buckets of the cells between lo and hi included, by enumerating the block or the occupied
+        # cells, whichever is smaller
+        volume = 1
+        for a, b in zip(lo, hi):
+            volume *= b - a + 1
+        cells = self._cells
+        if volume <= len(cells):
+            for key in product(*[range(a, b + 1) for a, b in zip(lo, hi)]):
+                bucket = cells.get(key)
+                if bucket is not None:
+                    yield bucket
+        else:
+            for key, bucket in cells.items():
+                if all(a <= k <= b for k, a, b in zip(key, lo, hi)):
+                    yield bucket
+
+    def inRadius(self, p: _Point, radius: _Number) -> List[int]:
+        # indices of the points at a distance <= radius of p
+        if not self._points:
+            return []
+        c = _coordinates(p, self._d)
+        r2 = radius * radius
+        points = self._points
+        res = []
+        lo = self._cell([x - radius for x in c])
+        hi = self._cell([x + radius for x in c])
+        for bucket in self._block(lo, hi):
+            for i in bucket:
+                if sum([(a - b) * (a - b) for a, b in zip(points[i], c)]) <= r2:
+                    res.append(i)
+        return res
+
+    def inBox(self, lo: _Point, hi: _Point) -> List[int]:
+        # indices of the points inside the axis-aligned box [lo, hi]
+        if not self._points:
+            return []
+        a, b = _coordinates(lo, self._d), _coordinates(hi, self._d)
+        points = self._points
+        return [i for bucket in self._block(self._cell(a), self._cell(b)) for i in bucket
+                if all(x <= y <= z for x, y, z in zip(a, points[i], b))]
+
+    def nearest(self, p: _Point, k: int = 1) -> List[int]:
+        # indices of the k points nearest to p, from the nearest; the rings of cells around the cell of
+        # p are visited until the k-th candidate is closer than any point left outside of them
+        points = self._points
+        k = min(k, len(points))
+        if k <= 0:
+            return []
+        c = _coordinates(p, self._d)
+        center = self._cell(c)
+        cells = self._cells
+        best = []
+        seen = 0
+        ring = 0
+        while True:
+            if (2 * ring + 1) ** self._d > len(cells):
+                # the rings now cover more cells than there are occupied cells, finish with all the points
+                best = [(sum([(a - b) * (a - b) for a, b in zip(q, c)]), i) for i, q in points.items()]
+                break
+            for key in product(*[range(x - ring, x + ring + 1) for x in center]):
+                if ring and max([abs(a - b) for a, b in zip(key, center)]) != ring:
+                    continue
+                bucket = cells.get(key)
+                if bucket is not None:
+                    seen += len(bucket)
+                    best.extend((sum([(a - b) * (a - b) for a, b in zip(points[i], c)]), i) for i in bucket)
+            # any point outside the rings is farther than ring cells from p
+            limit = ring * self._size
+            if seen == len(points) or (len(best) >= k and heapq.nsmallest(k, best)[-1][0] <= limit * limit):
+                break
+            ring += 1
+        return [i for _, i in heapq.nsmallest(k, best)]
+
+    def _occupied(self) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+        # lowest and highest occupied cells, cached until a cell is created or emptied
+        if self._bounds is None:
+            keys = list(self._cells)
+            self._bounds = (tuple(map(min, zip(*keys))), tuple(map(max, zip(*keys))))
+        return self._bounds
+
+    def alongRay(self, origin: _Point, direction: _Point, radius: _Number,
+                 maxDistance: _Number = math.inf) -> List[int]:
+        # indices of the points at a distance <= radius of the ray, sorted by their position along it;
+        # the cells crossed by the ray are walked one after the other, with a margin for the radius
+        if not self._points:
+            return []
+        o, u = _ray(origin, direction, self._d)
+        size = self._size
+        lo, hi = self._occupied()
+        # clip the ray to the occupied cells grown by the radius
+        margin = radius + size
+        box_lo = [a * size - margin for a in lo]
+        box_hi = [(b + 1) * size + margin for b in hi]
+        t0, t1 = 0.0, maxDistance
+        for oc, uc, a, b in zip(o, u, box_lo, box_hi):
+            if uc == 0.0:
+                if oc < a or oc > b:
+                    return []
+                continue
+            ta, tb = (a - oc) / uc, (b - oc) / uc
+            if ta > tb:
+                ta, tb = tb, ta
+            t0, t1 = max(t0, ta), min(t1, tb)
+        if t0 > t1:
+            return []
+        # walk along the ray by steps of one cell, visiting the block of cells around each step which
+        # contains all the points within the radius of the ray until the next step
+        step = size
+        pad = math.ceil((radius + step) * self._inv)
+        cells = self._cells
+        points = self._points
+        r2 = radius * radius
+        # a cell can only hold a hit if its center is within the radius plus half its diagonal
+        reach2 = (radius + 0.5 * size * math.sqrt(self._d)) ** 2
+        visited = set()
+        hits = []
+        t = t0
+        last = None
+        while True:
+            key = self._cell([a + t * b for a, b in zip(o, u)])
+            if key != last:
+                last = key
+                for near in product(*[range(x - pad, x + pad + 1) for x in key]):
+                    if near in visited:
+                        continue
+                    visited.add(near)
+                    bucket = cells.get(near)
+                    if bucket is None or _segment_distance2([(k + 0.5) * size for k in near], o, u,
+                                                            maxDistance)[0] > reach2:
+                        continue
+                    for i in bucket:
+                        d2, s = _segment_distance2(points[i], o, u, maxDistance)
+                        if d2 <= r2:
+                            hits.append((s, i))
+            if t >= t1:
+                break
+            t = min(t + step, t1)
+        hits.sort()
+        return [i for _, i in hits]
+
+
+class KDTree(object):
+    # static k-d tree: the nodes split their points at the median of their widest axis until
+    # leafSize points are left, the leaves being contiguous slices of the points sorted by node;
+    # the traversal prunes the nodes with their bounding boxes and the leaves are scanned with numpy
+    def __init__(self, points: Union[Iterable[_Point], Any], leafSize: int = 32):
+        _require_numpy("KDTree")
+        if leafSize < 1:
+            raise ValueError(f"Invalid leaf size for a k-d tree: {leafSize} (expected a positive integer)")
+        if isinstance(points, _vecArrayBase):
+            if points._N not in _VECTOR_TYPES:
+                raise ValueError(f"Invalid points: {type(points).__name__} (expected a vec2array or a vec3array)")
+            data = np.array(points.data, dtype=np.float64)
+        else:
+            d, rows = _point_rows(points)
+            data = np.array(list(rows), dtype=np.float64).reshape(-1, d or 3)
+        self._d = data.shape[1]
+        self._build(data, leafSize)
+
+    def _build(self, data: Any, leafSize: int) -> None:
+        n = len(data)
+        order = np.arange(n)
+        # per node: start and end in the sorted points, children (-1 for a leaf) and bounding box
+        starts, ends, lefts, rights, lows, highs = [], [], [], [], [], []
+        stack = [(0, n, -1, False)] if n else []
+        while stack:
+            start, end, parent, right = stack.pop()
+            node = len(starts)
+            if parent >= 0:
+                (rights if right else lefts)[parent] = node
+            sub = data[order[start:end]]
+            low, high = sub.min(axis=0), sub.max(axis=0)
+            starts.append(start)
+            ends.append(end)
+            lefts.append(-1)
+            rights.append(-1)
+            lows.append(low)
+            highs.append(high)
+            if end - start <= leafSize:
+                continue
+            axis = int(np.argmax(high - low))
+            mid = (end - start) // 2
+            order[start:end] = order[start:end][np.argpartition(sub[:, axis], mid)]
+            stack.append((start + mid, end, node, True))
+            stack.append((start, start + mid, node, False))
+        self._order = order
+        self._positions = np.empty_like(order)
+        self._positions[order] = np.arange(n)
+        self._points = data[order]
+        self._starts, self._ends, self._lefts, self._rights = starts, ends, lefts, rights
+        self._lows = np.array(lows).reshape(-1, self._d).tolist()
+        self._highs = np.array(highs).reshape(-1, self._d).tolist()
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __getitem__(self, index: int) -> _Point:
+        if not 0 <= index < len(self):
+            raise IndexError(f"index {index} is out of range for a k-d tree of {len(self)} points")
+        return _VECTOR_TYPES[self._d]._new(*self._points[self._positions[index]].tolist())
+
+    def __repr__(self) -> str:
+        return f"KDTree({len(self)} points, {len(self._starts)} nodes)"
+
+    def _box_distance2(self, node: int, c: Tuple[float, ...]) -> float:
+        # squared distance from c to the bounding box of node
+        d2 = 0.0
+        for x, a, b in zip(c, self._lows[node], self._highs[node]):
+            if x < a:
+                d2 += (a - x) * (a - x)
+            elif x > b:
+                d2 += (x - b) * (x - b)
+        return d2
+
+    def nearest(self, p: _Point, k: int = 1) -> List[int]:
+        # indices of the k points nearest to p, from the nearest; the nodes are visited by increasing
+        # distance to their box until it exceeds the k-th candidate
+        k = min(k, len(self))
+        if k <= 0:
+            return []
+        c = _coordinates(p, self._d)
+        q = np.array(c)
+        best_d = np.empty(0)
+        best_i = np.empty(0, dtype=np.intp)
+        bound = math.inf
+        heap = [(self._box_distance2(0, c), 0)]
+        while heap:
+            d2, node = heapq.heappop(heap)
+            if d2 > bound:
+                break
+            left = self._lefts[node]
+            if left >= 0:
+                right = self._rights[node]
+                for child in (left, right):
+                    cd2 = self._box_distance2(child, c)
+                    if cd2 <= bound:
+                        heapq.heappush(heap, (cd2, child))
+                continue
+            start, end = self._starts[node], self._ends[node]
+            diff = self._points[start:end] - q
+            best_d = np.concatenate((best_d, np.einsum("ij,ij->i", diff, diff)))
+            best_i = np.concatenate((best_i, np.arange(start, end)))
+            if len(best_d) > k:
+                keep = np.argpartition(best_d, k - 1)[:k]
+                best_d, best_i = best_d[keep], best_i[keep]
+            if len(best_d) == k:
+                bound = float(best_d.max())
+        ranking = np.argsort(best_d, kind="stable")
+        return self._order[best_i[ranking]].tolist()
+
+    def _collect(self, prune: Any, inside: Any, test: Any) -> List[int]:
+        # depth-first traversal: prune(node) skips a node, inside(node) takes all its points and
+        # test(points) filters the points of a leaf with a boolean mask
+        res = []
+        stack = [0] if len(self) else []
+        order = self._order
+        while stack:
+            node = stack.pop()
+            if prune(node):
+                continue
+            start, end = self._starts[node], self._ends[node]
+            if inside(node):
+                res.append(order[start:end])
+                continue
+            left = self._lefts[node]
+            if left >= 0:
+                stack.append(self._rights[node])
+                stack.append(left)
+                continue
+            res.append(order[start:end][test(self._points[start:end])])
+        return np.concatenate(res).tolist() if res else []
+
+    def inRadius(self, p: _Point, radius: _Number) -> List[int]:
+        # indices of the points at a distance <= radius of p
+        c = _coordinates(p, self._d)
+        q = np.array(c)
+        r2 = radius * radius
+        lows, highs = self._lows, self._highs
+
+        def inside(node):
+            # the farthest corner of the box is within the radius
+            return sum([max(x - a, b - x) ** 2 for x, a, b in zip(c, lows[node], highs[node])]) <= r2
+
+        def test(points):
+            diff = points - q
+            return np.einsum("ij,ij->i", diff, diff) <= r2
+
+        return self._collect(lambda node: self._box_distance2(node, c) > r2, inside, test)
+
+    def inBox(self, lo: _Point, hi: _Point) -> List[int]:
+        # indices of the points inside the axis-aligned box [lo, hi]
+        a, b = _coordinates(lo, self._d), _coordinates(hi, self._d)
+        lows, highs = self._lows, self._highs
+        qa, qb = np.array(a), np.array(b)
+
+        def prune(node):
+            return any(y > z or x > w for x, y, z, w in zip(a, lows[node], b, highs[node]))
+
+        def inside(node):
+            return all(x <= y and z <= w for x, y, z, w in zip(a, lows[node], highs[node], b))
+
+        return self._collect(prune, inside, lambda points: ((points >= qa) & (points <= qb)).all(axis=1))
+
+    def alongRay(self, origin: _Point, direction: _Point, radius: _Number,
+                 maxDistance: _Number = math.inf) -> List[int]:
+        # indices of the points at a distance <= radius of the ray, sorted by their position along it
+        o, u = _ray(origin, direction, self._d)
+        qo, qu = np.array(o), np.array(u)
+        r2 = radius * radius
+        lows, highs = self._lows, self._highs
+        hits = []
+
+        def prune(node):
+            lo = [a - radius for a in lows[node]]
+            hi = [b + radius for b in highs[node]]
+            return not _slab(o, u, lo, hi, 0.0, maxDistance)
+
+        def test(points):
+            rel = points - qo
+            s = np.clip(rel @ qu, 0.0, maxDistance)
+            diff = rel - s[:, None] * qu
+            mask = np.einsum("ij,ij->i", diff, diff) <= r2
+            hits.append(s[mask])
+            return mask
+
+        indices = self._collect(prune, lambda node: False, test)
+        if not indices:
+            return []
+        ranking = np.argsort(np.concatenate(hits), kind="stable")
+        return np.array(indices)[ranking].tolist()
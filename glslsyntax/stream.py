@@ -0,0 +1,231 @@
+import math
+import time
+from itertools import islice
+from typing import Self, Union, Any, Callable, Iterable, Iterator
+
+from .vectors import _vecBase, vec3, vec4
+from .matrices import _matBase
+from .arrays import _vecArrayBase, _require_numpy, np, vec3array, vec4array
+
+# streaming of vertices through chains of stages, one chunk at a time: the files are read and written
+# incrementally, so the memory used does not depend on their size
+__all__ = ["VertexStream"]
+
+_Number = Union[int, float]
+_Batch = Union[vec3array, vec4array]
+
+_ARRAY_TYPES = {3: vec3array, 4: vec4array}
+_FORMATS = ("binary", "text")
+
+# vertices per chunk by default, large enough to amortize the numpy calls (1.5 MB of float64 xyz)
+_CHUNK_SIZE = 65536
+
+# 32-bit little-endian floats of the binary files
+_FILE_DTYPE = "<f4"
+
+
+def _check_format(format: str) -> None:
+    if format not in _FORMATS:
+        raise ValueError(f"Invalid format: {format!r} (expected one of {', '.join(_FORMATS)})")
+
+
+def _read_binary(path: Any, components: int, chunkSize: int, offset: int) -> Iterator[Any]:
+    # (chunkSize, components) float64 arrays from packed float32 components
+    size = components * 4
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while True:
+            raw = f.read(chunkSize * size)
+            if not raw:
+                return
+            if len(raw) % size:
+                raise ValueError(f"Invalid size for a file of vec{components}: {f.tell()} bytes "
+                                 f"(the last vertex is truncated)")
+            yield np.frombuffer(raw, dtype=_FILE_DTYPE).reshape(-1, components).astype(np.float64)
+
+
+def _read_text(path: Any, components: int, chunkSize: int, delimiter: Union[str, None]) -> Iterator[Any]:
+    # (chunkSize, components) float64 arrays from lines of numbers, # starting a comment
+    with open(path, "r") as f:
+        while True:
+            lines = list(islice(f, chunkSize))
+            if not lines:
+                return
+            data = np.loadtxt(lines, dtype=np.float64, comments="#", delimiter=delimiter, ndmin=2)
+            if data.size == 0:
+                continue
+            if data.shape[1] != components:
+                raise ValueError(f"Invalid number of components in {path}: {data.shape[1]} (expected {components})")
+            yield data
+
+
+def _matrix(m: Any, n: int) -> Any:
+    # numpy array A of m such that the rows of data @ A are m times the rows of data
+    if not isinstance(m, _matBase) or m.size[0] != m.size[1] or m.size[0] not in (n, n + 1):
+        raise ValueError(f"Invalid matrix for vec{n}: {m!r} (expected a mat{n}" + (" or a mat4)" if n == 3 else ")"))
+    return np.array(m.getArray(), dtype=np.float64)
+
+
+def _affine(a: Any) -> bool:
+    # True if a keeps w unchanged, so that it composes with the next transform without a division
+    return a.shape[0] == 3 or (not a[:3, 3].any() and a[3, 3] == 1.0)
+
+
+def _transform(data: Any, a: Any, w: _Number) -> Any:
+    if len(a) == data.shape[1]:
+        return data @ a
+    # vec3 by a mat4: w is 1 for points and 0 for directions, then divided out by a projection
+    out = data @ a[:3]
+    if w:
+        out += w * a[3]
+    return out[:, :3] if _affine(a) else out[:, :3] / out[:, 3:]
+
+
+class VertexStream(object):
+    # a lazy chain of stages over chunks of vec3array or vec4array: the stages return new streams and
+    # nothing is read before the stream is iterated or written; a stream read from a file can be iterated
+    # several times, and a stream of a generator of batches only once
+    __slots__ = ("_source", "_components", "_stages", "vertices", "chunks", "seconds")
+
+    def __init__(self, source: Union[Iterable[_Batch], Callable[[], Iterable[Any]]], components: int = 3):
+        _require_numpy("VertexStream")
+        if components not in _ARRAY_TYPES:
+            raise ValueError(f"Invalid number of components for VertexStream: {components} (expected 3 or 4)")
+        self._source = source
+        self._components = components
+        # ("transform", matrix, w), ("normalize", None, None), ("map", fn, None) or ("filter", predicate, None)
+        self._stages = []
+        # statistics of the last iteration
+        self.vertices = 0
+        self.chunks = 0
+        self.seconds = 0.0
+
+    @classmethod
+    def open(cls, path: Any, components: int = 3, chunkSize: int = _CHUNK_SIZE, format: str = "binary",
+             offset: int = 0, delimiter: Union[str, None] = None) -> Self:
+        # stream of the vertices of a file: packed little-endian float32 xyz or xyzw after offset bytes for
+        # the binary format, one vertex per line for the text format
+        _check_format(format)
+        if chunkSize < 1:
+            raise ValueError(f"Invalid chunk size: {chunkSize} (expected a positive number of vertices)")
+        if format == "binary":
+            return cls(lambda: _read_binary(path, components, chunkSize, offset), components)
+        return cls(lambda: _read_text(path, components, chunkSize, delimiter), components)
+
+    def __repr__(self) -> str:
+        stages = ", ".join(kind for kind, _, _ in self._stages)
+        return f"VertexStream(vec{self._components}, [{stages}])"
+
+    def _then(self, kind: str, value: Any, w: Any = None) -> Self:
+        res = object.__new__(type(self))
+        res._source = self._source
+        res._components = self._components
+        res._stages = self._stages + [(kind, value, w)]
+        res.vertices = 0
+        res.chunks = 0
+        res.seconds = 0.0
+        return res
+
+    def transform(self, m: _matBase, w: _Number = 1.0) -> Self:
+        # m * v for each vertex; a mat4 applies to a vec3 with the w given (1 for points, 0 for directions)
+        # and divides by the resulting w for projections; consecutive affine transforms of the same kind
+        # are composed into one matrix
+        a = _matrix(m, self._components)
+        if self._stages:
+            kind, previous, previous_w = self._stages[-1]
+            # a projection divides between the two transforms of vec3
+            linear = len(a) == self._components or _affine(previous)
+            if kind == "transform" and len(previous) == len(a) and previous_w == w and linear:
+                res = self._then(kind, previous @ a, w)
+                del res._stages[-2]
+                return res
+        return self._then("transform", a, w)
+
+    def normalize(self) -> Self:
+        return self._then("normalize", None)
+
+    def map(self, fn: Callable[[_Batch], _Batch]) -> Self:
+        # fn takes and returns a batch of the same type, e.g. a function compiled with @vectorize
+        return self._then("map", fn)
+
+    def filter(self, predicate: Callable[[_Batch], Any]) -> Self:
+        # keep the vertices for which predicate, taking a batch, returns True
+        return self._then("filter", predicate)
+
+    def filterDistance(self, center: Union[vec3, vec4], maxDistance: _Number = math.inf,
+                       minDistance: _Number = 0.0) -> Self:
+        # keep the vertices v with minDistance <= distance(v, center) <= maxDistance
+        if not isinstance(center, _vecBase) or center._N != self._components:
+            raise ValueError(f"Invalid center: {center!r} (expected a vec{self._components})")
+        c = np.array(center._components(center))
+        lo, hi = minDistance * minDistance, maxDistance * maxDistance
+
+        def predicate(batch):
+            d = batch.data - c
+            d2 = np.einsum("ij,ij->i", d, d)
+            return (d2 >= lo) & (d2 <= hi)
+
+        return self._then("filter", predicate)
+
+    def _apply(self, data: Any) -> Any:
+        for kind, value, w in self._stages:
+            if kind == "transform":
+                data = _transform(data, value, w)
+            elif kind == "normalize":
+                data = data / np.sqrt(np.einsum("ij,ij->i", data, data))[:, None]
+            else:
+                result = value(_ARRAY_TYPES[data.shape[1]]._wrap(data))
+                if kind == "map":
+                    cls = _ARRAY_TYPES[data.shape[1]]
+                    if not isinstance(result, cls) or len(result) != len(data):
+                        raise ValueError(f"Invalid result for {getattr(value, '__name__', 'map')}: "
+                                         f"{type(result).__name__} (expected a {cls.__name__} of {len(data)} "
+                                         f"vectors)")
+                    data = result.data
+                else:
+                    data = data[np.asarray(result, dtype=bool)]
+        return data
+
+    def __iter__(self) -> Iterator[_Batch]:
+        # the batches after all the stages, counting the vertices read and the time spent
+        self.vertices = self.chunks = 0
+        self.seconds = 0.0
+        source = self._source() if callable(self._source) else self._source
+        start = time.perf_counter()
+        for chunk in source:
+            data = chunk.data if isinstance(chunk, _vecArrayBase) else np.asarray(chunk, dtype=np.float64)
+            self.vertices += len(data)
+            self.chunks += 1
+            data = self._apply(data)
+            self.seconds = time.perf_counter() - start
+            yield _ARRAY_TYPES[data.shape[1]]._wrap(data)
+            # the time of the consumer is not counted
+            start = time.perf_counter() - self.seconds
+
+    @property
+    def throughput(self) -> float:
+        # vertices per second of the last iteration
+        return self.vertices / self.seconds if self.seconds else 0.0
+
+    def write(self, path: Any, format: str = "binary") -> int:
+        # write the vertices as they are computed, as packed float32 or as lines of text; returns the number
+        # of vertices written, and throughput gives the vertices read per second including the writes
+        _check_format(format)
+        count = 0
+        with open(path, "wb") as f:
+            for batch in self:
+                start = time.perf_counter()
+                if format == "binary":
+                    f.write(batch.data.astype(_FILE_DTYPE).tobytes())
+                else:
+                    np.savetxt(f, batch.data, fmt="%.9g")
+                count += len(batch)
+                self.seconds += time.perf_counter() - start
+        return count
+
+    def collect(self) -> _Batch:
+        # all the vertices in one batch, for results that fit in memory
+        batches = [batch.data for batch in self]
+        if not batches:
+            return _ARRAY_TYPES[self._components](0)
+        return _ARRAY_TYPES[self._components]._wrap(np.concatenate(batches))
@@ -0,0 +1,98 @@
+import math
+from array import array
+from functools import lru_cache
+from typing import Union
+
+from .vectors import vec3
+from .matrices import mat4, _rotation
+
+# constructors of the usual 4x4 transforms, with the conventions of OpenGL (right-handed, depth in
+# [-1, 1]) and angles in radians; the matrices are written directly in their flat column-major storage
+__all__ = ["perspective", "ortho", "lookAt", "translate", "rotate", "scale"]
+
+_Number = Union[int, float]
+
+# number of projections kept by perspective() and ortho(), which are usually rebuilt each frame from
+# the same few parameters
+_PROJECTION_CACHE_SIZE = 64
+
+
+@lru_cache(maxsize=_PROJECTION_CACHE_SIZE)
+def _perspective(fovy: _Number, aspect: _Number, near: _Number, far: _Number) -> array:
+    f = 1.0 / math.tan(fovy / 2.0)
+    depth = near - far
+    return array("d", (f / aspect, 0.0, 0.0, 0.0,
+                       0.0, f, 0.0, 0.0,
+                       0.0, 0.0, (far + near) / depth, -1.0,
+                       0.0, 0.0, 2.0 * far * near / depth, 0.0))
+
+
+@lru_cache(maxsize=_PROJECTION_CACHE_SIZE)
+def _ortho(left: _Number, right: _Number, bottom: _Number, top: _Number, near: _Number, far: _Number) -> array:
+    width, height, depth = right - left, top - bottom, far - near
+    return array("d", (2.0 / width, 0.0, 0.0, 0.0,
+                       0.0, 2.0 / height, 0.0, 0.0,
+                       0.0, 0.0, -2.0 / depth, 0.0,
+                       -(right + left) / width, -(top + bottom) / height, -(far + near) / depth, 1.0))
+
+
+def perspective(fovy: _Number, aspect: _Number, near: _Number, far: _Number) -> mat4:
+    # fovy is the vertical field of view; the cached storage is copied so the result can be modified
+    if fovy <= 0 or aspect == 0 or near == far:
+        raise ValueError(f"Invalid perspective: fovy={fovy}, aspect={aspect}, near={near}, far={far}")
+    return mat4._new(array("d", _perspective(fovy, aspect, near, far)))
+
+
+def ortho(left: _Number, right: _Number, bottom: _Number, top: _Number, near: _Number = -1.0,
+          far: _Number = 1.0) -> mat4:
+    if left == right or bottom == top or near == far:
+        raise ValueError(f"Invalid orthographic projection: left={left}, right={right}, bottom={bottom}, "
+                         f"top={top}, near={near}, far={far}")
+    return mat4._new(array("d", _ortho(left, right, bottom, top, near, far)))
+
+
+def lookAt(eye: vec3, center: vec3, up: vec3) -> mat4:
+    # view matrix of a camera at eye looking at center
+    fx, fy, fz = center.x - eye.x, center.y - eye.y, center.z - eye.z
+    length = math.sqrt(fx * fx + fy * fy + fz * fz)
+    if length == 0:
+        raise ValueError("Invalid lookAt: eye and center are the same point")
+    fx, fy, fz = fx / length, fy / length, fz / length
+    # side = normalize(cross(f, up))
+    sx, sy, sz = fy * up.z - fz * up.y, fz * up.x - fx * up.z, fx * up.y - fy * up.x
+    length = math.sqrt(sx * sx + sy * sy + sz * sz)
+    if length == 0:
+        raise ValueError("Invalid lookAt: up is parallel to the view direction")
+    sx, sy, sz = sx / length, sy / length, sz / length
+    # u = cross(side, f)
+    ux, uy, uz = sy * fz - sz * fy, sz * fx - sx * fz, sx * fy - sy * fx
+    return mat4._new(array("d", (sx, ux, -fx, 0.0,
+                                 sy, uy, -fy, 0.0,
+                                 sz, uz, -fz, 0.0,
+                                 -(sx * eye.x + sy * eye.y + sz * eye.z),
+                                 -(ux * eye.x + uy * eye.y + uz * eye.z),
+                                 fx * eye.x + fy * eye.y + fz * eye.z, 1.0)))
+
+
+def translate(v: vec3) -> mat4:
+    return mat4._new(array("d", (1.0, 0.0, 0.0, 0.0,
+                                 0.0, 1.0, 0.0, 0.0,
+                                 0.0, 0.0, 1.0, 0.0,
+                                 v.x, v.y, v.z, 1.0)))
+
+
+def rotate(axis: vec3, angle: _Number) -> mat4:
+    r00, r01, r02, r10, r11, r12, r20, r21, r22 = _rotation(axis, angle)
+    return mat4._new(array("d", (r00, r01, r02, 0.0,
+                                 r10, r11, r12, 0.0,
+                                 r20, r21, r22, 0.0,
+                                 0.0, 0.0, 0.0, 1.0)))
+
+
+def scale(v: Union[vec3, _Number]) -> mat4:
+    # scale by the components of v, or uniform scale by a number
+    x, y, z = (v, v, v) if isinstance(v, (int, float)) else (v.x, v.y, v.z)
+    return mat4._new(array("d", (x, 0.0, 0.0, 0.0,
+                                 0.0, y, 0.0, 0.0,
+                                 0.0, 0.0, z, 0.0,
+                                 0.0, 0.0, 0.0, 1.0)))
@@ -1,11 +1,152 @@
+import re
+import sys
+from array import array
+from itertools import product
+from operator import attrgetter
 from typing import Self, Union, Any, List
 
 _Number = Union[int, float]
 _Vector = Union["vec2", "vec3", "vec4"]
 
+_SCALARS = (int, float)
+
 _ATTRIBUTES = "xyzw"
 _ATTRIBUTES_ALIASES = "rgba"
 
+_BINARY_OPERATORS = {"add": "+", "sub": "-", "mul": "*", "truediv": "/"}
+
+# item formats accepted for shared buffers, with their numpy type string
+_BUFFER_FORMATS = {"d": "f8", "f": "f4", "i": "i4", "I": "u4"}
+
+# operators of the integer vectors, on the components a and b
+_INTEGER_OPERATORS = {"add": "+", "sub": "-", "mul": "*", "truediv": "/", "mod": "%", "and": "&", "or": "|",
+                      "xor": "^", "lshift": "<<", "rshift": ">>"}
+_BYTE_ORDER = "<" if sys.byteorder == "little" else ">"
+
+# unrolled code generated for each vector width, {x} expands to one statement or term per component
+_NEW_TEMPLATE = """
+def _new({args}):
+    v = _object_new(cls)
+    {v.x = x}
+    return v
+"""
+
+_OPERATOR_TEMPLATE = """
+def __{name}__(self, other):
+    if isinstance(other, cls):
+        v = _object_new(cls)
+        {v.x = self.x OP other.x}
+        return v
+    if isinstance(other, _SCALARS):
+        v = _object_new(cls)
+        {v.x = self.x OP other}
+        return v
+    return _vecBase.__{name}__(self, other)
+
+def __r{name}__(self, other):
+    v = _object_new(cls)
+    {v.x = other OP self.x}
+    return v
+
+def __i{name}__(self, other):
+    if isinstance(other, cls):
+        {self.x OP= other.x}
+        return self
+    if isinstance(other, _SCALARS):
+        {self.x OP= other}
+        return self
+    return NotImplemented
+"""
+
+# W(a, b) is the operation on two components and N(e) a component, both brought back to 32 bits
+_INTEGER_OPERATOR_TEMPLATE = """
+def __{name}__(self, other):
+    if isinstance(other, cls):
+        v = _object_new(cls)
+        {v.x = W(self.x, other.x)}
+        return v
+    if isinstance(other, int):
+        v = _object_new(cls)
+        {v.x = W(self.x, other)}
+        return v
+    return NotImplemented
+
+def __r{name}__(self, other):
+    if isinstance(other, int):
+        v = _object_new(cls)
+        {v.x = W(other, self.x)}
+        return v
+    return NotImplemented
+
+def __i{name}__(self, other):
+    if isinstance(other, cls):
+        {self.x = W(self.x, other.x)}
+        return self
+    if isinstance(other, int):
+        {self.x = W(self.x, other)}
+        return self
+    return NotImplemented
+"""
+
+_INTEGER_METHODS_TEMPLATE = """
+def __neg__(self):
+    v = _object_new(cls)
+    {v.x = N(-self.x)}
+    return v
+
+def __invert__(self):
+    v = _object_new(cls)
+    {v.x = N(~self.x)}
+    return v
+
+def __eq__(self, other):
+    if isinstance(other, cls):
+        return {self.x == other.x and}
+    return _vecBase.__eq__(self, other)
+"""
+
+# frozen vectors fill their slots through the descriptors of the base class, _set.x(v, x) becoming
+# _set_x(v, x) with _set_x = base.x.__set__, and keep their hash in a slot
+_FROZEN_TEMPLATE = """
+def _new({args}):
+    v = _object_new(cls)
+    {_set.x(v, x)}
+    _set_hash(v, _hash(({args},)))
+    return v
+
+def __init__(self, *args):
+    v = base(*args)
+    {_set.x(self, v.x)}
+    _set_hash(self, _hash(_components(v)))
+"""
+
+_BOOL_METHODS_TEMPLATE = """
+def __eq__(self, other):
+    if isinstance(other, cls):
+        return {self.x == other.x and}
+    return _vecBase.__eq__(self, other)
+"""
+
+_METHODS_TEMPLATE = """
+def __neg__(self):
+    v = _object_new(cls)
+    {v.x = -self.x}
+    return v
+
+def __eq__(self, other):
+    if isinstance(other, cls):
+        return {self.x == other.x and}
+    return _vecBase.__eq__(self, other)
+
+def dot(self, other):
+    if isinstance(other, cls):
+        return {self.x * other.x +}
+    return _vecBase.dot(self, other)
+
+def magnitude(self):
+    return ({self.x * self.x +}) ** 0.5
+"""
+
 
 def array_to_vec(array: list[_Number]) -> Union[_Number, _Vector]:
     match len(array):
@@ -35,45 +176,296 @@ def empty_vec(n: int, v: int = 0) -> Union[_Number, _Vector]:
             raise ValueError(f"Invalid size for a vector: {n} (expected <= 4)")
 
 
+def _unroll(template: str, n: int) -> str:
+    # expand each {...} group once per component: statements go on their own line, a trailing
+    # operator (like "+" or "and") is used to join the terms of an expression
+    def expand(match):
+        group = match.group(1)
+        line_start = template.rfind("\n", 0, match.start()) + 1
+        indent = template[line_start:match.start()]
+        joiner = f"\n{indent}"
+        words = group.split()
+        if words[-1] in ("+", "and"):
+            joiner = f" {words[-1]} "
+            group = group[:group.rindex(words[-1])].rstrip()
+        return joiner.join(re.sub(r"\bx\b", attr, group) for attr in _ATTRIBUTES[:n])
+
+    return re.sub(r"\{([^{}]*)\}", expand, template)
+
+
+def _int32(value: Any) -> int:
+    # GLSL int(value): truncated towards zero and wrapped around to 32 bits
+    return ((int(value) + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+
+
+def _uint32(value: Any) -> int:
+    return int(value) & 0xFFFFFFFF
+
+
+def _make_methods(cls: type) -> dict:
+    # build the unrolled methods of a vector class, including cls._new(x, y, ...) which fills the
+    # slots of a new vector without any validation
+    source = _unroll(_NEW_TEMPLATE.replace("{args}", ", ".join(_ATTRIBUTES[:cls._N])), cls._N)
+    for name, op in _BINARY_OPERATORS.items():
+        source += _unroll(_OPERATOR_TEMPLATE.replace("{name}", name).replace("OP", op), cls._N)
+    source += _unroll(_METHODS_TEMPLATE, cls._N)
+    methods = {}
+    exec(source, {"_object_new": object.__new__, "cls": cls, "_SCALARS": _SCALARS, "_vecBase": _vecBase}, methods)
+    return methods
+
+
+def _make_integer_methods(cls: type) -> dict:
+    # unrolled methods of an integer vector class: the results wrap around like 32 bits integers,
+    # divisions truncate towards zero for ivec (as in GLSL) and round down for uvec
+    if cls._SIGNED:
+        wrap = "((({}) + 0x80000000) & 0xFFFFFFFF) - 0x80000000"
+        operations = {"/": "int({a} / {b})", "%": "{a} - {b} * int({a} / {b})"}
+    else:
+        wrap = "({}) & 0xFFFFFFFF"
+        operations = {"/": "{a} // {b}"}
+    source = _unroll(_NEW_TEMPLATE.replace("{args}", ", ".join(_ATTRIBUTES[:cls._N])), cls._N)
+    for name, op in _INTEGER_OPERATORS.items():
+        operation = operations.get(op, "{a} " + op + " {b}")
+        code = _unroll(_INTEGER_OPERATOR_TEMPLATE.replace("{name}", name), cls._N)
+        source += re.sub(r"W\((.*), (.*)\)$", lambda m: wrap.format(operation.format(a=m[1], b=m[2])), code,
+                         flags=re.M)
+    source += re.sub(r"N\((.*)\)$", lambda m: wrap.format(m[1]), _unroll(_INTEGER_METHODS_TEMPLATE, cls._N),
+                     flags=re.M)
+    methods = {}
+    exec(source, {"_object_new": object.__new__, "cls": cls, "_vecBase": _vecBase}, methods)
+    return methods
+
+
+def _make_bool_methods(cls: type) -> dict:
+    source = _unroll(_NEW_TEMPLATE.replace("{args}", ", ".join(_ATTRIBUTES[:cls._N])), cls._N)
+    source += _unroll(_BOOL_METHODS_TEMPLATE, cls._N)
+    methods = {}
+    exec(source, {"_object_new": object.__new__, "cls": cls, "_vecBase": _vecBase}, methods)
+    return methods
+
+
+def _frozen_setattr(self, name: str, value: Any) -> None:
+    raise AttributeError(f"{type(self).__name__} is immutable, use a {self._PREFIX}{self._N} to modify it")
+
+
+def _frozen_eq(self, other: Any) -> bool:
+    # only vectors of the same size and family are equal, so that equal frozen vectors have the same hash
+    if not isinstance(other, _vecBase) or other._N != self._N or other._PREFIX != self._PREFIX:
+        return False
+    return self._components(self) == other._components(other)
+
+
+def _frozen_inplace(self, other: Any) -> Any:
+    # v += w on a frozen vector binds v to the new vector v + w, like for tuples
+    return NotImplemented
+
+
+def _make_frozen_type(base: type) -> type:
+    # immutable and hashable subclass of a vector class, usable as a dict key or in a set; it compares
+    # equal to the vectors of base with the same components, and its operators return vectors of base
+    args = ", ".join(_ATTRIBUTES[:base._N])
+    source = re.sub(r"_set\.(\w)", r"_set_\1", _unroll(_FROZEN_TEMPLATE.replace("{args}", args), base._N))
+    env = {"_object_new": object.__new__, "base": base, "_hash": hash, "_components": base._components}
+    env.update({f"_set_{attr}": getattr(base, attr).__set__ for attr in _ATTRIBUTES[:base._N]})
+    namespace = {"__slots__": ("_hash", "__weakref__"), "__setattr__": _frozen_setattr,
+                 "__delattr__": _frozen_setattr, "__eq__": _frozen_eq, "__hash__": lambda self: self._hash,
+                 "__reduce__": lambda self: (type(self), self._components(self)),
+                 "__repr__": lambda self: f"frozen{_vecBase.__repr__(self)}",
+                 "frozen": property(lambda self: self)}
+    for name in ("add", "sub", "mul", "truediv", "mod", "and", "or", "xor", "lshift", "rshift"):
+        namespace[f"__i{name}__"] = _frozen_inplace
+    cls = type(f"frozen{base.__name__}", (base,), namespace)
+    env["cls"] = cls
+    methods = {}
+    exec(source, env, methods)
+    env["_set_hash"] = cls._hash.__set__
+    cls.__init__ = methods["__init__"]
+    cls._new = staticmethod(methods["_new"])
+    setattr(cls, f"from{args.replace(', ', '').upper()}", cls._new)
+    return cls
+
+
+def _make_init_plan(cls: type, key: tuple) -> Any:
+    # unrolled __init__ for one signature of argument types, eg. (vec2, float) for vec3 becomes
+    # self.x = a0.x; self.y = a0.y; self.z = a1
+    if len(key) == 1 and issubclass(key[0], _SCALARS):
+        values = ["a0"] * cls._N
+    else:
+        values = []
+        for i, t in enumerate(key):
+            if issubclass(t, _SCALARS):
+                values.append(f"a{i}")
+            elif issubclass(t, _vecBase):
+                values.extend(f"a{i}.{attr}" for attr in _ATTRIBUTES[:t._N])
+            else:
+                raise ValueError(f"Invalid type for {cls._PREFIX}{cls._N}: {t}")
+    if len(values) != cls._N:
+        raise ValueError(f"Invalid number of arguments for {cls._PREFIX}{cls._N}: {len(values)} "
+                         f"(expected {cls._N})")
+    args = "".join(f", a{i}" for i in range(len(key)))
+    # the components are converted to the type of the vector, for integer and boolean vectors
+    source = f"def init(self{args}):\n" + "".join(
+        f"    self.{attr} = {cls._CAST.format(value)}\n" for attr, value in zip(_ATTRIBUTES, values))
+    methods = {}
+    exec(source, {"_int32": _int32, "_uint32": _uint32}, methods)
+    return methods["init"]
+
+
+def _make_swizzle(attrs: str, target: type) -> property:
+    get = attrgetter(*attrs)
+    new = target._new
+
+    def fget(self):
+        return new(*get(self))
+
+    # GLSL only allows writing to swizzles without repeated components
+    if len(set(attrs)) != len(attrs):
+        return property(fget)
+
+    def fset(self, value):
+        if not isinstance(value, target):
+            raise ValueError(f"Invalid value for swizzle '{attrs}': {value!r} (expected {target.__name__})")
+        for attr, c in zip(attrs, value._components(value)):
+            setattr(self, attr, c)
+
+    return property(fget, fset)
+
+
+def _install_swizzles(cls: type) -> None:
+    # one property per valid swizzle of length 2 to 4, in both xyzw and rgba notations, giving vectors
+    # of the same family
+    for n, target in cls._FAMILY.items():
+        for indices in product(range(cls._N), repeat=n):
+            attrs = "".join(_ATTRIBUTES[i] for i in indices)
+            swizzle = _make_swizzle(attrs, target)
+            setattr(cls, attrs, swizzle)
+            setattr(cls, "".join(_ATTRIBUTES_ALIASES[i] for i in indices), swizzle)
+
+
+def _cast_buffer(buffer: Any, offset: int, count: int, format: str) -> memoryview:
+    # count items of the given format read from buffer (bytearray, mmap, numpy array, ...) starting at
+    # offset bytes, as a flat memoryview sharing the memory of buffer
+    if format not in _BUFFER_FORMATS:
+        raise ValueError(f"Invalid buffer format: {format!r} (expected one of {', '.join(_BUFFER_FORMATS)})")
+    raw = memoryview(buffer).cast("B")
+    size = count * array(format).itemsize
+    if offset < 0 or offset + size > len(raw):
+        raise ValueError(f"Invalid offset for a buffer of {len(raw)} bytes: {offset} (expected {size} bytes after it)")
+    return raw[offset:offset + size].cast(format)
+
+
+def _array_interface(buffer: memoryview, shape: tuple) -> dict:
+    return {"shape": shape, "typestr": _BYTE_ORDER + _BUFFER_FORMATS[buffer.format], "data": buffer, "version": 3}
+
+
+def _make_buffer_component(i: int) -> property:
+    def fget(self):
+        return self._buf[self._off + i]
+
+    def fset(self, value):
+        self._buf[self._off + i] = value
+
+    return property(fget, fset)
+
+
+def _make_view_type(cls: type) -> type:
+    # subclass of cls reading and writing its components in a shared buffer (like the storage of a
+    # matrix) starting at an offset, instead of its own slots
+    n = cls._N
+    namespace = {"__slots__": ("_buf", "_off")}
+    for i, (attr, alias) in enumerate(zip(_ATTRIBUTES[:n], _ATTRIBUTES_ALIASES)):
+        namespace[attr] = namespace[alias] = _make_buffer_component(i)
+    namespace["buffer"] = property(lambda self: self._buf[self._off:self._off + n])
+    return type(f"{cls.__name__}view", (cls,), namespace)
+
+
 class _vecBase(object):
+    # components live in the per-class xyzw slots, no per-instance __dict__
+    __slots__ = ()
     _N = 0
+    # name prefix, item format of the buffers and conversion of the components of the family
+    _PREFIX = "vec"
+    _FORMAT = "d"
+    _CAST = "{}"
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "_N" in cls.__dict__:
+            # rgba share the slot descriptors of xyzw
+            for attr, alias in zip(_ATTRIBUTES[:cls._N], _ATTRIBUTES_ALIASES):
+                setattr(cls, alias, getattr(cls, attr))
+            # returns the components as a tuple in a single C call
+            cls._components = attrgetter(*_ATTRIBUTES[:cls._N])
+            cls._plans = {}
+            for name, method in cls._make_methods().items():
+                if name in cls.__dict__:
+                    # written in the class body, like the product of quaternions
+                    continue
+                if name == "_new":
+                    # also public, as vec3.fromXYZ(x, y, z)
+                    setattr(cls, f"from{_ATTRIBUTES[:cls._N].upper()}", staticmethod(method))
+                    method = staticmethod(method)
+                elif name == "magnitude":
+                    method = property(method)
+                setattr(cls, name, method)
+            cls._View = _make_view_type(cls)
+
+    @classmethod
+    def _make_methods(cls) -> dict:
+        return _make_methods(cls)
+
+    @classmethod
+    def _view(cls, buf: Any, offset: int = 0) -> Self:
+        # a vector whose components are buf[offset], buf[offset + 1], ...
+        v = object.__new__(cls._View)
+        v._buf = buf
+        v._off = offset
+        return v
+
+    @classmethod
+    def fromBuffer(cls, buffer: Any, offset: int = 0, format: Union[str, None] = None) -> Self:
+        # a vector reading and writing its components in buffer at offset bytes, without copy; format
+        # is "d" for float64 components (the default of vecN) or "f" for float32, "i" for int32 and "I"
+        # for uint32 (the defaults of ivecN and uvecN)
+        return cls._view(_cast_buffer(buffer, offset, cls._N, format or cls._FORMAT))
 
-    def __init__(self, *args: Union[_Number, Self]):
-        if len(args) == 1 and isinstance(args[0], _Number):
-            for i in range(self._N):
-                setattr(self, _ATTRIBUTES[i], args[0])
-            return
-        # count the number of arguments
-        n_data = 0
-        for arg in args:
-            if isinstance(arg, _Number):
-                n_data += 1
-            elif isinstance(arg, _vecBase):
-                n_data += arg.size
-            else:
-                raise ValueError(f"Invalid type for vec{self._N}: {type(arg)}")
+    @property
+    def buffer(self) -> memoryview:
+        # the components as float64 (int32 or uint32 for the integer vectors), a copy since they live in
+        # the slots (shared for fromBuffer vectors)
+        return memoryview(array(self._FORMAT, self._components(self)))
 
-        if n_data != self._N:
-            raise ValueError(f"Invalid number of arguments for vec{self._N}: {n_data} (expected {self._N})")
-        else:
-            # set the attributes
-            i = 0
-            for arg in args:
-                if isinstance(arg, _Number):
-                    setattr(self, _ATTRIBUTES[i], arg)
-                    i += 1
-                elif isinstance(arg, _vecBase):
-                    for j in range(arg.size):
-                        setattr(self, _ATTRIBUTES[i], getattr(arg, _ATTRIBUTES[j]))
-                        i += 1
+    def __buffer__(self, flags: int) -> memoryview:
+        # buffer protocol on Python 3.12+
+        return self.buffer
+
+    @property
+    def __array_interface__(self) -> dict:
+        return _array_interface(self.buffer, (self._N,))
+
+    def __array__(self, dtype: Any = None, copy: Any = None) -> Any:
+        # only called by numpy, which is then already imported
+        import numpy as np
+        return np.array(self.buffer, dtype=dtype, copy=copy)
+
+    def __init__(self, *args: Union[_Number, Self]):
+        # the arguments are copied by a plan generated once per signature of argument types
+        key = tuple(map(type, args))
+        try:
+            init = self._plans[key]
+        except KeyError:
+            init = self._plans[key] = _make_init_plan(self.__class__, key)
+        init(self, *args)
 
     def __repr__(self) -> str:
-        return f"vec{self._N}({', '.join([str(getattr(self, attr)) for attr in _ATTRIBUTES[:self._N]])})"
+        return f"{self._PREFIX}{self._N}({', '.join([str(c) for c in self._components(self)])})"
 
     def __eq__(self, other: Any) -> bool:
         if not isinstance(other, _vecBase):
             return False
-        return all([getattr(self, attr) == getattr(other, attr) for attr in _ATTRIBUTES[:self._N]])
+        if self._N > other._N:
+            return False
+        return self._components(self) == other._components(other)[:self._N]
 
     def __ne__(self, other: Any) -> bool:
         if not isinstance(other, _vecBase):
@@ -82,96 +474,85 @@ class _vecBase(object):
 
     def __mul__(self, other: Union[_Number, _Vector]) -> Union[Self, _Number]:
         # vector * scalar
-        if isinstance(other, _Number):
-            return type(self)(*[getattr(self, attr) * other for attr in _ATTRIBUTES[:self._N]])
+        if isinstance(other, _SCALARS):
+            return self._new(*[c * other for c in self._components(self)])
         # vector * vector (component-wise)
         elif isinstance(other, _vecBase):
             # select the minimum size
-            size = min(self._N, other._N)
             if self._N <= other._N:
-                return type(self)(*[getattr(self, attr) * getattr(other, attr) for attr in _ATTRIBUTES[:size]])
+                return self._new(*[a * b for a, b in zip(self._components(self), other._components(other))])
             else:
-                return type(other)(*[getattr(self, attr) * getattr(other, attr) for attr in _ATTRIBUTES[:size]])
+                return other._new(*[a * b for a, b in zip(self._components(self), other._components(other))])
 
         else:
             return NotImplemented
 
     def __rmul__(self, other: _Number) -> Self:
         # scalar * vector
-        return type(self)(*[other * getattr(self, attr) for attr in _ATTRIBUTES[:self._N]])
+        return self._new(*[other * c for c in self._components(self)])
 
     def __add__(self, other: Union[_Number, _Vector]) -> Self:
-        if isinstance(other, _Number):
-            return type(self)(*[getattr(self, attr) + other for attr in _ATTRIBUTES[:self._N]])
+        if isinstance(other, _SCALARS):
+            return self._new(*[c + other for c in self._components(self)])
         elif isinstance(other, _vecBase):
-            size = min(self._N, other._N)
             if self._N <= other._N:
-                return type(self)(*[getattr(self, attr) + getattr(other, attr) for attr in _ATTRIBUTES[:size]])
+                return self._new(*[a + b for a, b in zip(self._components(self), other._components(other))])
             else:
-                return type(other)(*[getattr(self, attr) + getattr(other, attr) for attr in _ATTRIBUTES[:size]])
+                return other._new(*[a + b for a, b in zip(self._components(self), other._components(other))])
 
         else:
             return NotImplemented
 
     def __radd__(self, other: _Number) -> Self:
         # add the scalar to each component
-        return type(self)(*[getattr(self, attr) + other for attr in _ATTRIBUTES[:self._N]])
+        return self._new(*[c + other for c in self._components(self)])
 
     def __sub__(self, other: Union[_Number, _Vector]) -> Self:
-        if isinstance(other, _Number):
-            return type(self)(*[getattr(self, attr) - other for attr in _ATTRIBUTES[:self._N]])
+        if isinstance(other, _SCALARS):
+            return self._new(*[c - other for c in self._components(self)])
         elif isinstance(other, _vecBase):
-            size = min(self._N, other._N)
             if self._N <= other._N:
-                return type(self)(*[getattr(self, attr) - getattr(other, attr) for attr in _ATTRIBUTES[:size]])
+                return self._new(*[a - b for a, b in zip(self._components(self), other._components(other))])
             else:
-                return type(other)(*[getattr(self, attr) - getattr(other, attr) for attr in _ATTRIBUTES[:size]])
+                return other._new(*[a - b for a, b in zip(self._components(self), other._components(other))])
         else:
             return NotImplemented
 
     def __rsub__(self, other: _Number) -> Self:
-        return type(self)(*[other - getattr(self, attr) for attr in _ATTRIBUTES[:self._N]])
+        return self._new(*[other - c for c in self._components(self)])
 
     def __truediv__(self, other: Union[_Number, _Vector]) -> Self:
-        if isinstance(other, _Number):
+        if isinstance(other, _SCALARS):
             # divide each component by the scalar
-            return type(self)(*[getattr(self, attr) / other for attr in _ATTRIBUTES[:self._N]])
+            return self._new(*[c / other for c in self._components(self)])
         elif isinstance(other, _vecBase):
-            size = min(self._N, other._N)
             if self._N <= other._N:
-                return type(self)(*[getattr(self, attr) / getattr(other, attr) for attr in _ATTRIBUTES[:size]])
+                return self._new(*[a / b for a, b in zip(self._components(self), other._components(other))])
             else:
-                return type(other)(*[getattr(self, attr) / getattr(other, attr) for attr in _ATTRIBUTES[:size]])
+                return other._new(*[a / b for a, b in zip(self._components(self), other._components(other))])
         else:
             return NotImplemented
 
     def __rtruediv__(self, other: _Number) -> Self:
         # divide each component by the inverse of the scalar
-        return type(self)(*[other / getattr(self, attr) for attr in _ATTRIBUTES[:self._N]])
+        return self._new(*[other / c for c in self._components(self)])
 
     def __neg__(self) -> Self:
-        return type(self)(*[-getattr(self, attr) for attr in _ATTRIBUTES[:self._N]])
-
+        return self._new(*[-c for c in self._components(self)])
 
-    def __getattr__(self, item):
-        if (len(item) <= self._N) and (
-                set(item).issubset(_ATTRIBUTES[:self._N]) or set(item).issubset(_ATTRIBUTES_ALIASES[:self._N])):
-            if _ATTRIBUTES_ALIASES.find(item[0]) != -1:
-                for char in item:
-                    item = item.replace(char, _ATTRIBUTES[_ATTRIBUTES_ALIASES.find(char)])
-            # return a new vector of the right size with the selected components
-            return array_to_vec([getattr(self, attr) for attr in item])
 
-        else:
-            raise AttributeError(f"'vec{self._N}' object has no attribute '{item}'")
+    def _index(self, key: int) -> int:
+        # the index of a component, negative indexes counting from the end
+        index = key + self._N if key < 0 else key
+        if not 0 <= index < self._N:
+            raise IndexError(f"index {key} is out of range for vector of size {self._N}")
+        return index
 
     def __getitem__(self, key: int) -> _Number:
-        if key >= self._N:
-            raise IndexError(f"index {key} is out of range for vector of size {self._N}")
-        return getattr(self, _ATTRIBUTES[key])
+        return getattr(self, _ATTRIBUTES[self._index(key)])
 
     def __setitem__(self, key: int, value: _Number) -> None:
-        setattr(self, _ATTRIBUTES[key], value)
+        setattr(self, _ATTRIBUTES[self._index(key)], value)
 
 
     @property
@@ -180,25 +561,24 @@ class _vecBase(object):
 
     @property
     def magnitude(self) -> _Number:
-        return sum([getattr(self, attr) ** 2 for attr in _ATTRIBUTES[:self._N]]) ** 0.5
+        return sum([c ** 2 for c in self._components(self)]) ** 0.5
 
     @property
     def normal(self) -> Self:
         # return a new vector without modifying the original
         m = self.magnitude
-        return type(self)(*[getattr(self, attr) / m for attr in _ATTRIBUTES[:self._N]])
+        return self._new(*[c / m for c in self._components(self)])
 
 
     def dot(self, other: _Vector) -> _Number:
         # dot product
-        size = min(self.size, other.size)
-        return sum([getattr(self, attr) * getattr(other, attr) for attr in _ATTRIBUTES[:size]])
+        return sum([a * b for a, b in zip(self._components(self), other._components(other))])
 
     def normalize(self) -> Self:
         # modify the vector in place
         m = self.magnitude
-        for attr in _ATTRIBUTES[:self._N]:
-            setattr(self, attr, getattr(self, attr) / m)
+        for attr, c in zip(_ATTRIBUTES, self._components(self)):
+            setattr(self, attr, c / m)
         return self
 
     def distance(self, other: _Vector) -> _Number:
@@ -206,7 +586,12 @@ class _vecBase(object):
         return (self - other).magnitude
 
     def getArray(self) -> List[_Number]:
-        return [self[i] for i in range(self._N)]
+        return list(self._components(self))
+
+    @property
+    def frozen(self) -> Self:
+        # immutable and hashable copy, e.g. frozenvec3 for a vec3
+        return self._FROZEN._new(*self._components(self))
 
 
 
@@ -214,10 +599,12 @@ class _vecBase(object):
 
 
 class vec2(_vecBase):
+    __slots__ = ("x", "y")
     _N = 2
 
 
 class vec3(_vecBase):
+    __slots__ = ("x", "y", "z")
     _N = 3
 
     def cross(self, other: Self) -> Self:
@@ -225,9 +612,121 @@ class vec3(_vecBase):
         x = self.y * other.z - self.z * other.y
         y = self.z * other.x - self.x * other.z
         z = self.x * other.y - self.y * other.x
-        return vec3(x, y, z)
+        return vec3._new(x, y, z)
 
 
 class vec4(_vecBase):
+    __slots__ = ("x", "y", "z", "w")
     _N = 4
 
+
+class _ivecBase(_vecBase):
+    # signed 32 bits integer vectors with the GLSL integer arithmetic, components are ints
+    __slots__ = ()
+    _PREFIX = "ivec"
+    _FORMAT = "i"
+    _CAST = "_int32({})"
+    _SIGNED = True
+
+    @classmethod
+    def _make_methods(cls) -> dict:
+        return _make_integer_methods(cls)
+
+
+class _uvecBase(_ivecBase):
+    # unsigned 32 bits integer vectors
+    __slots__ = ()
+    _PREFIX = "uvec"
+    _FORMAT = "I"
+    _CAST = "_uint32({})"
+    _SIGNED = False
+
+
+class _bvecBase(_vecBase):
+    # boolean vectors, the results of the component-wise comparisons; they have no arithmetic and
+    # cannot be used as a condition, reduce them with any() or all() from glslsyntax.functions
+    __slots__ = ()
+    _PREFIX = "bvec"
+    _FORMAT = "I"
+    _CAST = "bool({})"
+
+    @classmethod
+    def _make_methods(cls) -> dict:
+        return _make_bool_methods(cls)
+
+    def _no_arithmetic(self, other: Any) -> Any:
+        return NotImplemented
+
+    __add__ = __radd__ = __sub__ = __rsub__ = __mul__ = __rmul__ = __truediv__ = __rtruediv__ = _no_arithmetic
+
+    def __neg__(self) -> Any:
+        raise TypeError(f"bad operand type for unary -: '{self._PREFIX}{self._N}'")
+
+    def __bool__(self) -> bool:
+        raise TypeError(f"The truth value of a {self._PREFIX}{self._N} is ambiguous, use any() or all()")
+
+
+class ivec2(_ivecBase):
+    __slots__ = ("x", "y")
+    _N = 2
+
+
+class ivec3(_ivecBase):
+    __slots__ = ("x", "y", "z")
+    _N = 3
+
+
+class ivec4(_ivecBase):
+    __slots__ = ("x", "y", "z", "w")
+    _N = 4
+
+
+class uvec2(_uvecBase):
+    __slots__ = ("x", "y")
+    _N = 2
+
+
+class uvec3(_uvecBase):
+    __slots__ = ("x", "y", "z")
+    _N = 3
+
+
+class uvec4(_uvecBase):
+    __slots__ = ("x", "y", "z", "w")
+    _N = 4
+
+
+class bvec2(_bvecBase):
+    __slots__ = ("x", "y")
+    _N = 2
+
+
+class bvec3(_bvecBase):
+    __slots__ = ("x", "y", "z")
+    _N = 3
+
+
+class bvec4(_bvecBase):
+    __slots__ = ("x", "y", "z", "w")
+    _N = 4
+
+
+# the vectors are already computed with Python floats, which are doubles
+dvec2, dvec3, dvec4 = vec2, vec3, vec4
+
+# vector types by size, for each family
+_vecBase._FAMILY = {2: vec2, 3: vec3, 4: vec4}
+_ivecBase._FAMILY = {2: ivec2, 3: ivec3, 4: ivec4}
+_uvecBase._FAMILY = {2: uvec2, 3: uvec3, 4: uvec4}
+_bvecBase._FAMILY = {2: bvec2, 3: bvec3, 4: bvec4}
+
+for _cls in (vec2, vec3, vec4, ivec2, ivec3, ivec4, uvec2, uvec3, uvec4, bvec2, bvec3, bvec4):
+    _install_swizzles(_cls)
+
+# hashable variants, for dict keys, sets and the interning pools of glslsyntax.keys
+frozenvec2, frozenvec3, frozenvec4 = map(_make_frozen_type, (vec2, vec3, vec4))
+frozenivec2, frozenivec3, frozenivec4 = map(_make_frozen_type, (ivec2, ivec3, ivec4))
+frozenuvec2, frozenuvec3, frozenuvec4 = map(_make_frozen_type, (uvec2, uvec3, uvec4))
+frozenbvec2, frozenbvec3, frozenbvec4 = map(_make_frozen_type, (bvec2, bvec3, bvec4))
+for _cls in (vec2, vec3, vec4, ivec2, ivec3, ivec4, uvec2, uvec3, uvec4, bvec2, bvec3, bvec4):
+    _cls._FROZEN = globals()[f"frozen{_cls.__name__}"]
@@ -1,4 +1,8 @@
 from glslsyntax import *
+from glslsyntax import vec2array, vec3array, ivec2array, ivec3array, uvec2array, mat3array, Struct, VectorPool, \
+    quantize, Grid, KDTree, VertexStream, instrument, vectorize
+import glslsyntax.functions as glsl
+import glslsyntax.parallel
 
 print("Testing the main functions of the GLSL Vectors and Matrices library")
 
@@ -136,6 +140,12 @@ v9.yz = vec2(6, 7)
 
 print(f"v9 = {v9}\n")
 print(f"v9[0] = {v9[0]}\n")
+v9[-1] = 8
+print(f"v9[-1] = 8 gives {v9}\n")
+try:
+    v9[4] = 1
+except IndexError as e:
+    print(f"v9[4] = 1 raises IndexError: {e}\n")
 
 print("\n> Testing matrix operations")
 m1 = mat3(5)
@@ -161,7 +171,8 @@ print(
     f"2 * m3 = {2 * m3}\n"
     f"m3/2 = {m3 / 2}\n"
     f"m3 * m2 = {m3 * m2}\n"
-    f"m3 * v2 = {m3 * v2}\n"
+    f"m3 * v4 = {m3 * v4}\n"
+    f"v4 * m3 = {v4 * m3}\n"
     f"m3 + 1 = {m3 + 1}\n"
 )
 
@@ -183,3 +194,189 @@ print(f"m4.inverse() = {m4.inverse()}\n"
       f"m4.inverse() * m4 = {m4.inverse() * m4}\n"
       f"m4 * m4.inverse() = {m4 * m4.inverse()}\n"
       )
+
+print(f"m4.determinant('lu') = {m4.determinant('lu')}\n"
+      f"m4.inverse('lu') = {m4.inverse('lu')}\n"
+      f"m4.inverse('lu') * m4 = {m4.inverse('lu') * m4}\n"
+      )
+
+print("\n> Testing matrix and vector products")
+m5 = mat2x3(1, 2,
+            3, 4,
+            5, 6)
+print(f"m5 * vec3(1, 0, 1) = {m5 * vec3(1, 0, 1)}\n"
+      f"vec2(1, 1) * m5 = {vec2(1, 1) * m5}\n"
+      f"m5 * vec3array([(1, 0, 1), (0, 1, 0)]) = {m5 * vec3array([(1, 0, 1), (0, 1, 0)])}\n"
+      f"vec2array([(1, 1)]) * m5 = {vec2array([(1, 1)]) * m5}\n")
+
+m6 = mat4(1)
+m6[3] = vec4(10, 20, 30, 1)
+print(f"m6.transformPoint(vec3(1, 2, 3)) = {m6.transformPoint(vec3(1, 2, 3))}\n"
+      f"m6.transformDirection(vec3(1, 2, 3)) = {m6.transformDirection(vec3(1, 2, 3))}\n")
+
+
+class Model(mat4):
+    # the products are found by size for the subclasses of the matrices
+    pass
+
+
+print(f"mat4(2) * Model(3) = {mat4(2) * Model(3)}\n")
+try:
+    "text" * m6
+except TypeError as e:
+    print(f"\"text\" * m6 raises TypeError: {e}\n")
+try:
+    m6[4] = vec4(1, 2, 3, 4)
+except IndexError as e:
+    print(f"m6[4] = vec4(1, 2, 3, 4) raises IndexError: {e}, len(m6._data) = {len(m6._data)}\n")
+
+print("\n> Testing buffers")
+ubo = bytearray(80)
+m7 = mat4.fromBuffer(ubo, 0, "f")
+m7[3] = vec4(1, 2, 3, 1)
+c7 = vec4.fromBuffer(ubo, 64, "f")
+c7.rgb = vec3(1, 0.5, 0)
+print(f"m7 = {m7}\n"
+      f"c7 = {c7}\n"
+      f"ubo[48:64].cast('f') = {memoryview(ubo)[48:64].cast('f').tolist()}\n"
+      f"ubo[64:80].cast('f') = {memoryview(ubo)[64:80].cast('f').tolist()}\n"
+      f"mat2(1, 2, 3, 4).buffer = {mat2(1, 2, 3, 4).buffer.tolist()}\n")
+
+print("\n> Testing std140 layout")
+Light = Struct([("position", vec3), ("intensity", float), ("normal", mat3), ("weights", (float, 2))], name="Light")
+data = Light.pack([{"position": vec3(1, 2, 3), "intensity": 0.5, "normal": mat3(1), "weights": [1, 2]}])
+light = Light.view(data)
+light.position.z = 4
+print(f"Light = {Light}\n"
+      f"light = {light}\n"
+      f"Light.unpack(data) = {Light.unpack(data)}\n")
+Flags = Struct([("flags", (bvec3, 2)), ("grid", ((bvec2, 2), 2)), ("scale", float)], name="Flags")
+data = Flags.pack([{"flags": [bvec3(True, False, True), bvec3(False)], "grid": [[bvec2(True), bvec2(False)]] * 2,
+                    "scale": 2.0}])
+print(f"Flags.view(data).flags = {Flags.view(data).flags}\n"
+      f"Flags.view(data).grid = {Flags.view(data).grid}\n"
+      f"Flags.unpack(data)[0][\"flags\"] = {Flags.unpack(data)[0]['flags']}\n")
+
+print("\n> Testing lazy expressions")
+la, lb, lc = lazy(vec3(1, 2, 3), vec3(4, 5, 6), vec3(7, 8, 9))
+shade = (la + lb) * 2 - lc
+print(f"(a + b) * 2 - c = {shade.eval()}\n"
+      f"((a + b) * 2 - c).zy = {shade.zy}\n"
+      f"P * V * M * v = {(lazy(mat4(2)) * mat4(3) * mat4(1) * vec4(1, 2, 3, 1)).eval()}\n")
+# each squaring uses the previous node twice, the kernel computes it once
+power = lazy(vec3(1, 0.5, -1))
+for _ in range(30):
+    power = power * power
+print(f"vec3(1, 0.5, -1) ** (2 ** 30) = {power.eval()}, {len(power._args)} argument\n")
+
+print("\n> Testing built-in functions")
+print(f"mix(vec3(0), vec3(1, 2, 3), 0.25) = {glsl.mix(vec3(0), vec3(1, 2, 3), 0.25)}\n"
+      f"clamp(vec2(-1, 2), 0.0, 1.0) = {glsl.clamp(vec2(-1, 2), 0.0, 1.0)}\n"
+      f"smoothstep(0.0, 1.0, vec3(0.25, 0.5, 2)) = {glsl.smoothstep(0.0, 1.0, vec3(0.25, 0.5, 2))}\n"
+      f"reflect(vec3(1, -1, 0), vec3(0, 1, 0)) = {glsl.reflect(vec3(1, -1, 0), vec3(0, 1, 0))}\n"
+      f"refract(vec3(0, -1, 0), vec3(0, 1, 0), 0.5) = {glsl.refract(vec3(0, -1, 0), vec3(0, 1, 0), 0.5)}\n"
+      f"outerProduct(vec3(1, 2, 3), vec2(4, 5)) = {glsl.outerProduct(vec3(1, 2, 3), vec2(4, 5))}\n")
+
+# the functions against the same computations with the operators, on vectors and on batches
+a, b, n = vec3(0.3, -1.2, 2.5), vec3(1.5, 0.25, -0.75), vec3(0, 1, 1).normal
+points, others = vec3array([(0.1, 0.9, 0.5), (1.5, -0.2, 0.7)]), vec3array([(0.3, 0.2, 0.1), (0.0, 1.0, 2.0)])
+print(f"length(a) == a.magnitude = {glsl.length(a) == a.magnitude}\n"
+      f"mix(a, b, 0.25) == a * 0.75 + b * 0.25 = {glsl.mix(a, b, 0.25) == a * 0.75 + b * 0.25}\n"
+      f"clamp(a, 0.0, 1.0) = {glsl.clamp(a, 0.0, 1.0)}\n"
+      f"fract(vec3(1.25, -0.75, 3)) = {glsl.fract(vec3(1.25, -0.75, 3))}\n"
+      f"reflect(a, n) == a - 2 * n.dot(a) * n = {glsl.reflect(a, n) == a - 2 * n.dot(a) * n}\n"
+      f"mix(points, others, 0.25) == points * 0.75 + others * 0.25 = "
+      f"{(glsl.mix(points, others, 0.25) == points * 0.75 + others * 0.25).tolist()}\n"
+      f"clamp(points, 0.2, 0.8) = {glsl.clamp(points, 0.2, 0.8)}\n"
+      f"reflect(points, n) == [reflect(p, n) for p in points] = "
+      f"{(glsl.reflect(points, n) == vec3array([glsl.reflect(p, n) for p in points])).tolist()}\n")
+
+print("\n> Testing transforms")
+model = translate(vec3(1, 2, 3)).rotate_(vec3(0, 0, 1), glsl.radians(90)).scale_(2)
+print(f"perspective(radians(90), 1, 1, 3) = {perspective(glsl.radians(90), 1, 1, 3)}\n"
+      f"lookAt(vec3(0, 0, 5), vec3(0), vec3(0, 1, 0)) = {lookAt(vec3(0, 0, 5), vec3(0), vec3(0, 1, 0))}\n"
+      f"model.transformPoint(vec3(1, 0, 0)) = {model.transformPoint(vec3(1, 0, 0))}\n")
+
+print("\n> Testing quaternions")
+q1 = quat.fromAxisAngle(vec3(0, 0, 1), glsl.radians(90))
+q2 = quat.fromAxisAngle(vec3(1, 0, 0), glsl.radians(90))
+print(f"q1 = {q1}\n"
+      f"q1 * vec3(1, 0, 0) = {q1 * vec3(1, 0, 0)}\n"
+      f"(q1 * q2).toMat3() = {(q1 * q2).toMat3()}\n"
+      f"quat.fromMatrix(q1.toMat4()) = {quat.fromMatrix(q1.toMat4())}\n"
+      f"quat().slerp(q1, 0.5) = {quat().slerp(q1, 0.5)}\n")
+
+print("\n> Testing kernels")
+
+
+@vectorize(mat3, vec3)
+def shade(m, v):
+    return mat3(m) * v + mat3(v) * v
+
+
+print(f"shade(mat3array([mat3(2)]), vec3array([(1, 2, 3)])) = {shade(mat3array([mat3(2)]), vec3array([(1, 2, 3)]))}\n")
+try:
+    vectorize(mat4, vec3)(lambda m, v: mat3(m) * v)
+except TypeError as e:
+    print(f"vectorize(mat4, vec3)(lambda m, v: mat3(m) * v) raises TypeError: {e}\n")
+
+print("\n> Testing integer and boolean vectors")
+cell = ivec3(7, -7, 2)
+print(f"ivec3(7, -7, 2) / 2 = {cell / 2}\n"
+      f"ivec3(7, -7, 2) % 2 = {cell % 2}\n"
+      f"ivec2(2147483647, 0) + 1 = {ivec2(2147483647, 0) + 1}\n"
+      f"uvec2(0, 5) - 1 = {uvec2(0, 5) - 1}\n"
+      f"lessThan(cell, ivec3(2)) = {glsl.lessThan(cell, ivec3(2))}\n"
+      f"any(equal(cell, ivec3(2))) = {glsl.any(glsl.equal(cell, ivec3(2)))}\n"
+      f"ivec3(1, 2, 3) == vec3(1, 2, 3) = {ivec3(1, 2, 3) == vec3(1, 2, 3)}, "
+      f"vec3(1, 2, 3) == ivec3(1, 2, 3) = {vec3(1, 2, 3) == ivec3(1, 2, 3)}\n"
+      f"ivec3array([(2147483647, 0, 0)]) + ivec3(1, 1, 1) = {ivec3array([(2147483647, 0, 0)]) + ivec3(1, 1, 1)}\n"
+      f"uvec2array([(0, 5)]) - uvec2(1, 1) = {uvec2array([(0, 5)]) - uvec2(1, 1)}\n"
+      f"ivec2array([(1, 2)]) + 2 ** 32 = {ivec2array([(1, 2)]) + 2 ** 32}\n")
+quotients = ivec2array([(-8, 7), (-7, -9)])
+quotients /= 2
+print(f"ivec2array([(-8, 7), (-7, -9)]) /= 2 gives {quotients.data.tolist()}\n")
+try:
+    ivec2array([(1, 2)]) / ivec2(1, 0)
+except ZeroDivisionError as e:
+    print(f"ivec2array([(1, 2)]) / ivec2(1, 0) raises ZeroDivisionError: {e}\n")
+
+print("\n> Testing hashable vectors")
+pool = VectorPool()
+print(f"vec3(1, 2, 3).frozen = {vec3(1, 2, 3).frozen}\n"
+      f"{{vec3(1, 2, 3).frozen: 0}}[frozenvec3(1, 2, 3)] = {({vec3(1, 2, 3).frozen: 0})[frozenvec3(1, 2, 3)]}\n"
+      f"frozenvec3(1, 2, 3) == frozenvec4(1, 2, 3, 9) = {frozenvec3(1, 2, 3) == frozenvec4(1, 2, 3, 9)}\n"
+      f"frozenvec3(1, 2, 3) == vec3(1, 2, 3) = {frozenvec3(1, 2, 3) == vec3(1, 2, 3)}\n"
+      f"pool.intern(vec2(1, 2)) is pool.intern(vec2(1.0, 2.0)) = "
+      f"{pool.intern(vec2(1, 2)) is pool.intern(vec2(1.0, 2.0))}\n"
+      f"quantize(vec3(1.2, -0.3, 0.1), 0.5) = {quantize(vec3(1.2, -0.3, 0.1), 0.5)}\n")
+
+print("\n> Testing spatial indexes")
+cloud = [vec3(x, y, 0) for x in range(4) for y in range(4)]
+grid, tree = Grid(1.5, cloud), KDTree(cloud)
+grid.move(0, vec3(1.5, 1.5, 0))
+print(f"tree.nearest(vec3(1.2, 1.1, 0), 3) = {tree.nearest(vec3(1.2, 1.1, 0), 3)}\n"
+      f"tree.inBox(vec3(0), vec3(1, 1, 0)) = {sorted(tree.inBox(vec3(0), vec3(1, 1, 0)))}\n"
+      f"grid.inRadius(vec3(1.5, 1.5, 0), 0.5) = {grid.inRadius(vec3(1.5, 1.5, 0), 0.5)}\n"
+      f"grid.alongRay(vec3(0, 0, 0), vec3(1, 1, 0), 0.1) = {grid.alongRay(vec3(0, 0, 0), vec3(1, 1, 0), 0.1)}\n")
+
+print("\n> Testing parallel map")
+print(f"parallel.map(normalize, vec2array([(3, 4), (0, 2), (5, 0)]), workers=2, backend=\"thread\") = "
+      f"{glslsyntax.parallel.map(glsl.normalize, vec2array([(3, 4), (0, 2), (5, 0)]), workers=2, backend='thread')}\n")
+
+print("\n> Testing streaming")
+stream = VertexStream(iter([vec3array([(1, 0, 0), (0, 3, 0)]), vec3array([(0, 0, 9)])])).transform(
+    mat4(1).translate_(vec3(0, 0, 1))).transform(mat4(2)).filterDistance(vec3(0), 10.0).normalize()
+print(f"stream = {stream}\n"
+      f"stream.collect() = {stream.collect()}\n"
+      f"stream.vertices = {stream.vertices}, stream.chunks = {stream.chunks}\n")
+
+print("\n> Testing instrumentation")
+with instrument() as report:
+    mat4(2).Inv * vec4(1, 2, 3, 4).zyxw
+print(f"report.calls = {dict(sorted(report.calls.items()))}\n"
+      f"report.allocations = {dict(sorted(report.allocations.items()))}\n"
+      f"report.total(\"swizzle\") = {report.total('swizzle')}\n")
+with instrument() as report:
+    quat(1, 0, 0, 0)
+print(f"quat(1, 0, 0, 0) allocations = {report.allocations}\n")
@@ -25,5 +25,8 @@ setuptools.setup(
     packages=['glslsyntax'],
     use_scm_version=True,
     setup_requires=['setuptools_scm'],
-    python_requires=">=3.10"
+    python_requires=">=3.10",
+    extras_require={
+        "numpy": ["numpy"],
+    },
 )